@@ -0,0 +1,49 @@
+"""
+Benchmark of a full traversal of deep and wide outlines, comparing ancestry records which share the records of their
+ancestors (the current implementation) with the previous approach of copying the whole ancestry list for each node.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_ancestry_records
+"""
+import time
+import tracemalloc
+
+from benchmarks.synthetic_outlines import deep_outline, wide_outline
+from outline.node_ancestry_item import NodeAncestryItem
+
+
+def copying_traversal(outline_node, ancestry=None):
+    """
+    Equivalent of the traversal before ancestry records were shared, where each node held its own copy of the list
+    of ancestry items.
+    """
+    if ancestry is None:
+        ancestry = [NodeAncestryItem(None, outline_node)]
+    yield ancestry
+    for child_number, a_child in enumerate(outline_node):
+        next_gen_ancestry = list(ancestry)
+        next_gen_ancestry.append(NodeAncestryItem(child_number + 1, a_child))
+        yield from copying_traversal(a_child, next_gen_ancestry)
+
+
+def measure(label, traversal):
+    tracemalloc.start()
+    start = time.perf_counter()
+    records = list(traversal())
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<40} nodes: {len(records):>8}  time: {elapsed:8.3f}s  peak memory: {peak / 1024 / 1024:8.1f}MB')
+
+
+def main():
+    for shape, outline in (('deep (depth 60 x 1000 branches)', deep_outline(depth=60, branches=1000)),
+                           ('wide (100k siblings)', wide_outline(siblings=100000))):
+        print(shape)
+        measure('  shared ancestry records', outline.iter_nodes)
+        measure('  copied ancestry lists', lambda: copying_traversal(outline.top_outline_node))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Micro-benchmark of the cost of reading the text and note of an OutlineNode, comparing the direct read of the
+(already validated) element attributes with the full validating accessor used previously for every read.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_attribute_access
+"""
+import timeit
+
+from benchmarks.synthetic_outlines import wide_outline
+from outline import outline_utilities as outil
+
+
+def main():
+    outline = wide_outline(siblings=100000)
+    nodes = [record.node() for record in outline.iter_nodes()]
+    access_count = 2 * len(nodes)
+
+    def validating_access():
+        for node in nodes:
+            outil.get_valid_attribute(node._node, 'text')
+            outil.get_valid_attribute(node._node, '_note')
+
+    def property_access():
+        for node in nodes:
+            node.text
+            node.note
+
+    for label, function in (('validating accessor (before)', validating_access),
+                            ('text/note properties (after)', property_access)):
+        elapsed = min(timeit.repeat(function, number=1, repeat=5))
+        print(f'{label:<32} {len(nodes)} nodes  {elapsed * 1e9 / access_count:8.1f}ns per access')
+
+
+if __name__ == '__main__':
+    main()
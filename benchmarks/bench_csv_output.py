@@ -0,0 +1,61 @@
+"""
+Benchmark of writing a million row CSV file, comparing building the list of record dicts and writing it a row at a
+time with csv.DictWriter (as CsvOutputGenerator.create_csv_file used to) with streaming the rows through a
+CsvStreamWriter, which writes them in batches as they are generated.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_csv_output
+"""
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+
+from output_generators.csv_output_generator import CsvStreamWriter
+
+row_count = 1000000
+field_names = ['key', 'name', 'category', 'value']
+
+
+def iter_rows():
+    for number in range(row_count):
+        yield number, f'Name {number}', f'Category {number % 20}', number * 0.5
+
+
+def record_list(output_path):
+    records = [dict(zip(field_names, row)) for row in iter_rows()]
+    with open(output_path, 'w', newline='') as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=field_names)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+
+def stream(output_path):
+    with CsvStreamWriter(output_path, field_names) as writer:
+        writer.write_rows(iter_rows())
+    return writer.stats
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for name, write in (('record list', record_list), ('stream', stream),
+                            ('stream (gzip)', stream)):
+            output_path = os.path.join(directory, 'rows.csv.gz' if 'gzip' in name else 'rows.csv')
+            start = time.perf_counter()
+            write(output_path)
+            elapsed = time.perf_counter() - start
+
+            # Measure memory in a separate run, as tracing allocations slows everything down.
+            tracemalloc.start()
+            write(output_path)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f'{name:13}: {elapsed:6.3f}s, {row_count / elapsed:9.0f} rows/s, peak memory {peak / 1e6:7.1f} MB, '
+                  f'{os.path.getsize(output_path) / 1e6:.1f} MB file')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Benchmark of extracting the records for several specifiers from the same data node, comparing one extraction per
+specifier with a single pass using extract_many.
+
+Each specifier matches all sections of the data node and the same 20 fields, as is typical of several reports built
+from the same outline.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_extract_many
+"""
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline, data_node_specifier_structure
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.multi_specifier_extraction import extract_many
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+
+
+def main():
+    fields = 20
+    outline = data_node_outline(sections=10, items=20, fields=fields, noise_depth=2)
+    data_node = UnleashedOutline(outline).list_unleashed_nodes()[1].node()
+
+    for specifier_count in (1, 5, 15):
+        specifiers = [DataNodeSpecifier(data_node_specifier_structure(fields)) for _ in range(specifier_count)]
+
+        start = time.perf_counter()
+        separate_tables = [specifier.extract_data_node_table(data_node) for specifier in specifiers]
+        separate_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        single_pass_tables = extract_many(data_node, specifiers)
+        single_pass_elapsed = time.perf_counter() - start
+
+        assert separate_tables == single_pass_tables
+        print(f'{specifier_count:3} specifiers  separate: {separate_elapsed:7.3f}s  '
+              f'single pass: {single_pass_elapsed:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark of opening an outline in a worker, comparing parsing the OPML file with memory-mapping a FlatOutline
+snapshot, and of reading every node of it.
+
+Opening a snapshot doesn't read the nodes, so the time to read them is shown separately.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_flat_outline_snapshot
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        opml_path = os.path.join(directory, 'outline.opml')
+        snapshot_path = os.path.join(directory, 'outline.snapshot')
+        data_node_outline(sections=20, items=50, fields=20, data_nodes=2).write_opml(opml_path)
+        FlatOutline.from_outline(Outline.from_opml(opml_path)).write_snapshot(snapshot_path)
+        print(f'OPML file {os.path.getsize(opml_path) / 1e6:.1f} MB, '
+              f'snapshot {os.path.getsize(snapshot_path) / 1e6:.1f} MB')
+
+        start = time.perf_counter()
+        outline = Outline.from_opml(opml_path)
+        parse_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        snapshot = FlatOutline.from_snapshot(snapshot_path)
+        open_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        outline_texts = [record.node().text for record in outline.iter_nodes()]
+        outline_read_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        snapshot_texts = [record.node().text for record in snapshot.iter_nodes()]
+        snapshot_read_elapsed = time.perf_counter() - start
+
+        assert outline_texts == snapshot_texts
+        print(f'{len(snapshot)} nodes, parse OPML:    {parse_elapsed:7.3f}s  read nodes: {outline_read_elapsed:7.3f}s')
+        print(f'{len(snapshot)} nodes, open snapshot: {open_elapsed:7.3f}s  read nodes: {snapshot_read_elapsed:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
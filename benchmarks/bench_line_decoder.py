@@ -0,0 +1,61 @@
+"""
+Benchmark of decoding a 1M line indented text file, comparing decoding each line a step at a time (initial token,
+indent tokens, then bullet) with decoding it in a single match of the regex compiled by the decode specifier.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_line_decoder
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_outlines import write_indented_text
+from outline_preprocessors.preprocessor_text_indent import TextOutlineDecodeSpecifier
+
+line_count = 1000000
+
+specifications = {
+    'tab, no bullet': (("\t", ), None),
+    'tab, bullets': (("\t", ["o "]), "o "),
+}
+
+
+def decode_by_steps(decode_specifier, text_file):
+    decoded = []
+    for line in text_file:
+        line = line[:-1] if line[-1:] == "\n" else line
+        if line.strip() == "":
+            continue
+        _, remaining_text = decode_specifier.decode_initial_token(line)
+        indent_level, remaining_text = decode_specifier.decode_indent_token(remaining_text)
+        node_text = decode_specifier.decode_bullet_token(remaining_text, indent_level)
+        if node_text is not None:
+            decoded.append((indent_level, node_text))
+    return decoded
+
+
+def decode_by_regex(decode_specifier, text_file):
+    return list(decode_specifier.decode_lines(text_file))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (specification, bullet) in specifications.items():
+            text_path = os.path.join(directory, 'outline.txt')
+            write_indented_text(text_path, lines=line_count, indent_token="\t", bullet_token=bullet)
+            decode_specifier = TextOutlineDecodeSpecifier(*specification)
+            print(f'{name}: {os.path.getsize(text_path) / 1e6:.1f} MB, {line_count} lines')
+
+            results = []
+            for decoder_name, decode in (('step at a time', decode_by_steps), ('compiled regex', decode_by_regex)):
+                with open(text_path) as text_file:
+                    start = time.perf_counter()
+                    results.append(decode(decode_specifier, text_file))
+                    elapsed = time.perf_counter() - start
+                print(f'    {decoder_name}: {elapsed:6.3f}s')
+            assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark of matching the nodes of a data node against the fields of a data node specifier, comparing the compiled
+plan (fields grouped by depth, stopping at the first failing generation) with testing every node against every field.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_matching_plan
+"""
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline, data_node_specifier_structure
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+
+
+def match_every_field(data_node_specifier, data_node):
+    """
+    Matching as it was done before the plan was introduced.
+    """
+    override_node = data_node_specifier._override_tag_regex(data_node)
+    match_list = []
+    for record in override_node.iter_unleashed_nodes():
+        match_list.extend(data_node_specifier.match_field_node(record))
+    return match_list
+
+
+def main():
+    for fields in (10, 60):
+        outline = data_node_outline(sections=5, items=20, fields=fields)
+        data_node = UnleashedOutline(outline).list_unleashed_nodes()[1].node()
+        data_node_specifier = DataNodeSpecifier(data_node_specifier_structure(fields))
+
+        timings = {}
+        results = {}
+        for label, function in (('every field (before)', match_every_field),
+                                ('compiled plan (after)', DataNodeSpecifier.match_data_node)):
+            start = time.perf_counter()
+            results[label] = function(data_node_specifier, data_node)
+            timings[label] = time.perf_counter() - start
+
+        assert results['every field (before)'] == results['compiled plan (after)']
+        for label, elapsed in timings.items():
+            print(f'{fields:4} fields  {label:<24} {len(results[label])} matches  {elapsed:8.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark of reading an OPML file, comparing parsing the file with re-building the outline from a snapshot in an
+OutlineCache.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_outline_cache
+"""
+import os
+import tempfile
+import time
+from xml.etree import ElementTree
+
+from benchmarks.synthetic_outlines import data_node_outline
+from outline.outline import Outline
+from outline.outline_cache import OutlineCache
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        opml_path = os.path.join(directory, 'outline.opml')
+        # Indented, as OPML files saved by outliners usually are.
+        opml = data_node_outline(sections=20, items=50, fields=20, data_nodes=2).create_opml_tree_structure()
+        ElementTree.indent(opml)
+        ElementTree.ElementTree(opml).write(opml_path)
+        cache = OutlineCache(os.path.join(directory, 'cache'))
+        print(f'{os.path.getsize(opml_path) / 1e6:.1f} MB OPML file')
+
+        start = time.perf_counter()
+        outline = Outline.from_opml(opml_path)
+        parse_elapsed = time.perf_counter() - start
+        print(f'{outline.total_sub_nodes()} nodes, parse:          {parse_elapsed:7.3f}s')
+
+        start = time.perf_counter()
+        Outline.from_opml(opml_path, cache=cache)
+        first_read_elapsed = time.perf_counter() - start
+        print(f'{outline.total_sub_nodes()} nodes, first read:     {first_read_elapsed:7.3f}s  '
+              f'(snapshot {cache.size() / 1e6:.1f} MB)')
+
+        start = time.perf_counter()
+        cached_outline = Outline.from_opml(opml_path, cache=cache)
+        cached_elapsed = time.perf_counter() - start
+        assert cached_outline.total_sub_nodes() == outline.total_sub_nodes()
+        print(f'{outline.total_sub_nodes()} nodes, from snapshot:  {cached_elapsed:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
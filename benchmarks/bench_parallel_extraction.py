@@ -0,0 +1,44 @@
+"""
+Benchmark of extracting all the data nodes of an outline, comparing extraction in this process with extraction in a
+pool of worker processes.
+
+The speed-up depends on the number of CPUs available; with a single CPU the pool is slower, as each data node has to
+be serialised and sent to a worker as well as extracted.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_parallel_extraction
+"""
+import os
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline, data_node_specifier_structure
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+
+
+def main():
+    fields = 20
+    unleashed_outline = UnleashedOutline(data_node_outline(sections=5, items=20, fields=fields, data_nodes=8))
+    specifiers = {
+        data_node_name: DataNodeSpecifier(data_node_specifier_structure(fields))
+        for data_node_name, _, _ in unleashed_outline.iter_data_nodes()
+    }
+
+    start = time.perf_counter()
+    serial_tables = unleashed_outline.extract_data_node_tables(specifiers, max_workers=1)
+    serial_elapsed = time.perf_counter() - start
+    print(f'{len(specifiers)} data nodes, serial: {serial_elapsed:7.3f}s')
+
+    for max_workers in (2, 4, os.cpu_count()):
+        start = time.perf_counter()
+        parallel_tables = unleashed_outline.extract_data_node_tables(specifiers, max_workers=max_workers)
+        parallel_elapsed = time.perf_counter() - start
+
+        assert list(serial_tables) == list(parallel_tables)
+        assert all(serial_tables[name] == parallel_tables[name] for name in serial_tables)
+        print(f'{len(specifiers)} data nodes, {max_workers} workers: {parallel_elapsed:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
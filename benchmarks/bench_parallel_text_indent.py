@@ -0,0 +1,39 @@
+"""
+Benchmark of decoding a large indented text file serially and in line-aligned chunks in worker processes.  The
+speed up depends on the number of CPUs available (with a single CPU the parallel version is slower, because of the
+cost of starting the workers and passing the decoded lines back).
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_parallel_text_indent
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_outlines import write_indented_text
+from outline_preprocessors.preprocessor_text_indent import PreprocessorTextIndent, TextOutlineDecodeSpecifier
+
+line_count = 1000000
+
+
+def main():
+    decode_specifier = TextOutlineDecodeSpecifier("\t", ["o "])
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'outline.txt')
+        write_indented_text(text_path, lines=line_count, indent_token="\t", bullet_token="o ")
+        print(f'{os.path.getsize(text_path) / 1e6:.1f} MB indented text file, {line_count} lines, '
+              f'{os.cpu_count()} CPUs')
+
+        results = []
+        for name, kwargs in (('serial', {'max_workers': 1}), ('parallel', {'parallel_threshold': 0})):
+            preprocessor = PreprocessorTextIndent.from_textfile(text_path, decode_specifier, **kwargs)
+            start = time.perf_counter()
+            results.append(preprocessor.parse_text())
+            elapsed = time.perf_counter() - start
+            print(f'{name:8}: {elapsed:6.3f}s')
+        assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Benchmark of extracting a single large data node, comparing extraction in this process with the first level
+sub-trees split between a pool of worker processes.
+
+The speed-up depends on the number of CPUs available; with a single CPU the pool is slower, as the sub-trees have to
+be serialised and sent to the workers, and the matches sent back, as well as matched.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_partitioned_extraction
+"""
+import os
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline, data_node_specifier_structure
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+
+
+def main():
+    fields = 20
+    unleashed_outline = UnleashedOutline(data_node_outline(sections=40, items=20, fields=fields, noise_depth=1))
+    _, _, data_node = next(unleashed_outline.iter_data_nodes())
+    specifier = DataNodeSpecifier(data_node_specifier_structure(fields))
+
+    start = time.perf_counter()
+    serial_table = specifier.extract_data_node_table(data_node)
+    serial_elapsed = time.perf_counter() - start
+    print(f'{len(serial_table)} rows, serial: {serial_elapsed:7.3f}s')
+
+    for max_workers in (2, 4, os.cpu_count()):
+        start = time.perf_counter()
+        partitioned_table = specifier.extract_partitioned_data_node_table(data_node, max_workers=max_workers)
+        partitioned_elapsed = time.perf_counter() - start
+
+        assert list(serial_table.iter_rows()) == list(partitioned_table.iter_rows())
+        print(f'{len(partitioned_table)} rows, {max_workers} workers: {partitioned_elapsed:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmark of reading one data node from a large OPML file, comparing parsing the whole file with reading just the
+data node's sub-tree using the sub-tree index.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_subtree_index
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline
+from outline import subtree_index
+from outline.outline import Outline
+from outlines_unleashed.unleashed_outline import UnleashedOutline, data_node_regex
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        opml_path = os.path.join(directory, 'outline.opml')
+        data_node_outline(sections=10, items=20, fields=20, data_nodes=20).write_opml(opml_path)
+        print(f'{os.path.getsize(opml_path) / 1e6:.1f} MB OPML file, 20 data nodes')
+
+        start = time.perf_counter()
+        unleashed_outline = UnleashedOutline(Outline.from_opml(opml_path))
+        data_nodes = {data_node_name: node for data_node_name, _, node in unleashed_outline.iter_data_nodes()}
+        whole_file_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        subtree_index.get_subtree_index(opml_path, name_regex=data_node_regex)
+        index_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        data_node = UnleashedOutline.load_data_node(opml_path, 'synthetic_7')
+        subtree_elapsed = time.perf_counter() - start
+
+        assert data_node.outline_node.total_sub_nodes() == data_nodes['synthetic_7'].outline_node.total_sub_nodes()
+        print(f'parse whole file and find data node: {whole_file_elapsed:7.3f}s')
+        print(f'build index (once):                  {index_elapsed:7.3f}s')
+        print(f'load data node sub-tree:             {subtree_elapsed:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
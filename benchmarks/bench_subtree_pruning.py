@@ -0,0 +1,51 @@
+"""
+Benchmark of extracting the matches from a data node where most of the tree lies under branches which no field can
+match, comparing the incremental traversal (match_subtree) with testing every node of the data node against the
+compiled plan.
+
+The data node has 10 sections of which the specifier only matches one, and each field node has a chain of 5 nodes
+below it, deeper than any criteria.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_subtree_pruning
+"""
+import time
+
+from benchmarks.synthetic_outlines import data_node_outline, data_node_specifier_structure
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+
+
+def match_every_node(data_node_specifier, data_node):
+    """
+    Matching each node of the data node against the plan, without carrying forward matches or pruning.
+    """
+    override_node = data_node_specifier._override_tag_regex(data_node)
+    matching_plan = data_node_specifier.compile()
+    match_list = []
+    for record in override_node.iter_unleashed_nodes():
+        match_list.extend(matching_plan.match_field_node(record))
+    return match_list
+
+
+def main():
+    fields = 20
+    outline = data_node_outline(sections=10, items=20, fields=fields, noise_depth=5)
+    data_node = UnleashedOutline(outline).list_unleashed_nodes()[1].node()
+    data_node_specifier = DataNodeSpecifier(data_node_specifier_structure(fields, section_text='Section 0'))
+    print(f'{data_node.outline_node.total_sub_nodes()} nodes in data node')
+
+    results = {}
+    for label, function in (('every node (before)', match_every_node),
+                            ('incremental (after)', DataNodeSpecifier.match_data_node)):
+        start = time.perf_counter()
+        results[label] = function(data_node_specifier, data_node)
+        elapsed = time.perf_counter() - start
+        print(f'{label:<24} {len(results[label])} matches  {elapsed:8.3f}s')
+
+    assert results['every node (before)'] == results['incremental (after)']
+
+
+if __name__ == '__main__':
+    main()
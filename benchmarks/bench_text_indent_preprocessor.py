@@ -0,0 +1,62 @@
+"""
+Benchmark of pre-processing a large indented text file, comparing the peak memory used (outside the outline itself)
+by the original approach, which read all the lines and parsed them into a list before building the tree, with the
+single pass approach which reads, decodes and attaches a line at a time.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_text_indent_preprocessor
+"""
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_outlines import write_indented_text
+from outline_preprocessors.preprocessor_text_indent import PreprocessorTextIndent, TextOutlineDecodeSpecifier
+
+line_count = 200000
+
+
+def whole_file(text_path, decode_specifier):
+    with open(text_path, 'r') as text_file:
+        preprocessor = PreprocessorTextIndent(text_file.readlines(), decode_specifier)
+    top_level_node = preprocessor.create_outline_element(None)
+    preprocessor.add_child_nodes(top_level_node, 0, preprocessor.parse_text(), 0)
+    return top_level_node
+
+
+def single_pass(text_path, decode_specifier):
+    preprocessor = PreprocessorTextIndent.from_textfile(text_path, decode_specifier)
+    top_level_node = preprocessor.create_outline_element(None)
+    preprocessor.attach_nodes(top_level_node, preprocessor.iter_parsed_lines())
+    return top_level_node
+
+
+def measure(build, text_path, decode_specifier):
+    tracemalloc.start()
+    start = time.perf_counter()
+    top_level_node = build(text_path, decode_specifier)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tree_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top_level_node, elapsed, peak - tree_size
+
+
+def main():
+    decode_specifier = TextOutlineDecodeSpecifier('    ')
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'outline.txt')
+        write_indented_text(text_path, lines=line_count)
+        print(f'{os.path.getsize(text_path) / 1e6:.1f} MB indented text file, {line_count} lines')
+
+        for name, build in (('readlines + list', whole_file), ('single pass', single_pass)):
+            top_level_node, elapsed, overhead = measure(build, text_path, decode_specifier)
+            print(f'{name:17}: {elapsed:6.3f}s, peak memory above tree {overhead / 1e6:6.1f} MB '
+                  f'({len(top_level_node)} top level nodes)')
+            del top_level_node
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark of pre-processing a large indented text file and extracting it with a data node specifier, comparing
+building an Outline (XML elements) with building a FlatOutline directly from the decoded lines.
+
+Run from the root of the repository with:
+
+    python -m benchmarks.bench_text_to_flat_outline
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic_outlines import write_indented_text
+from outline_preprocessors.preprocessor_text_indent import PreprocessorTextIndent, TextOutlineDecodeSpecifier
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+
+line_count = 200000
+
+
+def level_specifier(levels=3):
+    descriptor = {
+        f'Level{level}': {
+            'primary_key': 'yes',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [NodeAncestryMatchingCriteria() for _ in range(level + 1)],
+        }
+        for level in range(1, levels + 1)
+    }
+    return DataNodeSpecifier({'header': {'descriptor_version_number': '0.1'}, 'descriptor': descriptor})
+
+
+def main():
+    specifier = level_specifier()
+    with tempfile.TemporaryDirectory() as directory:
+        text_path = os.path.join(directory, 'outline.txt')
+        write_indented_text(text_path, lines=line_count)
+        preprocessor = PreprocessorTextIndent.from_textfile(text_path, TextOutlineDecodeSpecifier('    '))
+        print(f'{os.path.getsize(text_path) / 1e6:.1f} MB indented text file, {line_count} lines')
+
+        tables = []
+        for name, pre_process in (('Outline', preprocessor.pre_process_outline),
+                                  ('FlatOutline', preprocessor.pre_process_flat_outline)):
+            start = time.perf_counter()
+            outline = pre_process()
+            pre_process_elapsed = time.perf_counter() - start
+            tables.append(UnleashedOutline(outline).extract_data_node_table(specifier))
+            total_elapsed = time.perf_counter() - start
+            print(f'{name:11}: pre-process {pre_process_elapsed:6.3f}s, with extraction {total_elapsed:6.3f}s')
+        assert tables[0] == tables[1]
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Builds synthetic outlines of a given shape for use by the benchmarks.
+"""
+from xml.etree import ElementTree
+
+from outline.outline import Outline
+from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
+
+
+def deep_outline(depth=60, branches=1000):
+    """
+    Outline with a number of top level branches, each of which is a single chain of nodes of the given depth.
+
+    :param depth:
+    :param branches:
+    :return:
+    """
+    top_level_elements = []
+    for branch in range(branches):
+        branch_element = ElementTree.Element('outline', {'text': f'Branch {branch}', '_note': ''})
+        parent_element = branch_element
+        for level in range(2, depth + 1):
+            element = ElementTree.Element('outline', {'text': f'Node {branch}-{level}', '_note': ''})
+            parent_element.append(element)
+            parent_element = element
+        top_level_elements.append(branch_element)
+
+    return Outline.from_scratch(top_level_elements)
+
+
+def wide_outline(siblings=100000):
+    """
+    Outline with a single top level node which has the given number of children.  Every other child has no _note
+    attribute, as is common in real OPML files.
+
+    :param siblings:
+    :return:
+    """
+    top_element = ElementTree.Element('outline', {'text': 'Top', '_note': ''})
+    for sibling in range(siblings):
+        attributes = {'text': f'Sibling {sibling}'}
+        if sibling % 2 == 0:
+            attributes['_note'] = ''
+        top_element.append(ElementTree.Element('outline', attributes))
+
+    return Outline.from_scratch([top_element])
+
+
+
+def data_node_outline(sections=20, items=20, fields=60, noise_depth=0, data_nodes=1):
+    """
+    Outline holding data nodes (the top level nodes) in the form expected by data_node_specifier: a section at depth
+    1, items at depth 2 and, under each item, one node per field whose text is tagged with the field name, eg
+    '[F7] Value 7'.
+
+    :param sections:
+    :param items:
+    :param fields:
+    :param noise_depth: If set, each field node has a chain of this many descendants which no field matches.
+    :param data_nodes: Number of data nodes.  The first is named 'synthetic', and the rest 'synthetic_2' etc.
+    :return:
+    """
+    data_node_elements = [
+        _data_node_element('synthetic' if data_node == 0 else f'synthetic_{data_node + 1}',
+                           sections, items, fields, noise_depth)
+        for data_node in range(data_nodes)
+    ]
+
+    return Outline.from_scratch(data_node_elements)
+
+
+def _data_node_element(data_node_name, sections, items, fields, noise_depth):
+    data_node_note = f'{{data_node: {data_node_name}}}'
+    data_node_element = ElementTree.Element('outline', {'text': 'Data Node', '_note': data_node_note})
+    for section in range(sections):
+        section_element = ElementTree.Element('outline', {'text': f'Section {section}', '_note': ''})
+        for item in range(items):
+            item_element = ElementTree.Element('outline', {'text': f'Item {section}-{item}', '_note': ''})
+            for field in range(fields):
+                field_element = ElementTree.Element('outline', {'text': f'[F{field}] Value {field}', '_note': ''})
+                parent_element = field_element
+                for level in range(noise_depth):
+                    element = ElementTree.Element('outline', {'text': f'Noise {level}', '_note': ''})
+                    parent_element.append(element)
+                    parent_element = element
+                item_element.append(field_element)
+            section_element.append(item_element)
+        data_node_element.append(section_element)
+
+    return data_node_element
+
+
+def data_node_specifier_structure(fields=60, section_text=None):
+    """
+    Data node specifier structure (as passed to DataNodeSpecifier) for an outline created by data_node_outline with
+    the same number of fields.
+
+    :param fields:
+    :param section_text: If set, only the section with this text is matched.
+    :return:
+    """
+    section_criteria = NodeAncestryMatchingCriteria(text=section_text)
+    descriptor = {
+        'section': {
+            'primary_key': 'yes',
+            'type': 'string',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [NodeAncestryMatchingCriteria(), section_criteria],
+        },
+        'item': {
+            'primary_key': 'yes',
+            'type': 'string',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [NodeAncestryMatchingCriteria(), section_criteria,
+                                           NodeAncestryMatchingCriteria()],
+        },
+    }
+    for field in range(fields):
+        descriptor[f'field_{field}'] = {
+            'primary_key': 'no',
+            'type': 'string',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [
+                NodeAncestryMatchingCriteria(), section_criteria, NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(text_tag=f'F{field}')
+            ],
+        }
+
+    return {
+        'header': {
+            'descriptor_version_number': '0.1',
+            'tag_delimiters': {'text_delimiters': ['[', ']'], 'note_delimiters': [None, None]},
+        },
+        'descriptor': descriptor,
+    }
+
+
+def write_indented_text(path, lines=100000, depth=6, indent_token='    ', bullet_token=None):
+    """
+    Writes an indented text outline with the given number of lines, where each top level node has a sub-tree in
+    which each line goes one level deeper until the given depth is reached, then starts again at level 2.
+
+    :param path: Path of text file to write.
+    :param lines:
+    :param depth:
+    :param indent_token:
+    :param bullet_token: Bullet to add at the start of the text of each line (after the indent), if any.
+    :return:
+    """
+    bullet = '' if bullet_token is None else bullet_token
+    with open(path, 'w') as text_file:
+        for line_number in range(lines):
+            position = line_number % (depth * 10)
+            level = 0 if position == 0 else (position - 1) % (depth - 1) + 1
+            text_file.write(f'{indent_token * level}{bullet}Line {line_number} at level {level + 1}\n')
@@ -0,0 +1,398 @@
+"""
+Compact, array backed representation of an outline.
+
+An Outline holds its structure as a tree of xml.etree Elements, each of which is wrapped in an OutlineNode when it is
+accessed.  That is convenient for navigating and editing the tree, but locating the nth node means walking the tree
+and every access allocates new wrapper objects.
+
+A FlatOutline holds the same structure as a set of parallel arrays, with one entry per node in depth first (document)
+order:
+
+- parent:       Index of the parent of the node (-1 for the top node).
+- depth:        Depth of the node (0 for the top node).
+- child_number: Sequence of the node within the children of its parent (0 for the top node).
+- subtree_size: Number of nodes in the sub-tree headed by the node (including the node itself).
+
+The text and note of each node are held in two string tables with the same indexing.
+
+Because the nodes of a sub-tree occupy a contiguous range of indexes, the nth node can be located directly, the size
+of a sub-tree is a single lookup, the children of a node can be found by skipping from one sibling to the next, and the
+ancestry of a node can be found by following parent indexes, so is proportional to the depth of the node.
+
+FlatOutlineNode provides the same read interface as OutlineNode (text, note, children, iter_nodes etc) so that a
+FlatOutline can be used wherever an Outline is only being read.  As for OutlineNodes, the FlatOutlineNode for each
+index is held in a NodeWrapperCache so that the same object is returned while it is still in use.
+"""
+from array import array
+from xml.etree import ElementTree
+
+from outline import outline_utilities as outil
+from outline.node_ancestry_item import NodeAncestryItem
+from outline.node_ancestry_record import NodeAncestryRecord
+from outline.node_wrapper_cache import NodeWrapperCache
+from outline.outline import Outline
+from outline.outline_node_definition import outline_node_structures as ods
+
+head_field_names = tuple(ods['head']['child_elements'])
+
+
+class FlatOutline:
+    def __init__(self, parent, depth, child_number, subtree_size, text, note, head_fields=None, version='2.0',
+                 tag_parse_cache=None):
+        """
+        Usually created using one of the factory methods rather than directly.
+
+        :param parent: Sequence of int.  Index of parent of each node (-1 for the top node).
+        :param depth: Sequence of int.  Depth of each node (0 for the top node).
+        :param child_number: Sequence of int.  Child number of each node within its parent (0 for the top node).
+        :param subtree_size: Sequence of int.  Number of nodes in the sub-tree of each node, including the node.
+        :param text: Sequence of str.  Text of each node.
+        :param note: Sequence of str.  Note of each node.
+        :param head_fields: Dict of the outline level fields (title, dateCreated etc) keyed by OPML element name.
+        :param version: OPML version of the outline.
+        :param tag_parse_cache: Dict of tag-parsed values of the text or note of each node, keyed by (field name
+                                ('text' or 'note'), (left delimiter, right delimiter)), with values of (sequence of
+                                remaining text, sequence of tag).  See get_parsed_field.
+        """
+        self.parent = parent
+        self.depth = depth
+        self.child_number = child_number
+        self.subtree_size = subtree_size
+        self.text = text
+        self.note = note
+        self.version = version
+        self.tag_parse_cache = {} if tag_parse_cache is None else tag_parse_cache
+        self._node_cache = NodeWrapperCache()
+
+        # Memory-mapped file the arrays are views onto, if read from a snapshot (see flat_outline_snapshot).
+        self.snapshot_buffer = None
+        self.snapshot_views = []
+
+        # Outline level fields are held as attributes with the same names as for an Outline (title, dateCreated etc).
+        if head_fields is None:
+            head_fields = {}
+        for field_name in head_field_names:
+            setattr(self, field_name, head_fields.get(field_name, None))
+
+    @classmethod
+    def from_outline(cls, outline: Outline):
+        """
+        Creates a FlatOutline with the same structure and content as the supplied Outline.
+
+        :param outline:
+        :return:
+        """
+        parent = array('i')
+        depth = array('i')
+        child_number = array('i')
+        text = []
+        note = []
+
+        # Walk the elements in document order using an explicit stack of (element, parent index, depth, child number).
+        stack = [(outline.top_outline_node._node, -1, 0, 0)]
+        while len(stack) > 0:
+            element, parent_index, node_depth, node_child_number = stack.pop()
+            index = len(parent)
+            parent.append(parent_index)
+            depth.append(node_depth)
+            child_number.append(node_child_number)
+            text.append(outil.get_valid_attribute(element, 'text'))
+            note.append(outil.get_valid_attribute(element, '_note'))
+
+            # Push children in reverse order so that they are popped in document order.
+            for child_index in range(len(element) - 1, -1, -1):
+                stack.append((element[child_index], index, node_depth + 1, child_index + 1))
+
+        subtree_size = array('i', [1]) * len(parent)
+        for index in range(len(parent) - 1, 0, -1):
+            subtree_size[parent[index]] += subtree_size[index]
+
+        head_fields = {field_name: getattr(outline, field_name) for field_name in head_field_names}
+
+        return cls(parent, depth, child_number, subtree_size, text, note, head_fields=head_fields,
+                   version=outline.version)
+
+    def to_outline(self):
+        """
+        Creates an Outline with the same structure and content as this FlatOutline.
+
+        The elements are created in a single pass in document order, keeping track of the most recent element at each
+        depth, which will be the parent of the next node one level deeper.
+
+        :return:
+        """
+        opml = ElementTree.Element('opml', {'version': self.version})
+
+        head = ElementTree.Element('head')
+        for field_name in head_field_names:
+            value_parser = ods['head']['child_elements'][field_name].value_parser
+            field_text = value_parser(getattr(self, field_name), "from")
+            if field_text is not None:
+                sub_element = ElementTree.Element(field_name)
+                sub_element.text = field_text
+                head.append(sub_element)
+
+        body = ElementTree.Element('body')
+        open_elements = [body]
+        for index in range(1, len(self)):
+            attributes = {'text': self.text[index]}
+            if self.note[index] != '':
+                attributes['_note'] = self.note[index]
+            element = ElementTree.Element('outline', attributes)
+
+            node_depth = self.depth[index]
+            del open_elements[node_depth:]
+            open_elements[-1].append(element)
+            open_elements.append(element)
+
+        opml.extend([head, body])
+
+        return Outline(*Outline.initialise_opml_tree(ElementTree.ElementTree(opml)))
+
+    @classmethod
+    def from_snapshot(cls, path):
+        """
+        Memory-maps a snapshot file (see flat_outline_snapshot) and returns a FlatOutline which reads it in place.
+
+        :param path:
+        :return:
+        """
+        from outline.flat_outline_snapshot import open_flat_outline_snapshot
+
+        return open_flat_outline_snapshot(path)
+
+    def write_snapshot(self, path):
+        """
+        Writes this FlatOutline (including its tag-parse cache) as a snapshot file which can be memory-mapped using
+        from_snapshot.
+
+        :param path:
+        :return:
+        """
+        from outline.flat_outline_snapshot import write_flat_outline_snapshot
+
+        write_flat_outline_snapshot(self, path)
+
+    def close(self):
+        """
+        Unmaps the snapshot file this FlatOutline reads (if it was opened with from_snapshot), rather than waiting for
+        it to be garbage collected.  The outline and its nodes can't be used afterwards.  If strings returned by
+        raw() are still held the views onto the file are released but the mapping itself is left to be closed when
+        they are no longer referenced.
+
+        :return:
+        """
+        if self.snapshot_buffer is None:
+            return
+        for view in reversed(self.snapshot_views):
+            view.release()
+        self.snapshot_views = []
+        try:
+            self.snapshot_buffer.close()
+        except BufferError:
+            pass
+        self.snapshot_buffer = None
+
+    def __len__(self):
+        return len(self.parent)
+
+    @property
+    def top_outline_node(self):
+        return self.node(0)
+
+    def node(self, index):
+        return self._node_cache.get_wrapper(index, FlatOutlineNode, self, index)
+
+    def iter_child_indexes(self, index):
+        """
+        Generates the index of each child of the node at the supplied index.  The first child (if there is one)
+        immediately follows its parent, and each subsequent child immediately follows the sub-tree of its previous
+        sibling.
+
+        :param index:
+        :return:
+        """
+        end_index = index + self.subtree_size[index]
+        child_index = index + 1
+        while child_index < end_index:
+            yield child_index
+            child_index += self.subtree_size[child_index]
+
+    def ancestry_indexes(self, index, root_index=0):
+        """
+        List of indexes of nodes from root_index down to the node at the supplied index.
+
+        :param index:
+        :param root_index: Index of the node to treat as the root (must be an ancestor of index).
+        :return:
+        """
+        indexes = [index]
+        while index != root_index:
+            index = self.parent[index]
+            indexes.append(index)
+        indexes.reverse()
+        return indexes
+
+    def subtree(self, index):
+        """
+        Creates a FlatOutline holding a copy of just the sub-tree headed by the node at the supplied index, with that
+        node as its top node.  For example to pass a data node to a worker process without the rest of the outline.
+
+        :param index:
+        :return:
+        """
+        end_index = index + self.subtree_size[index]
+        base_depth = self.depth[index]
+
+        parent = array('i', [-1])
+        parent.extend(self.parent[node_index] - index for node_index in range(index + 1, end_index))
+        depth = array('i', (self.depth[node_index] - base_depth for node_index in range(index, end_index)))
+        child_number = array('i', [0])
+        child_number.extend(self.child_number[node_index] for node_index in range(index + 1, end_index))
+        subtree_size = array('i', (self.subtree_size[node_index] for node_index in range(index, end_index)))
+        text = [self.text[node_index] for node_index in range(index, end_index)]
+        note = [self.note[node_index] for node_index in range(index, end_index)]
+
+        return FlatOutline(parent, depth, child_number, subtree_size, text, note, version=self.version)
+
+    def total_sub_nodes(self):
+        return self.top_outline_node.total_sub_nodes()
+
+    def iter_nodes(self):
+        return self.top_outline_node.iter_nodes()
+
+    def list_nodes(self):
+        return self.top_outline_node.list_nodes()
+
+    def get_node(self, node_number):
+        return self.top_outline_node.get_node(node_number)
+
+    def __str__(self):
+        return f"FlatOutline - nodes: {len(self)}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class FlatOutlineNode:
+    """
+    Lightweight view of a single node within a FlatOutline, providing the same read interface as OutlineNode.
+    """
+    __slots__ = ('flat_outline', 'index', '__weakref__')
+
+    def __init__(self, flat_outline: FlatOutline, index: int):
+        self.flat_outline = flat_outline
+        self.index = index
+
+    def __eq__(self, other):
+        if not isinstance(other, FlatOutlineNode):
+            return NotImplemented
+        return self.flat_outline is other.flat_outline and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.flat_outline), self.index))
+
+    def __len__(self):
+        return sum(1 for _ in self.flat_outline.iter_child_indexes(self.index))
+
+    def __iter__(self):
+        flat_outline = self.flat_outline
+        for child_index in flat_outline.iter_child_indexes(self.index):
+            yield flat_outline.node(child_index)
+
+    def __getitem__(self, index):
+        if index < 0:
+            return list(self)[index]
+        for child_number, child_index in enumerate(self.flat_outline.iter_child_indexes(self.index)):
+            if child_number == index:
+                return self.flat_outline.node(child_index)
+        raise IndexError('child index out of range')
+
+    @property
+    def text(self):
+        return self.flat_outline.text[self.index]
+
+    @property
+    def note(self):
+        return self.flat_outline.note[self.index]
+
+    @property
+    def depth(self):
+        return self.flat_outline.depth[self.index]
+
+    def total_sub_nodes(self):
+        return self.flat_outline.subtree_size[self.index]
+
+    def iter_nodes(self):
+        """
+        Generates a NodeAncestryRecord for each node in the sub-tree headed by this node, in document order, with
+        this node as the root of the ancestry.
+
+        :return:
+        """
+        flat_outline = self.flat_outline
+        root_depth = flat_outline.depth[self.index]
+
+        ancestry_records = [NodeAncestryRecord([NodeAncestryItem(None, self)])]
+        yield ancestry_records[0]
+        for index in range(self.index + 1, self.index + flat_outline.subtree_size[self.index]):
+            relative_depth = flat_outline.depth[index] - root_depth
+            del ancestry_records[relative_depth:]
+            record = ancestry_records[-1].create_child_record(
+                NodeAncestryItem(flat_outline.child_number[index], flat_outline.node(index))
+            )
+            ancestry_records.append(record)
+            yield record
+
+    def list_nodes(self):
+        return list(self.iter_nodes())
+
+    def get_node(self, node_number):
+        """
+        Gets the nth node of the sub-tree headed by this node in depth first sequence.  As the sub-tree occupies a
+        contiguous range of the arrays, this is a direct lookup plus a walk up the parents to construct the ancestry.
+
+        :param node_number:
+        :return:
+        """
+        flat_outline = self.flat_outline
+        if node_number < 0 or node_number >= flat_outline.subtree_size[self.index]:
+            return None
+
+        ancestry_indexes = flat_outline.ancestry_indexes(self.index + node_number, root_index=self.index)
+        items = [NodeAncestryItem(None, self)]
+        for index in ancestry_indexes[1:]:
+            items.append(NodeAncestryItem(flat_outline.child_number[index], flat_outline.node(index)))
+        return NodeAncestryRecord(items)
+
+    def get_parsed_field(self, field_name, regex_delimiter):
+        """
+        The (remaining text, tag) of the text or note of this node from the tag-parse cache of the FlatOutline, or
+        None if the cache doesn't hold the field parsed with the supplied delimiters.
+
+        :param field_name: 'text' or 'note'.
+        :param regex_delimiter: (left, right) delimiter pair.
+        :return:
+        """
+        parsed_columns = self.flat_outline.tag_parse_cache.get((field_name, tuple(regex_delimiter)))
+        if parsed_columns is None:
+            return None
+        texts, tags = parsed_columns
+        return texts[self.index], tags[self.index]
+
+    def get_wrapper(self, variant, factory, *factory_args):
+        """
+        Gets a wrapper of a different kind for this node (for example an UnleashedOutlineNode) from the cache for the
+        FlatOutline, as for OutlineNode.get_wrapper.
+        """
+        return self.flat_outline._node_cache.get_wrapper((self.index, variant), factory, *factory_args)
+
+    def validate(self, full_validation_flag):
+        # Content was validated when the FlatOutline was created.
+        return True
+
+    def __str__(self):
+        return f"FlatOutlineNode: index: {self.index}, text: '{self.text}', note: '{self.note}'"
+
+    def __repr__(self):
+        return self.__str__()
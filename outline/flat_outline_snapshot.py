@@ -0,0 +1,261 @@
+"""
+Read-only file format for a FlatOutline, designed to be memory-mapped.
+
+A snapshot holds everything needed to read a FlatOutline in place, without parsing or decoding the file up front:
+
+- The structure arrays of the FlatOutline (parent, depth, child_number and subtree_size), as 32 bit integers.
+- A string heap holding each distinct string (text, note etc) once, encoded as UTF-8.
+- String columns, which give the position and length within the heap of the string for each node.  The text and
+  note of each node are held as string columns, as is any tag-parse cache.
+- A tag-parse cache (optional): for a field (text or note) and a pair of tag delimiters, the remaining text and the
+  tag of each node, as would be returned by parsing the field for tags.  An UnleashedOutlineNode which uses the same
+  delimiters gets the parsed values from the cache rather than parsing the field itself.
+
+open_flat_outline_snapshot maps the file into memory and returns a FlatOutline whose arrays are views onto the
+mapped file, so nothing is read until it is used and nothing is copied apart from the strings which are actually
+accessed.  As the mapping is read-only and backed by the file, any number of processes can open the same snapshot and
+share one copy of it through the operating system's page cache, rather than each holding its own copy of the outline.
+
+Sections are aligned to 8 bytes and integers are little-endian.  A small JSON header records the outline level fields
+and the position of each section.
+"""
+import json
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+
+from outline.flat_outline import FlatOutline, head_field_names
+
+snapshot_magic = b'FLATOUTL'
+snapshot_format_version = 1
+
+structure_array_names = ('parent', 'depth', 'child_number', 'subtree_size')
+
+# Integers are held little-endian, so must be byte-swapped on a big-endian host.
+_byteswap_needed = sys.byteorder != 'little'
+
+# Start of a string which isn't present (for example the tag of a node which doesn't have one).
+_no_string = -1
+
+
+class SnapshotStringColumn:
+    """
+    Sequence of the strings for each node of a snapshot, decoded from the string heap when accessed.
+    """
+    __slots__ = ('heap', 'starts', 'lengths')
+
+    def __init__(self, heap, starts, lengths):
+        """
+        :param heap: Buffer (memoryview) holding the UTF-8 encoded strings.
+        :param starts: Position in the heap of the string for each node (-1 if not present).
+        :param lengths: Length in bytes of the string for each node.
+        """
+        self.heap = heap
+        self.starts = starts
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        start = self.starts[index]
+        if start == _no_string:
+            return None
+        return str(self.heap[start:start + self.lengths[index]], 'utf-8')
+
+    def raw(self, index):
+        """
+        The UTF-8 encoded string for a node as a view onto the heap (no copy), or None if not present.
+
+        :param index:
+        :return:
+        """
+        start = self.starts[index]
+        if start == _no_string:
+            return None
+        return self.heap[start:start + self.lengths[index]]
+
+
+def write_flat_outline_snapshot(flat_outline: FlatOutline, path, tag_parse_cache=None):
+    """
+    Writes a snapshot of the supplied FlatOutline.
+
+    :param flat_outline:
+    :param path: Path of file to write.
+    :param tag_parse_cache: Optional dict of the parsed values to include, as held by FlatOutline.tag_parse_cache:
+                            keyed by (field name ('text' or 'note'), (left delimiter, right delimiter)), with values
+                            of (sequence of remaining text, sequence of tag) with an entry for each node.  Defaults
+                            to the tag-parse cache of the FlatOutline.
+    :return:
+    """
+    if tag_parse_cache is None:
+        tag_parse_cache = flat_outline.tag_parse_cache
+
+    heap = bytearray()
+    heap_positions = {}
+
+    def string_column(strings):
+        starts = array('q')
+        lengths = array('I')
+        for string in strings:
+            if string is None:
+                starts.append(_no_string)
+                lengths.append(0)
+                continue
+            position = heap_positions.get(string)
+            if position is None:
+                encoded = string.encode('utf-8')
+                position = (len(heap), len(encoded))
+                heap_positions[string] = position
+                heap.extend(encoded)
+            starts.append(position[0])
+            lengths.append(position[1])
+        return starts, lengths
+
+    # Sections (other than the heap, which is completed last) in the order they are written.
+    sections = [(name, array('i', getattr(flat_outline, name))) for name in structure_array_names]
+    string_columns = {'text': string_column(flat_outline.text), 'note': string_column(flat_outline.note)}
+    tag_parses = []
+    for (field_name, delimiters), (texts, tags) in tag_parse_cache.items():
+        cache_number = len(tag_parses)
+        string_columns[f'parse_{cache_number}_text'] = string_column(texts)
+        string_columns[f'parse_{cache_number}_tag'] = string_column(tags)
+        tag_parses.append({
+            'field': field_name,
+            'delimiters': list(delimiters),
+            'text_column': f'parse_{cache_number}_text',
+            'tag_column': f'parse_{cache_number}_tag',
+        })
+    for column_name, (starts, lengths) in string_columns.items():
+        sections.append((column_name + '.starts', starts))
+        sections.append((column_name + '.lengths', lengths))
+
+    section_bytes = []
+    for name, values in sections:
+        if _byteswap_needed:
+            values = array(values.typecode, values)
+            values.byteswap()
+        section_bytes.append((name, values.tobytes()))
+    section_bytes.append(('heap', bytes(heap)))
+
+    head_fields = {field_name: getattr(flat_outline, field_name) for field_name in head_field_names}
+
+    # The position of each section depends on the length of the header, which holds the positions, so work out the
+    # positions relative to the end of the header and then fix them up.
+    relative_sections = {}
+    offset = 0
+    for name, content in section_bytes:
+        relative_sections[name] = [offset, len(content)]
+        offset = _align(offset + len(content))
+
+    metadata = {
+        'version': flat_outline.version,
+        'head_fields': head_fields,
+        'node_count': len(flat_outline),
+        'string_columns': list(string_columns),
+        'tag_parses': tag_parses,
+        'sections': relative_sections,
+    }
+    header_length = 0
+    while True:
+        metadata['sections'] = {
+            name: [header_length + relative_offset, length]
+            for name, (relative_offset, length) in relative_sections.items()
+        }
+        encoded_metadata = json.dumps(metadata).encode('utf-8')
+        required_length = _align(len(snapshot_magic) + 8 + len(encoded_metadata))
+        if required_length == header_length:
+            break
+        header_length = required_length
+
+    # Write to a temporary file in the same directory and rename it into place, so that the snapshot at the path is
+    # always complete, and a process which has the previous snapshot mapped keeps its (unchanged) copy.
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as snapshot_file:
+            snapshot_file.write(snapshot_magic)
+            snapshot_file.write(snapshot_format_version.to_bytes(4, 'little'))
+            snapshot_file.write(len(encoded_metadata).to_bytes(4, 'little'))
+            snapshot_file.write(encoded_metadata)
+            _pad(snapshot_file)
+            for _, content in section_bytes:
+                snapshot_file.write(content)
+                _pad(snapshot_file)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def open_flat_outline_snapshot(path):
+    """
+    Memory-maps a snapshot written by write_flat_outline_snapshot and returns a FlatOutline which reads it in place.
+    The file is kept mapped for as long as the FlatOutline (or any of its nodes) is in use, or until
+    FlatOutline.close is called.
+
+    :param path:
+    :return: FlatOutline.
+    """
+    with open(path, 'rb') as snapshot_file:
+        mapped_file = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+    buffer = memoryview(mapped_file)
+    # Every view onto the mapping, so that FlatOutline.close can release them before closing it.
+    views = [buffer]
+
+    if bytes(buffer[:len(snapshot_magic)]) != snapshot_magic:
+        raise ValueError(f'{path} is not a flat outline snapshot')
+    position = len(snapshot_magic)
+    format_version = int.from_bytes(buffer[position:position + 4], 'little')
+    if format_version != snapshot_format_version:
+        raise ValueError(f'Flat outline snapshot version {format_version} not supported')
+    metadata_length = int.from_bytes(buffer[position + 4:position + 8], 'little')
+    metadata = json.loads(str(buffer[position + 8:position + 8 + metadata_length], 'utf-8'))
+
+    sections = metadata['sections']
+
+    def section(name, typecode=None):
+        offset, length = sections[name]
+        view = buffer[offset:offset + length]
+        views.append(view)
+        if typecode is None:
+            return view
+        if _byteswap_needed:
+            values = array(typecode)
+            values.frombytes(view)
+            values.byteswap()
+            return values
+        views.append(view.cast(typecode))
+        return views[-1]
+
+    heap = section('heap')
+    string_columns = {
+        column_name: SnapshotStringColumn(heap, section(column_name + '.starts', 'q'),
+                                          section(column_name + '.lengths', 'I'))
+        for column_name in metadata['string_columns']
+    }
+    tag_parse_cache = {
+        (tag_parse['field'], tuple(tag_parse['delimiters'])): (string_columns[tag_parse['text_column']],
+                                                                string_columns[tag_parse['tag_column']])
+        for tag_parse in metadata['tag_parses']
+    }
+
+    flat_outline = FlatOutline(
+        *(section(name, 'i') for name in structure_array_names),
+        string_columns['text'], string_columns['note'],
+        head_fields=metadata['head_fields'], version=metadata['version'], tag_parse_cache=tag_parse_cache
+    )
+    flat_outline.snapshot_buffer = mapped_file
+    flat_outline.snapshot_views = views
+    return flat_outline
+
+
+def _align(offset):
+    return (offset + 7) // 8 * 8
+
+
+def _pad(snapshot_file):
+    snapshot_file.write(bytes(_align(snapshot_file.tell()) - snapshot_file.tell()))
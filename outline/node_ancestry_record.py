@@ -11,7 +11,15 @@ class NodeAncestryRecord:
 
         'Find all the nodes which have a text value of 'XXX' at level 2 and a
         tag of "YYY" in the node itself.'
+
+    The ancestry is held as a chain of records, each of which holds the
+    NodeAncestryItem for its own generation and a reference to the record for
+    its parent.  Records for sibling nodes therefore share the record for their
+    parent rather than each holding a copy of the whole ancestry, so creating the
+    record for a child is a single small allocation however deep the node is.
     """
+    __slots__ = ('parent_record', 'item', '_length')
+
     def __init__(self, node_ancestry_item_list: List):
         """
 
@@ -19,26 +27,68 @@ class NodeAncestryRecord:
                include the child_number of the node at that generation, and the
                node itself.
         """
-        """Stores
+        parent_record = None
+        for item in node_ancestry_item_list[:-1]:
+            parent_record = NodeAncestryRecord._link(parent_record, item)
 
-        Args:
-            node_ancestry_item_list 
+        self.parent_record = parent_record
+        self.item = node_ancestry_item_list[-1] if len(node_ancestry_item_list) > 0 else None
+        self._length = len(node_ancestry_item_list)
+
+    @classmethod
+    def _link(cls, parent_record, node_ancestry_item):
         """
-        self.node_ancestry_item_list = node_ancestry_item_list
+        Creates a record for a node from the record for its parent without going through __init__.
+
+        :param parent_record: Record for the parent of the node (None if the node is the root).
+        :param node_ancestry_item:
+        :return:
+        """
+        record = cls.__new__(cls)
+        record.parent_record = parent_record
+        record.item = node_ancestry_item
+        record._length = 1 if parent_record is None else parent_record._length + 1
+        return record
 
     @property
     def depth(self):
-        return len(self.node_ancestry_item_list) - 1  # Depth starts from zero for the root node.
+        return self._length - 1  # Depth starts from zero for the root node.
+
+    @property
+    def node_ancestry_item_list(self):
+        return list(self)
 
     def __len__(self):
-        return len(self.node_ancestry_item_list)
+        return self._length
+
+    def __iter__(self):
+        """
+        Iterates through the items from the root down to this node.
+        """
+        items = []
+        record = self
+        while record is not None and record._length > 0:
+            items.append(record.item)
+            record = record.parent_record
+        return reversed(items)
 
     def __getitem__(self, item):
         """
         Args:
             item:
         """
-        return self.node_ancestry_item_list[item]
+        if isinstance(item, slice):
+            return list(self)[item]
+
+        index = item + self._length if item < 0 else item
+        if index < 0 or index >= self._length:
+            raise IndexError('ancestry index out of range')
+
+        # Walk back up the chain from this node to the requested generation.
+        record = self
+        for _ in range(self._length - 1 - index):
+            record = record.parent_record
+        return record.item
 
     def __eq__(self, other):
         if not isinstance(other, NodeAncestryRecord):
@@ -58,39 +108,54 @@ class NodeAncestryRecord:
 
     def __copy__(self):
         """When creating a list of all nodes in an outline (for example) we need
-        to be able to copy the node_ancestry_item_list at one level to pass recursively to
-        the next level in the node tree. But we don't want to duplicate the
+        to be able to copy the ancestry at one level to pass recursively to the
+        next level in the node tree. But we don't want to duplicate the
         ElementTree.Element objects as these determine when two nodes are
         identical. So deepcopy won't work.
 
-        This will create a new NodeAncestry object with a new list of
-        NodeAncestryItems which are references to the same NodeAncestryItems
-        from the source object.
+        As the parent records are never changed once created, the copy can share
+        them, so only the record for this generation is duplicated.
         """
+        record = NodeAncestryRecord.__new__(NodeAncestryRecord)
+        record.parent_record = self.parent_record
+        record.item = self.item
+        record._length = self._length
+        return record
 
-        new_node_ancestry_list = []
-        for item in self.node_ancestry_item_list:
-            new_node_ancestry_list.append(item)
-        return NodeAncestryRecord(new_node_ancestry_list)
+    def create_child_record(self, node_ancestry_item):
+        """
+        Creates the record for a child of the node this is the ancestry of, sharing this record as its parent.
+
+        Args:
+            node_ancestry_item: NodeAncestryItem for the child node.
+        """
+        if self._length == 0:
+            return NodeAncestryRecord._link(None, node_ancestry_item)
+        return NodeAncestryRecord._link(self, node_ancestry_item)
 
     def append_node_to_ancestry(self, node_ancestry_item):
         """
         Args:
             node_ancestry_item:
         """
-        self.node_ancestry_item_list.append(node_ancestry_item)
+        if self._length > 0:
+            # Move the current generation into a new parent record so that any records sharing the existing chain
+            # are unaffected.
+            self.parent_record = NodeAncestryRecord._link(self.parent_record, self.item)
+        self.item = node_ancestry_item
+        self._length += 1
 
     def node(self):
         """Extracts the node for which this ancestry is the ancestry of and
         returns it.
         """
-        if len(self.node_ancestry_item_list) == 0:
+        if self._length == 0:
             return None
         else:
-            return self[-1].node
+            return self.item.node
 
     def child_ancestry(self):
-        child_ancestry = [item.child_number for item in self.node_ancestry_item_list]
+        child_ancestry = [item.child_number for item in self]
 
         # Don't include the root node in the child_ancestry
         return tuple(child_ancestry[1:])
@@ -0,0 +1,55 @@
+"""
+Cache of the wrapper objects (OutlineNode and similar) created for the nodes of an outline, so that each node is
+represented by a single wrapper object rather than a new one being created on every access.
+
+Wrappers are held weakly, so a wrapper stays in the cache for as long as something else refers to it and is then
+discarded.  While a wrapper is in use, every access to its node returns that same wrapper, so wrappers can be compared
+with 'is', and repeated access (for example while matching criteria against the ancestry of a node) doesn't allocate.
+
+The cache is keyed by the element (or other identifier) of the node, combined with a variant key where more than one
+kind of wrapper is needed for the same node (for example UnleashedOutlineNodes with different tag delimiters).
+
+The cache may be shared by several threads reading the same outline, so access to it is serialised with a lock.  The
+lock isn't held while a wrapper is created; if two threads create a wrapper for the same node at once, the first to
+be added is kept and returned to both, so there is still only one wrapper per node.
+"""
+import threading
+import weakref
+
+
+class NodeWrapperCache:
+    def __init__(self):
+        self._wrappers = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def get_wrapper(self, key, factory, *factory_args):
+        """
+        Gets the wrapper for the supplied key, creating it by calling factory(*factory_args) if there isn't one.
+
+        :param key: Hashable key identifying the node (and variant of wrapper).
+        :param factory: Callable which creates the wrapper.
+        :param factory_args: Arguments to pass to factory.
+        :return:
+        """
+        with self._lock:
+            wrapper = self._wrappers.get(key)
+        if wrapper is None:
+            new_wrapper = factory(*factory_args)
+            with self._lock:
+                wrapper = self._wrappers.setdefault(key, new_wrapper)
+        return wrapper
+
+    def add_wrapper(self, key, wrapper):
+        """
+        Adds a wrapper which has been created elsewhere, unless there is already one for the key.
+
+        :param key:
+        :param wrapper:
+        :return:
+        """
+        with self._lock:
+            self._wrappers.setdefault(key, wrapper)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._wrappers)
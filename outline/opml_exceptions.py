@@ -16,3 +16,7 @@ class MissingOpmlAttribute(Exception):
 
 class InvalidOpmlAttribute(Exception):
     pass
+
+
+class DuplicateSubtreeName(Exception):
+    pass
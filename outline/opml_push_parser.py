@@ -0,0 +1,128 @@
+"""
+Incremental (push) parser for OPML, for outlines which arrive a piece at a time, for example over a socket or pipe.
+
+Outline.from_opml needs the whole file and Outline.iter_opml pulls from a file, so neither can be used where the data
+is pushed to the reader as it arrives.  OpmlPushParser is fed the bytes of the document as they arrive (feed) and
+returns each top level outline element, with its complete sub-tree, as soon as its end tag has been read.  Once a
+sub-tree has been returned it is detached from the parsed document, so the parser never holds more than the top
+level sub-tree currently being read.
+
+aiter_opml_subtrees wraps the parser for asyncio, reading from an asyncio.StreamReader.
+"""
+from xml.etree import ElementTree
+
+import outline.opml_exceptions as ex
+from outline import outline_utilities as outil
+from outline.outline_node import OutlineNode
+from outline.outline_node_definition import outline_node_structures as ods
+
+head_field_names = tuple(ods['head']['child_elements'])
+
+# Number of bytes to read from a stream at a time.
+default_read_size = 64 * 1024
+
+
+class OpmlPushParser:
+    def __init__(self, full_validate=False):
+        """
+        :param full_validate: If set, validate the attributes of each outline element as it is read (the equivalent
+                              of the full_validate option on Outline.from_opml).
+        """
+        self.full_validate = full_validate
+
+        # Outline level fields (title, dateCreated etc), available once the head has been read.
+        self.version = None
+        self.head_fields = {}
+
+        self._parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        self._element_stack = []  # Elements (from the opml element down) which are currently open.
+        self._body = None
+        self._body_count = 0
+        self._top_level_count = 0
+
+    def feed(self, data):
+        """
+        Parses the next piece of the document.
+
+        :param data: bytes (or str) of any length, continuing from the previous call.
+        :return: List of (child number, OutlineNode) for each top level outline element completed by this data, in
+                 document order.
+        """
+        self._parser.feed(data)
+        return self._process_events()
+
+    def close(self):
+        """
+        Indicates the end of the document, checking that it was complete and well formed.
+
+        :return: List of (child number, OutlineNode) for any remaining top level outline elements.
+        """
+        self._parser.close()
+        subtrees = self._process_events()
+
+        if self._body_count == 0:
+            raise ex.MalformedOutline('Should be only one body element but 0 were found')
+        if self._top_level_count == 0:
+            raise ex.MalformedOutline(f'No <outline> node under <body> element.')
+        return subtrees
+
+    def _process_events(self):
+        subtrees = []
+        element_stack = self._element_stack
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                if len(element_stack) == 0 and element.tag == 'opml':
+                    self.version = outil.get_valid_attribute(element, 'version')
+                    if self.version != '2.0':
+                        raise ex.InvalidOpmlVersion(f'Version is {self.version} must be 2.0')
+                elif len(element_stack) == 1 and element.tag == 'body':
+                    self._body_count += 1
+                    if self._body_count > 1:
+                        raise ex.MalformedOutline(
+                            f'Should be only one body element but {self._body_count} were found')
+                    self._body = element
+                elif self._body is not None and len(element_stack) >= 2 and element_stack[1] is self._body:
+                    outil.is_valid_tag(element)
+                    if self.full_validate is True:
+                        outil.validate_attributes(element)
+                element_stack.append(element)
+            else:
+                element_stack.pop()
+                if len(element_stack) == 1 and element.tag == 'head':
+                    self.head_fields = {
+                        field_name: outil.get_valid_element_value(element, field_name)
+                        for field_name in head_field_names
+                    }
+                elif len(element_stack) == 2 and element_stack[1] is self._body:
+                    # A top level outline element is complete, so pass it on and detach it from the body.
+                    self._top_level_count += 1
+                    subtrees.append((self._top_level_count, OutlineNode(element)))
+                    self._body.remove(element)
+
+        return subtrees
+
+
+async def aiter_opml_subtrees(stream_reader, full_validate=False, read_size=default_read_size):
+    """
+    Asynchronous generator of (child number, OutlineNode) for each top level outline element of an OPML document
+    read from an asyncio.StreamReader, as soon as each one is complete.
+
+    Data is only read from the stream when the consumer asks for the next sub-tree and the sub-trees already read
+    have been consumed, so a slow consumer leaves unread data in the stream, whose buffer limit then pauses the
+    underlying transport (backpressure) rather than the document building up in memory.
+
+    :param stream_reader: asyncio.StreamReader (or anything with a compatible read coroutine).
+    :param full_validate: As for OpmlPushParser.
+    :param read_size: Maximum number of bytes to read from the stream at a time.
+    :return:
+    """
+    parser = OpmlPushParser(full_validate=full_validate)
+    while True:
+        data = await stream_reader.read(read_size)
+        if len(data) == 0:
+            break
+        for subtree in parser.feed(data):
+            yield subtree
+
+    for subtree in parser.close():
+        yield subtree
@@ -1,11 +1,15 @@
 import copy
+import os
 
 import outline.opml_exceptions as ex
 from xml.etree import ElementTree
 from outline import outline_utilities as outil
+from outline.node_ancestry_item import NodeAncestryItem
+from outline.node_ancestry_record import NodeAncestryRecord
 from outline.outline_node import OutlineNode
 from outline.outline_node_definition import outline_identity, outline_int, outline_list
 from outline.outline_utilities import is_valid_tag, value_serialize
+from outline import subtree_index
 
 
 class Outline:
@@ -112,7 +116,20 @@ class Outline:
             return top_outline, head, root
 
     @classmethod
-    def from_opml(cls, opml_path: str, full_validate=False):
+    def from_opml(cls, opml_path: str, full_validate=False, cache=None):
+        """
+        Creates an Outline from an OPML file.
+
+        :param opml_path: Path of OPML file (or file object).
+        :param full_validate:
+        :param cache: Optional OutlineCache.  If supplied (and opml_path is a path), the outline is re-built from the
+                      snapshot in the cache if the file has been read before and hasn't changed since, without parsing
+                      the file, and is otherwise parsed and added to the cache.
+        :return:
+        """
+        if cache is not None and isinstance(opml_path, (str, os.PathLike)):
+            return cls(*cache.get_opml_tree(opml_path), full_validate=full_validate)
+
         outline = ElementTree.parse(opml_path)
 
         return cls(*Outline.initialise_opml_tree(outline), full_validate=full_validate)
@@ -158,6 +175,106 @@ class Outline:
         root = ElementTree.ElementTree(opml)
         return cls(*Outline.initialise_opml_tree(root))
 
+    @staticmethod
+    def iter_opml(opml_path, full_validate=False):
+        """
+        Streaming alternative to from_opml().iter_nodes() for OPML files which are too large to hold comfortably in
+        memory.
+
+        The file is read using iterparse and a NodeAncestryRecord is yielded for each node, in the same (document)
+        order and with the same shape as iter_nodes() on an Outline created from the same file.  That is, the
+        first record is for a synthetic top node (text of '') which stands in for the body element, and the top level
+        outline elements are its children.
+
+        Records are yielded when the start tag of an outline element has been read, so the node's text and note are
+        available but its children may not be (they will be yielded as subsequent records).  Once the end tag of an
+        element has been read, the element is detached from its parent so that the parsed tree never holds much more
+        than the current branch of the outline.  Peak memory is therefore bounded by the depth of the outline rather
+        than by the number of nodes.  Callers which hold onto a record can still read the text and note of its nodes,
+        but shouldn't try to navigate to children through them.
+
+        Because the file isn't read in full before nodes are yielded, an error in the structure of the outline is
+        raised when it is encountered, which may be after some records have been yielded.
+
+        :param opml_path: Path of OPML file (or file object) to read.
+        :param full_validate: If set, validate the attributes of each outline element as it is read (the equivalent
+                              of the full_validate option on from_opml).
+        :return:
+        """
+        ancestry_stack = []  # One [record, number of children so far] entry per open generation below the body.
+        element_stack = []  # The elements (from the opml element down) which are currently open.
+        body_count = 0
+        outline_count = 0
+
+        for event, element in ElementTree.iterparse(opml_path, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == 'opml' and len(element_stack) == 0:
+                    version = outil.get_valid_attribute(element, 'version')
+                    if version != '2.0':
+                        raise ex.InvalidOpmlVersion(f'Version is {version} must be 2.0')
+                elif element.tag == 'body' and len(element_stack) == 1:
+                    body_count += 1
+                    if body_count > 1:
+                        raise ex.MalformedOutline(f'Should be only one body element but {body_count} were found')
+
+                    # Equivalent of the outline element which initialise_opml_tree creates to hold the body contents.
+                    top_outline = ElementTree.Element('outline')
+                    top_outline.set('text', '')
+                    top_outline_node = OutlineNode(top_outline)
+                    node_cache = top_outline_node._node_cache
+                    top_record = NodeAncestryRecord([NodeAncestryItem(None, top_outline_node)])
+                    ancestry_stack.append([top_record, 0])
+                    yield top_record
+                elif len(ancestry_stack) > 0:
+                    # We are within the body so this should be an outline element.
+                    is_valid_tag(element)
+                    if full_validate is True:
+                        outil.validate_attributes(element)
+                    parent_entry = ancestry_stack[-1]
+                    parent_entry[1] += 1
+                    if len(ancestry_stack) == 1:
+                        outline_count += 1
+
+                    outline_node = OutlineNode.for_element(element, node_cache)
+                    record = parent_entry[0].create_child_record(NodeAncestryItem(parent_entry[1], outline_node))
+                    ancestry_stack.append([record, 0])
+                    yield record
+                element_stack.append(element)
+            else:
+                element_stack.pop()
+                if len(ancestry_stack) > 0:
+                    ancestry_stack.pop()
+                    if len(ancestry_stack) == 0 and outline_count == 0:
+                        raise ex.MalformedOutline(f'No <outline> node under <body> element.')
+
+                # Everything below this element has already been processed and detached, so detach the element from
+                # its parent (which will hold no other children by now) to free the memory.
+                if len(element_stack) > 0:
+                    element_stack[-1].remove(element)
+
+        if body_count == 0:
+            raise ex.MalformedOutline('Should be only one body element but 0 were found')
+
+    @staticmethod
+    def load_subtree(opml_path, node_path, full_validate=False):
+        """
+        Reads and parses just the sub-tree of an OPML file headed by the node with the supplied child ancestry (as
+        returned by NodeAncestryRecord.child_ancestry), rather than the whole file.
+
+        The position of each sub-tree in the file is found from an index held in a sidecar file next to the OPML
+        file, which is built in a single streaming pass the first time it is needed, and re-built if the file
+        changes (see subtree_index).
+
+        :param opml_path: Path of OPML file.
+        :param node_path: Child ancestry tuple, eg (2, 1) for the first child of the second top level node.
+        :param full_validate: If set, validate the attributes of each outline element of the sub-tree.
+        :return: OutlineNode at the root of the sub-tree.
+        """
+        outline_node = subtree_index.load_subtree(opml_path, node_path=node_path)
+        if full_validate is True:
+            outline_node.validate(full_validation_flag=full_validate)
+        return outline_node
+
     def create_opml_tree_structure(self):
         """
         Does the opposite of initialise_opml_tree.  Creates the top opml node with a head and body underneath.
@@ -0,0 +1,398 @@
+"""
+Persistent on-disk cache of parsed OPML files.
+
+Reading an OPML file means parsing the XML and then re-arranging the tree (initialise_opml_tree) before the Outline
+can be created.  Where the same files are read again and again, an OutlineCache can be passed to Outline.from_opml,
+so that the parsed outline is saved as a compact binary snapshot in a cache directory the first time a file is read,
+and later reads of an unchanged file rebuild the outline from the snapshot without parsing any XML.
+
+The snapshot holds the attributes of the opml element, the child elements of the head (tag and text) and the
+attributes of every outline element (including the synthetic top element added by initialise_opml_tree), with the
+parent of each element so that the tree can be rebuilt in a single pass.  Strings are held once in a string table and
+referenced by position, so repeated values cost one integer each, and the attribute names are held once for each
+distinct set of names (usually just text and _note).  Only the
+content of the outline is kept, not the layout of the file (whitespace between elements), so writing out an outline
+read from the cache gives the same OPML content as one read from the file, but not necessarily the same layout.
+
+Snapshots are keyed by a hash of the content of the file, so identical files share a snapshot and any change to a
+file gives a new one.  To avoid reading and hashing an unchanged file, there is also a small index entry for each
+file keyed by its path, size and modification time, which records the hash of the content that was read.  If the file
+has been changed its size or modification time will have changed, so the index entry won't be found and the file is
+read and hashed.
+
+Entries are written to a temporary file which is then renamed into place, so a reader never sees a partly written
+entry, even if the writer is interrupted or another process is writing the same entry.  Each snapshot also holds a
+checksum of its contents; a snapshot which can't be read or doesn't match its checksum is discarded and the file is
+parsed instead.
+
+When the total size of the snapshots goes over the size limit for the cache, the least recently used snapshots are
+removed until it is back within the limit, along with any index entries which no longer refer to a snapshot.
+"""
+import gc
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from collections import deque
+from itertools import repeat
+from xml.etree import ElementTree
+
+snapshot_magic = b'OPMLSNAP'
+snapshot_format_version = 1
+snapshot_suffix = '.snapshot'
+index_suffix = '.index'
+
+# Magic, format version and checksum of the payload, then the payload: lengths of the string table (in bytes) and
+# the integer table (in entries).
+_header_struct = struct.Struct('<8sII')
+_lengths_struct = struct.Struct('<QQ')
+
+# Stands in for a string which isn't present (for example an empty head element, whose text is None).
+_no_string = 0xFFFFFFFF
+
+
+class OutlineCache:
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        """
+        :param directory: Directory to hold the cache (created if it doesn't exist).  Several processes can share
+                          the same directory.
+        :param max_size: Maximum total size in bytes of the snapshots held.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_opml_tree(self, opml_path):
+        """
+        Gets the (top outline element, head element, root element) for an OPML file, as returned by
+        Outline.initialise_opml_tree, from the cache if possible, otherwise by parsing the file and adding it to the
+        cache.
+
+        :param opml_path: Path of OPML file.
+        :return:
+        """
+        # Imported here as Outline uses the cache.
+        from outline.outline import Outline
+
+        stat = os.stat(opml_path)
+        index_path = self._index_path(opml_path, stat)
+        content_hash = _read_index_entry(index_path)
+        if content_hash is not None:
+            opml_tree = self._load_snapshot(content_hash)
+            if opml_tree is not None:
+                return opml_tree
+
+        with open(opml_path, 'rb') as opml_file:
+            content = opml_file.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        opml_tree = self._load_snapshot(content_hash)
+        if opml_tree is None:
+            root = ElementTree.fromstring(content)
+            opml_tree = Outline.initialise_opml_tree(ElementTree.ElementTree(root))
+            self._write_entry(self._snapshot_path(content_hash), encode_snapshot(*opml_tree))
+            self._write_entry(index_path, content_hash.encode('ascii'))
+            self._evict()
+        else:
+            self._write_entry(index_path, content_hash.encode('ascii'))
+        return opml_tree
+
+    def size(self):
+        """
+        Total size in bytes of the snapshots in the cache.
+
+        :return:
+        """
+        return sum(size for _, size, _ in self._list_snapshots())
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+
+        :return:
+        """
+        for entry_name in os.listdir(self.directory):
+            if entry_name.endswith(snapshot_suffix) or entry_name.endswith(index_suffix):
+                _remove(os.path.join(self.directory, entry_name))
+
+    def _index_path(self, opml_path, stat):
+        index_key = f'{os.path.realpath(opml_path)}\0{stat.st_size}\0{stat.st_mtime_ns}'
+        index_hash = hashlib.sha256(index_key.encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self.directory, index_hash + index_suffix)
+
+    def _snapshot_path(self, content_hash):
+        return os.path.join(self.directory, content_hash + snapshot_suffix)
+
+    def _load_snapshot(self, content_hash):
+        snapshot_path = self._snapshot_path(content_hash)
+        try:
+            with open(snapshot_path, 'rb') as snapshot_file:
+                snapshot = snapshot_file.read()
+        except OSError:
+            return None
+
+        try:
+            opml_tree = decode_snapshot(snapshot)
+        except (ValueError, IndexError, struct.error, UnicodeDecodeError):
+            # Damaged or from an incompatible version, so discard it and parse the file instead.
+            _remove(snapshot_path)
+            return None
+
+        # The modification time of a snapshot records when it was last used, for eviction.
+        try:
+            os.utime(snapshot_path)
+        except OSError:
+            pass
+        return opml_tree
+
+    def _write_entry(self, entry_path, content):
+        """
+        Writes an entry to a temporary file in the cache directory then renames it into place, so that the entry is
+        either complete or not there at all.
+        """
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as entry_file:
+                entry_file.write(content)
+                entry_file.flush()
+                os.fsync(entry_file.fileno())
+            os.replace(temporary_path, entry_path)
+        except BaseException:
+            _remove(temporary_path)
+            raise
+
+    def _list_snapshots(self):
+        """
+        List of (path, size, last used time) for each snapshot in the cache.
+        """
+        snapshots = []
+        for entry_name in os.listdir(self.directory):
+            if entry_name.endswith(snapshot_suffix):
+                entry_path = os.path.join(self.directory, entry_name)
+                try:
+                    stat = os.stat(entry_path)
+                except OSError:
+                    continue  # Removed by another process.
+                snapshots.append((entry_path, stat.st_size, stat.st_mtime_ns))
+        return snapshots
+
+    def _evict(self):
+        """
+        Removes the least recently used snapshots until the total size is within max_size, along with the index
+        entries which refer to them.
+        """
+        snapshots = self._list_snapshots()
+        total_size = sum(size for _, size, _ in snapshots)
+        removed = False
+        for entry_path, size, _ in sorted(snapshots, key=lambda snapshot: snapshot[2]):
+            if total_size <= self.max_size:
+                break
+            _remove(entry_path)
+            total_size -= size
+            removed = True
+
+        if removed:
+            self._remove_orphaned_index_entries()
+
+    def _remove_orphaned_index_entries(self):
+        """
+        Removes index entries which don't refer to a snapshot in the cache (because it has been evicted or discarded,
+        possibly by another process), so that index entries don't build up as snapshots come and go.
+        """
+        entry_names = os.listdir(self.directory)
+        snapshot_names = {entry_name for entry_name in entry_names if entry_name.endswith(snapshot_suffix)}
+        for entry_name in entry_names:
+            if entry_name.endswith(index_suffix):
+                index_path = os.path.join(self.directory, entry_name)
+                content_hash = _read_index_entry(index_path)
+                if content_hash is None or content_hash + snapshot_suffix not in snapshot_names:
+                    _remove(index_path)
+
+
+def encode_snapshot(top_outline, head, root):
+    """
+    Encodes the tree returned by Outline.initialise_opml_tree as a snapshot.
+
+    :param top_outline: Outline element holding the top level outline elements.
+    :param head: Head element (or None).
+    :param root: Root (opml) element.
+    :return: bytes.
+    """
+    strings = []
+    string_positions = {}
+
+    def string_position(string):
+        if string is None:
+            return _no_string
+        position = string_positions.get(string)
+        if position is None:
+            position = len(strings)
+            string_positions[string] = position
+            strings.append(string)
+        return position
+
+    integers = array('I')
+    integers.append(len(root.attrib))
+    for name, value in root.attrib.items():
+        integers.append(string_position(name))
+        integers.append(string_position(value))
+
+    if head is None:
+        integers.append(_no_string)
+    else:
+        integers.append(len(head))
+        for head_element in head:
+            integers.append(string_position(head_element.tag))
+            integers.append(string_position(head_element.text))
+
+    # Outline elements in document order.  Each has a parent (its position in the same order) and a shape (the
+    # attribute names it has, which are nearly always the same for every element), and the values of its attributes.
+    parents = array('I')
+    shapes = array('I')
+    values = array('I')
+    shape_positions = {}
+    stack = [(top_outline, 0)]
+    while len(stack) > 0:
+        element, parent = stack.pop()
+        index = len(parents)
+        parents.append(parent)
+
+        names = tuple(element.attrib)
+        shape = shape_positions.get(names)
+        if shape is None:
+            shape = len(shape_positions)
+            shape_positions[names] = shape
+        shapes.append(shape)
+        values.extend(string_position(value) for value in element.attrib.values())
+
+        for child in reversed(element):
+            stack.append((child, index))
+
+    integers.append(len(shape_positions))
+    for names in shape_positions:
+        integers.append(len(names))
+        integers.extend(string_position(name) for name in names)
+
+    integers.append(len(parents))
+    integers.append(len(values))
+    integers.extend(parents)
+    integers.extend(shapes)
+    integers.extend(values)
+
+    if sys.byteorder != 'little':
+        integers.byteswap()
+    string_table = '\0'.join(strings).encode('utf-8')
+    payload = _lengths_struct.pack(len(string_table), len(integers)) + string_table + integers.tobytes()
+
+    return _header_struct.pack(snapshot_magic, snapshot_format_version, zlib.crc32(payload)) + payload
+
+
+def decode_snapshot(snapshot):
+    """
+    Rebuilds the tree encoded by encode_snapshot.
+
+    The outline elements are created and added to their parents using map over the tables of the snapshot rather
+    than one at a time, which is what makes this quicker than parsing the XML.
+
+    :param snapshot: bytes.
+    :return: Tuple of (top outline element, head element, root element) as returned by
+             Outline.initialise_opml_tree.
+    """
+    magic, format_version, checksum = _header_struct.unpack_from(snapshot)
+    if magic != snapshot_magic or format_version != snapshot_format_version:
+        raise ValueError('Not an outline snapshot of a supported version')
+    payload = memoryview(snapshot)[_header_struct.size:]
+    if zlib.crc32(payload) != checksum:
+        raise ValueError('Outline snapshot checksum does not match')
+
+    string_table_length, integer_count = _lengths_struct.unpack_from(payload)
+    string_table_end = _lengths_struct.size + string_table_length
+    strings = bytes(payload[_lengths_struct.size:string_table_end]).decode('utf-8').split('\0')
+    integers = array('I')
+    integers.frombytes(payload[string_table_end:])
+    if sys.byteorder != 'little':
+        integers.byteswap()
+    if len(integers) != integer_count:
+        raise ValueError('Outline snapshot is truncated')
+
+    root_attribute_count = integers[0]
+    position = 1 + 2 * root_attribute_count
+    root_attributes = integers[1:position]
+    root = ElementTree.Element('opml', dict(zip(map(strings.__getitem__, root_attributes[0::2]),
+                                                map(strings.__getitem__, root_attributes[1::2]))))
+
+    head_element_count = integers[position]
+    position += 1
+    head = None
+    if head_element_count != _no_string:
+        head = ElementTree.SubElement(root, 'head')
+        for _ in range(head_element_count):
+            head_element = ElementTree.SubElement(head, strings[integers[position]])
+            text_position = integers[position + 1]
+            head_element.text = None if text_position == _no_string else strings[text_position]
+            position += 2
+
+    shape_count = integers[position]
+    position += 1
+    shape_names = []
+    for _ in range(shape_count):
+        name_count = integers[position]
+        shape_names.append(tuple(map(strings.__getitem__, integers[position + 1:position + 1 + name_count])))
+        position += 1 + name_count
+
+    node_count, value_count = integers[position], integers[position + 1]
+    position += 2
+    parents = integers[position:position + node_count]
+    shapes = integers[position + node_count:position + 2 * node_count]
+    values = integers[position + 2 * node_count:position + 2 * node_count + value_count]
+    if node_count == 0 or len(values) != value_count or position + 2 * node_count + value_count != len(integers):
+        raise ValueError('Outline snapshot is inconsistent')
+
+    # Nothing created here can be part of a reference cycle, so garbage collection passes triggered by creating so
+    # many objects would just slow things down.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # Each element takes as many values as its shape has names (zip stops at the end of the names, before taking
+        # a value for the next element).
+        value_iterator = map(strings.__getitem__, values)
+        attributes = [dict(zip(shape_names[shape], value_iterator)) for shape in shapes]
+        elements = list(map(ElementTree.Element, repeat('outline', node_count), attributes))
+
+        # Parents come before their children, and children are in document order, so appending each element to its
+        # parent in order re-builds the tree.
+        deque(map(ElementTree.Element.append, map(elements.__getitem__, parents[1:]), elements[1:]), maxlen=0)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # initialise_opml_tree adds the top level outline elements to the top outline element and nothing reads them
+    # through the body after that, so the body is rebuilt empty.
+    ElementTree.SubElement(root, 'body')
+
+    return elements[0], head, root
+
+
+def _read_index_entry(index_path):
+    """
+    The content hash recorded in an index entry, or None if there isn't a (valid) entry.
+    """
+    try:
+        with open(index_path, 'rb') as index_file:
+            content_hash = index_file.read().decode('ascii')
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    if len(content_hash) != 64 or any(character not in '0123456789abcdef' for character in content_hash):
+        return None
+    return content_hash
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -1,10 +1,13 @@
-import copy
-
 from xml.etree.ElementTree import Element, ElementTree
 from outline import outline_utilities as outil
-from outline.node_ancestry_item import NodeAncestryItem
 from outline.node_ancestry_record import NodeAncestryRecord
+from outline.node_wrapper_cache import NodeWrapperCache
 from outline.opml_exceptions import MalformedOutline
+from outline.outline_node_definition import outline_node_structures
+from outline.outline_traversal import iter_outline_nodes, count_outline_nodes
+
+# Value of the note of an outline element which doesn't have a _note attribute.
+_default_note = outline_node_structures['outline']['attributes']['_note'].default
 
 
 class OutlineNode:
@@ -23,10 +26,13 @@ class OutlineNode:
 
     NOTE: This implementation favours composition over extension, as the purpose of this implementation is to
     hide the complexity of generic XML nodes and just expose the simple interface required for an outline.
+
+    All the OutlineNodes for one outline share a NodeWrapperCache, so that accessing the same <outline> element
+    more than once gives the same OutlineNode (they pass the 'is' test) rather than a new wrapper each time.
     """
     _max_len_for_short = 15
 
-    def __init__(self, outline_node: Element):
+    def __init__(self, outline_node: Element, node_cache: NodeWrapperCache = None):
         """
         Do some checking that we have been passed in the right type of object (should be an xml.etree.Element
         object with tag of outline and a few other things.
@@ -36,6 +42,8 @@ class OutlineNode:
         Everything else is done through methods which expose the properties to the user from the node.
 
         :param outline_node: Element with tag <outline> which the OutlineNode will wrap.
+        :param node_cache: Cache of wrappers for the outline this node belongs to.  If not supplied a new cache is
+                           created, and this node becomes the wrapper for its element within it.
         """
 
         if outil.is_valid_tag(outline_node):
@@ -44,9 +52,37 @@ class OutlineNode:
         else:
             raise (MalformedOutline(f'Invalid element <{outline_node.tag}> in outline'))
 
+        if node_cache is None:
+            node_cache = NodeWrapperCache()
+            node_cache.add_wrapper(outline_node, self)
+        self._node_cache = node_cache
+
+    @classmethod
+    def for_element(cls, outline_node: Element, node_cache: NodeWrapperCache):
+        """
+        Gets the OutlineNode for the supplied element from the cache, creating it if there isn't one yet.
+
+        :param outline_node:
+        :param node_cache:
+        :return:
+        """
+        return node_cache.get_wrapper(outline_node, cls, outline_node, node_cache)
+
     def __getitem__(self, index):
-        return OutlineNode(self._node[index])
-        # ToDo: Identical <outline> nodes should return identical OutlineNodes (pass the 'is' test)
+        element = self._node[index]
+        return self._node_cache.get_wrapper(element, OutlineNode, element, self._node_cache)
+
+    def get_wrapper(self, variant, factory, *factory_args):
+        """
+        Gets a wrapper of a different kind for this node (for example an UnleashedOutlineNode) from the cache for
+        this outline, so that the same wrapper is re-used while it is still in use elsewhere.
+
+        :param variant: Hashable key distinguishing this kind of wrapper (and any configuration it depends on).
+        :param factory: Callable which creates the wrapper if there isn't one in the cache.
+        :param factory_args: Arguments to pass to factory.
+        :return:
+        """
+        return self._node_cache.get_wrapper((self._node, variant), factory, *factory_args)
 
     def __eq__(self, other: Element):
         if self._node is other._node:
@@ -121,36 +157,19 @@ class OutlineNode:
 
     def iter_nodes(self, ancestry: NodeAncestryRecord = None):
         """
-        Recursive generator which traverses the outline node tree in document order (depth first) and returns, for
-        each node, a NodeAncestryRecord object which includes a reference to the node, and a tuple representing its
+        Generator which traverses the outline node tree in document order (depth first) and returns, for each node,
+        a NodeAncestryRecord object which includes a reference to the node, and a tuple representing its
         child_number_ancestry (ie the list of child_numbers from root to the node, which uniquely determines the node's
         position in the tree.
 
-        Note that the yield happens at the beginning of the function.  This means that we are yielding what we have
-        been passed, not what we are generating in the function.
-
-        (This took a while for me to get my head round and is important to the understanding of the convoluted nature
-        of the recursion in the generator).
+        The traversal itself is carried out by outline_traversal.iter_outline_nodes, which keeps an explicit stack
+        of the generations it is part way through rather than recursing, so the cost of yielding a node doesn't
+        depend on its depth and there is no limit on the depth of outline which can be traversed.
 
-        When the generator reaches the leaf node of a given path, when the for loop is encountered, it will just fall
-        straight through, and return to the last call, having already yielded the value for this call.
-
-        On the first call, there is nothing to be passed in, so the generator creates a first node (bootstrapping
-        itself, so to speak).
-
-        :param ancestry:
+        :param ancestry: Ancestry record to use for this node.  If not supplied this node is treated as the root.
         :return:
         """
-        if ancestry is None:
-            ancestry_record = NodeAncestryRecord([NodeAncestryItem(None, self)])
-        else:
-            ancestry_record = ancestry
-            # node_ancestry_item_list = ancestry_record
-        yield ancestry_record
-        for child_number, a_child in enumerate(self):
-            next_gen_ancestry = copy.copy(ancestry_record)
-            next_gen_ancestry.append_node_to_ancestry(NodeAncestryItem(child_number + 1, a_child))
-            yield from a_child.iter_nodes(next_gen_ancestry)
+        return iter_outline_nodes(self, ancestry=ancestry)
 
     def list_nodes(self):
         return list(self.iter_nodes())
@@ -171,10 +190,7 @@ class OutlineNode:
                 return record
 
     def total_sub_nodes(self):
-        count = len(self) + 1
-        for node in self:
-            count += node.total_sub_nodes() - 1  # Need to compensate for adding 1 as it only applies to top node
-        return count
+        return count_outline_nodes(self)
 
     @property
     def text(self):
@@ -182,9 +198,16 @@ class OutlineNode:
         Access to the text attribute of an outline node. If a tag regex string has been defined then look for a tag
         and if there is one extract the tag before returning the remainder
 
+        The element was validated when this OutlineNode was created (it must be an outline element with a text
+        attribute), so the value can be read straight from the attributes.  Only if it isn't there (for example if
+        the element has been changed since) is the full validating accessor used, so that the same default or
+        exception results.
+
         :return: The text attribute of self.node
         """
-        field_text = outil.get_valid_attribute(self._node, 'text')
+        field_text = self._node.get('text')
+        if field_text is None:
+            field_text = outil.get_valid_attribute(self._node, 'text')
         return field_text
 
     @property
@@ -192,9 +215,15 @@ class OutlineNode:
         """
         Access to the text attribute of an outline node.
 
+        As for text, the value is read straight from the attributes of the (already validated) element.  Many
+        elements have no _note attribute, so its default is supplied directly rather than through the validating
+        accessor, which is only used if the attribute has been set to None.
+
         :return: The _note attribute of self.node
         """
-        field_note = outil.get_valid_attribute(self._node, '_note')
+        field_note = self._node.get('_note', _default_note)
+        if field_note is None:
+            field_note = outil.get_valid_attribute(self._node, '_note')
         return field_note
 
     def iter(self):
@@ -0,0 +1,143 @@
+"""
+Traversal of an outline node tree using an explicit stack (or queue) rather than recursion.
+
+A recursive generator passes every record it yields up through the chain of suspended generators above it, so
+yielding a node at depth d costs O(d), and a deep enough outline will exceed the recursion limit.  The functions here
+hold the traversal state in a list instead, so each node costs the same to yield regardless of depth, and there is no
+limit on depth.
+
+The traversal works with any node object which supports len() and iteration over its children (OutlineNode,
+FlatOutlineNode), and yields a NodeAncestryRecord for each node visited.
+
+Options:
+- order:     PREORDER (document order - the order used by iter_nodes), POSTORDER (each node after all of its
+             descendants) or BREADTH_FIRST (all nodes at one depth before any at the next).
+- max_depth: Nodes deeper than this (relative to the root of the traversal at depth 0) are not visited.
+- prune:     Function which is passed the NodeAncestryRecord for each node visited.  If it returns True, the
+             descendants of that node are not visited (the node itself still is).
+"""
+from collections import deque
+
+from outline.node_ancestry_item import NodeAncestryItem
+from outline.node_ancestry_record import NodeAncestryRecord
+
+PREORDER = 'preorder'
+POSTORDER = 'postorder'
+BREADTH_FIRST = 'breadth_first'
+
+
+def iter_outline_nodes(root_node, order=PREORDER, max_depth=None, prune=None, ancestry=None):
+    """
+    Generates a NodeAncestryRecord for each node in the sub-tree headed by root_node, in the requested order.
+
+    :param root_node: Node at the root of the traversal.
+    :param order: One of PREORDER, POSTORDER or BREADTH_FIRST.
+    :param max_depth: If supplied, nodes more than this many generations below root_node are not visited.
+    :param prune: If supplied, function taking a NodeAncestryRecord which returns True if the descendants of the
+                  node shouldn't be visited.
+    :param ancestry: If supplied, the NodeAncestryRecord to use for root_node, otherwise a record is created with
+                     root_node as the root of the ancestry.
+    :return:
+    """
+    if ancestry is None:
+        root_record = NodeAncestryRecord([NodeAncestryItem(None, root_node)])
+    else:
+        root_record = ancestry
+
+    if order == PREORDER:
+        return _iter_preorder(root_record, _descend_test(root_record, max_depth, prune))
+    elif order == POSTORDER:
+        return _iter_postorder(root_record, _descend_test(root_record, max_depth, prune))
+    elif order == BREADTH_FIRST:
+        return _iter_breadth_first(root_record, _descend_test(root_record, max_depth, prune))
+    else:
+        raise ValueError(f"Unrecognised traversal order {order}")
+
+
+def count_outline_nodes(root_node):
+    """
+    Number of nodes in the sub-tree headed by root_node, including root_node.
+
+    :param root_node:
+    :return:
+    """
+    count = 0
+    for _ in iter_outline_nodes(root_node):
+        count += 1
+    return count
+
+
+def _descend_test(root_record, max_depth, prune):
+    """
+    Creates the function used to decide whether to visit the children of a node, combining the max_depth and prune
+    options.
+
+    :return:
+    """
+    if max_depth is None and prune is None:
+        return None
+
+    root_depth = root_record.depth
+
+    def descend(record):
+        if max_depth is not None and record.depth - root_depth >= max_depth:
+            return False
+        if prune is not None and prune(record):
+            return False
+        return True
+
+    return descend
+
+
+def _child_records(parent_record):
+    """
+    Generates the record for each child of the node that parent_record is the ancestry of.
+    """
+    for child_number, child_node in enumerate(parent_record.node(), 1):
+        yield parent_record.create_child_record(NodeAncestryItem(child_number, child_node))
+
+
+def _iter_preorder(root_record, descend):
+    yield root_record
+    if descend is not None and not descend(root_record):
+        return
+
+    # Each entry on the stack is the (partly consumed) generator of children for one open generation.
+    stack = [_child_records(root_record)]
+    while len(stack) > 0:
+        record = next(stack[-1], None)
+        if record is None:
+            stack.pop()
+        else:
+            yield record
+            if descend is None or descend(record):
+                stack.append(_child_records(record))
+
+
+def _iter_postorder(root_record, descend):
+    if descend is not None and not descend(root_record):
+        yield root_record
+        return
+
+    # Each entry on the stack is a record together with the (partly consumed) generator of its children.  A record
+    # is yielded once all of its children have been.
+    stack = [(root_record, _child_records(root_record))]
+    while len(stack) > 0:
+        parent_record, children = stack[-1]
+        record = next(children, None)
+        if record is None:
+            stack.pop()
+            yield parent_record
+        elif descend is None or descend(record):
+            stack.append((record, _child_records(record)))
+        else:
+            yield record
+
+
+def _iter_breadth_first(root_record, descend):
+    queue = deque([root_record])
+    while len(queue) > 0:
+        record = queue.popleft()
+        yield record
+        if descend is None or descend(record):
+            queue.extend(_child_records(record))
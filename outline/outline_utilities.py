@@ -2,6 +2,8 @@
 Collection of utility functions used by both Outline and OutlineNode classes.  Help with checking and accessing
 elements of an outline.
 """
+from concurrent.futures import ProcessPoolExecutor
+
 from outline.outline_node_definition import outline_node_structures as ods
 import outline.opml_exceptions as ex
 
@@ -176,3 +178,22 @@ def validate_attributes(element):
 
 def value_serialize(value):
     return value if value is not None else ""
+
+
+def create_process_pool(max_workers):
+    """Creates a pool of worker processes, for the parts of the package which
+    can spread work over several processes.
+
+    Args:
+        max_workers: Maximum number of worker processes (None for the number
+                     of CPUs).
+
+    Returns:
+        - ProcessPoolExecutor.
+        - None if worker processes can't be used on this platform (or in this
+          environment), in which case the caller should do the work itself.
+    """
+    try:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    except (NotImplementedError, OSError):
+        return None
@@ -0,0 +1,332 @@
+"""
+Index of the position within an OPML file of the sub-tree headed by each outline element, so that a single sub-tree
+can be read and parsed without parsing the rest of the file.
+
+The index is built in a single streaming pass over the file using expat, which reports the byte position in the file
+of each event.  The sub-tree of an element starts at the position of its start tag, and ends at the position of the
+next event after its end tag, so the bytes in between are the element's own XML (possibly followed by whitespace),
+which can be parsed on its own.
+
+Each sub-tree is identified by the child ancestry of its element (the child numbers from the top level down, as
+returned by NodeAncestryRecord.child_ancestry), so (2, 1) is the first child of the second top level outline element.
+Sub-trees can also be given names: if a regex is supplied when the index is built, the note (_note attribute) of each
+element is searched with it and, where it matches, the first group of the match is a name for the sub-tree.  This
+allows, for example, the data nodes of an outline to be located by name.  A name found in more than one note is
+recorded against each of its elements, and looking it up raises DuplicateSubtreeName rather than picking one.
+
+The index is held in a sidecar file next to the OPML file, which records the size and modification time of the OPML
+file it was built from, so get_subtree_index re-builds it if the file has changed.  The names are held keyed by the
+pattern of the regex which found them, so the names for several regexes can be held in the same sidecar file and
+using a different regex adds its names rather than replacing the others.
+"""
+import json
+import os
+import re
+import tempfile
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+import outline.opml_exceptions as ex
+from outline.outline_node import OutlineNode
+
+index_format_version = 2
+sidecar_suffix = '.subtree-index'
+
+# Size of the blocks in which the OPML file is read while building the index.
+read_block_size = 1024 * 1024
+
+
+class SubtreeIndex:
+    def __init__(self, starts, ends, subtree_sizes, names_by_pattern=None, encoding='utf-8', source_size=None,
+                 source_mtime_ns=None):
+        """
+        Usually created by build_subtree_index or get_subtree_index rather than directly.
+
+        The index holds an entry for each outline element in document order (not including the body), as three
+        parallel lists.  As the elements of a sub-tree are contiguous, the children of an element can be found by
+        skipping from each child to the next using the sub-tree sizes, so the position of an element can be found
+        from its child ancestry without holding the ancestry of every element.
+
+        :param starts: Byte position of the start of each element.
+        :param ends: Byte position of the end of each element.
+        :param subtree_sizes: Number of elements in the sub-tree of each element, including the element.
+        :param names_by_pattern: Dict keyed by the pattern of each regex used for sub-tree names, of dicts of the
+                                 positions of the elements (in document order) keyed by sub-tree name.  Each name
+                                 has a list of positions, which only has more than one entry if the name is
+                                 duplicated.
+        :param encoding: Encoding of the OPML file.
+        :param source_size: Size of the OPML file the index was built from.
+        :param source_mtime_ns: Modification time of the OPML file the index was built from.
+        """
+        self.starts = starts
+        self.ends = ends
+        self.subtree_sizes = subtree_sizes
+        self.names_by_pattern = {} if names_by_pattern is None else names_by_pattern
+        self.encoding = encoding
+        self.source_size = source_size
+        self.source_mtime_ns = source_mtime_ns
+
+    def __len__(self):
+        return len(self.starts)
+
+    def position(self, node_path):
+        """
+        Position (in document order) of the element with the supplied child ancestry.  Raises KeyError if there
+        isn't one.
+
+        :param node_path: Child ancestry tuple.
+        :return:
+        """
+        if len(node_path) == 0:
+            raise KeyError(node_path)
+
+        # The top level elements are the children of a virtual root which heads the whole index.
+        position = -1
+        end_position = len(self.starts)
+        for child_number in node_path:
+            child_position = position + 1
+            for _ in range(child_number - 1):
+                if child_position >= end_position:
+                    break
+                child_position += self.subtree_sizes[child_position]
+            if child_number < 1 or child_position >= end_position:
+                raise KeyError(tuple(node_path))
+            position = child_position
+            end_position = position + self.subtree_sizes[position]
+        return position
+
+    def name_position(self, name, name_pattern=None):
+        """
+        Position (in document order) of the element with the supplied sub-tree name.  Raises KeyError if there isn't
+        one, or DuplicateSubtreeName if the name was found for more than one element.
+
+        :param name: Name of sub-tree.
+        :param name_pattern: Pattern of the regex which found the name.  Only needed if the index holds names from
+                             more than one regex.
+        :return:
+        """
+        if name_pattern is None:
+            if len(self.names_by_pattern) != 1:
+                raise KeyError(name)
+            name_pattern = next(iter(self.names_by_pattern))
+
+        positions = self.names_by_pattern[name_pattern][name]
+        if len(positions) > 1:
+            raise ex.DuplicateSubtreeName(f'Sub-tree name [{name}] appears more than once in outline')
+        return positions[0]
+
+    def byte_range(self, node_path=None, name=None, name_pattern=None):
+        """
+        (start, end) position within the file of the sub-tree for the supplied child ancestry or name.  Raises
+        KeyError if there isn't one.
+
+        :param node_path: Child ancestry tuple.
+        :param name: Name of sub-tree (if node_path not supplied).  See name_position.
+        :param name_pattern: As for name_position.
+        :return:
+        """
+        if node_path is None:
+            position = self.name_position(name, name_pattern)
+        else:
+            position = self.position(tuple(node_path))
+        return self.starts[position], self.ends[position]
+
+    def matches_source(self, opml_path):
+        """
+        Whether the index is for the current state of the supplied file.
+        """
+        stat = os.stat(opml_path)
+        return self.source_size == stat.st_size and self.source_mtime_ns == stat.st_mtime_ns
+
+    def write(self, index_path):
+        """
+        Writes the index to a file, via a temporary file which is then renamed so that the index file is always
+        complete.
+
+        :param index_path:
+        :return:
+        """
+        content = {
+            'format_version': index_format_version,
+            'encoding': self.encoding,
+            'source_size': self.source_size,
+            'source_mtime_ns': self.source_mtime_ns,
+            'starts': list(self.starts),
+            'ends': list(self.ends),
+            'subtree_sizes': list(self.subtree_sizes),
+            'names_by_pattern': self.names_by_pattern,
+        }
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(index_path)),
+                                                           suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as index_file:
+                json.dump(content, index_file, separators=(',', ':'))
+            os.replace(temporary_path, index_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+    @classmethod
+    def read(cls, index_path):
+        """
+        Reads an index written by write.  Raises ValueError if the file isn't a valid index.
+
+        :param index_path:
+        :return:
+        """
+        with open(index_path, encoding='utf-8') as index_file:
+            content = json.load(index_file)
+        if content.get('format_version') != index_format_version:
+            raise ValueError(f'{index_path} is not a sub-tree index of a supported version')
+
+        return cls(
+            content['starts'], content['ends'], content['subtree_sizes'], content['names_by_pattern'],
+            encoding=content['encoding'],
+            source_size=content['source_size'],
+            source_mtime_ns=content['source_mtime_ns'],
+        )
+
+
+def build_subtree_index(opml_path, name_regex=None):
+    """
+    Builds the index for an OPML file in a single streaming pass.
+
+    :param opml_path: Path of OPML file.
+    :param name_regex: Optional compiled regex (or pattern) to find names for sub-trees in the notes of elements.
+    :return: SubtreeIndex
+    """
+    if isinstance(name_regex, str):
+        name_regex = re.compile(name_regex)
+
+    stat = os.stat(opml_path)
+    starts = []
+    ends = []
+    subtree_sizes = []
+    names = {}
+    encoding = 'utf-8'
+
+    parser = expat.ParserCreate()
+    element_depth = 0  # Depth of XML elements (opml is 1, body is 2).
+    in_body = False
+    open_positions = []  # Position of each outline element which is open.
+    ended = []  # Position of an element whose end is the position of the next event.
+
+    def close_ended():
+        if len(ended) > 0:
+            ends[ended.pop()] = parser.CurrentByteIndex
+
+    def xml_declaration(version, declared_encoding, standalone):
+        nonlocal encoding
+        if declared_encoding is not None:
+            encoding = declared_encoding
+
+    def start_element(tag, attributes):
+        nonlocal element_depth, in_body
+        close_ended()
+        element_depth += 1
+        if element_depth == 2 and tag == 'body':
+            in_body = True
+        elif in_body:
+            if tag != 'outline':
+                raise ex.MalformedOutline(f'{tag} tag not allowed in an outline')
+            position = len(starts)
+            open_positions.append(position)
+            starts.append(parser.CurrentByteIndex)
+            ends.append(None)
+            subtree_sizes.append(None)
+
+            if name_regex is not None:
+                match = name_regex.search(attributes.get('_note', ''))
+                if match is not None:
+                    names.setdefault(match.group(1), []).append(position)
+
+    def end_element(tag):
+        nonlocal element_depth, in_body
+        close_ended()
+        element_depth -= 1
+        if len(open_positions) > 0:
+            position = open_positions.pop()
+            subtree_sizes[position] = len(starts) - position
+            ended.append(position)
+        elif in_body:
+            in_body = False
+
+    def character_data(data):
+        close_ended()
+
+    parser.XmlDeclHandler = xml_declaration
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+
+    with open(opml_path, 'rb') as opml_file:
+        while True:
+            block = opml_file.read(read_block_size)
+            parser.Parse(block, len(block) == 0)
+            if len(block) == 0:
+                break
+
+    names_by_pattern = {} if name_regex is None else {name_regex.pattern: names}
+    return SubtreeIndex(starts, ends, subtree_sizes, names_by_pattern, encoding=encoding, source_size=stat.st_size,
+                        source_mtime_ns=stat.st_mtime_ns)
+
+
+def get_subtree_index(opml_path, name_regex=None):
+    """
+    Gets the index for an OPML file from its sidecar file, building it (and writing the sidecar file) if there isn't
+    one, the file has changed since it was built, or it doesn't hold the names for the supplied regex.  In the last
+    case the names for the other regexes held in the sidecar file are kept.
+
+    :param opml_path: Path of OPML file.
+    :param name_regex: As for build_subtree_index.
+    :return: SubtreeIndex
+    """
+    if isinstance(name_regex, str):
+        name_regex = re.compile(name_regex)
+    name_pattern = None if name_regex is None else name_regex.pattern
+
+    index_path = os.fspath(opml_path) + sidecar_suffix
+    existing_index = None
+    try:
+        existing_index = SubtreeIndex.read(index_path)
+        if not existing_index.matches_source(opml_path):
+            existing_index = None
+        elif name_pattern is None or name_pattern in existing_index.names_by_pattern:
+            return existing_index
+    except (OSError, ValueError, KeyError, TypeError):
+        pass  # Missing or unreadable, so re-build it.
+
+    subtree_index = build_subtree_index(opml_path, name_regex=name_regex)
+    if existing_index is not None:
+        subtree_index.names_by_pattern = {**existing_index.names_by_pattern, **subtree_index.names_by_pattern}
+    try:
+        subtree_index.write(index_path)
+    except OSError:
+        pass  # Can't write next to the OPML file, so the index will be re-built next time.
+    return subtree_index
+
+
+def load_subtree(opml_path, node_path=None, name=None, subtree_index=None, name_regex=None):
+    """
+    Reads and parses just the sub-tree of an OPML file for the supplied child ancestry (or name).
+
+    :param opml_path: Path of OPML file.
+    :param node_path: Child ancestry tuple of the element at the root of the sub-tree.
+    :param name: Name of the sub-tree (if node_path not supplied).
+    :param subtree_index: Index to use.  If not supplied, the index is obtained using get_subtree_index.
+    :param name_regex: Regex (or pattern) used for names, if the index needs to be built, and to choose which
+                       names in the index to look up the name in.
+    :return: OutlineNode for the root of the sub-tree.
+    """
+    if subtree_index is None:
+        subtree_index = get_subtree_index(opml_path, name_regex=name_regex)
+    name_pattern = getattr(name_regex, 'pattern', name_regex)
+    start, end = subtree_index.byte_range(node_path=node_path, name=name, name_pattern=name_pattern)
+
+    with open(opml_path, 'rb') as opml_file:
+        opml_file.seek(start)
+        subtree_xml = opml_file.read(end - start)
+
+    xml_parser = ElementTree.XMLParser(encoding=subtree_index.encoding)
+    xml_parser.feed(subtree_xml)
+    return OutlineNode(xml_parser.close())
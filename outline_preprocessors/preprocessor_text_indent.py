@@ -1,9 +1,22 @@
+import io
+import os
+import re
+from array import array
+from collections import deque
 from xml.etree import ElementTree
 
+from outline.flat_outline import FlatOutline
 from outline.opml_exceptions import MalformedOutline
 from outline.outline import Outline
+from outline.outline_utilities import create_process_pool
 from outline_preprocessors.preprocessor_generic import PreprocessorGeneric
 
+# Files of at least this size are decoded in parallel by default (see PreprocessorTextIndent.iter_parsed_lines).
+default_parallel_threshold = 64 * 1024 * 1024
+
+# Approximate size of the chunks into which a file is split to be decoded in parallel.
+default_chunk_size = 4 * 1024 * 1024
+
 
 class TextOutlineDecodeSpecifier:
     def __init__(
@@ -47,6 +60,98 @@ class TextOutlineDecodeSpecifier:
         self.bullet_token = bullet_token
         self.include_initial_if_blank = include_initial_if_blank
         self.level1_indent_count = level1_indent_count
+        self.line_regex = self.compile_line_regex()
+
+    def compile_line_regex(self):
+        """
+        Compiles the specification into a single anchored regex which splits a line into the initial token (if
+        present), the run of indent tokens, a bullet token (if the line starts with any of the bullet tokens) and the
+        remaining content, so that a line can be decoded with one match rather than a pass for each part.
+
+        :return:
+        """
+        initial_pattern = '' if self.initial_token is None else f'(?P<initial>{re.escape(self.initial_token)})?'
+        indent_pattern = f'(?P<indent>(?:{re.escape(self.indent_token)})*)'
+        if self.bullet_token is None:
+            bullet_pattern = ''
+        else:
+            # Longest first so that a bullet which starts with another bullet is matched in full.
+            bullets = sorted({bullet for bullet in self.bullet_token if bullet != ''}, key=len, reverse=True)
+            bullet_pattern = f'(?P<bullet>{"|".join(re.escape(bullet) for bullet in bullets)})?' if bullets \
+                else '(?P<bullet>)'
+
+        return re.compile(f'{initial_pattern}{indent_pattern}{bullet_pattern}(?P<content>.*)', re.DOTALL)
+
+    def decode_line(self, line):
+        """
+        Decodes a line (without its newline) in a single regex match, giving the same result as applying
+        decode_initial_token, decode_indent_token and decode_bullet_token in turn.
+
+        :param line:
+        :return: (indent_level, text), or (None, None) if the line should be ignored (e.g. a bullet with no text).
+        """
+        match = self.line_regex.match(line)
+        if self.initial_token is not None and match.group('initial') is None and self.include_initial_if_blank is True:
+            raise ValueError(f"Initial string ({self.initial_token}) expected but not found")
+
+        indent_token_count = len(match.group('indent')) // len(self.indent_token)
+        indent_level = indent_token_count + 1 - self.level1_indent_count
+        if indent_level < 1:
+            raise ValueError(f"Number of indent tokens ({indent_token_count})  invalid for supplied specification")
+
+        if self.bullet_token is None:
+            node_text = match.group('content').strip() or None
+        else:
+            bullet = match.group('bullet') or ''
+            if bullet == self.bullet_token[min(indent_level, len(self.bullet_token)) - 1]:
+                node_text = match.group('content').strip() or None
+            else:
+                # Missing bullet, or the bullet for a different level, so check the line in full.
+                node_text = self.decode_bullet_token(bullet + match.group('content'), indent_level)
+
+        if node_text is None:
+            return None, None
+        else:
+            return indent_level, node_text
+
+    def decode_lines(self, lines):
+        """
+        Generator which decodes each of the supplied lines as read from a file (with or without a newline) and yields
+        (indent_level, text) for each line which holds a node, skipping blank lines.
+
+        :param lines: Iterable of lines.
+        :return:
+        """
+        match_line = self.line_regex.match
+        indent_token_length = len(self.indent_token)
+        level_offset = 1 - self.level1_indent_count
+        bullet_tokens = self.bullet_token
+        # Without an initial token, a line whose bullet (if any) is the one for its level and which has some content
+        # can be decoded straight from the groups of the match, and any other line is decoded in full by decode_line.
+        fast_path = self.initial_token is None
+
+        for line in lines:
+            if line[-1:] == "\n":
+                line = line[:-1]
+
+            if fast_path:
+                if bullet_tokens is None:
+                    indent, content = match_line(line).groups()
+                    bullet = None
+                else:
+                    indent, bullet, content = match_line(line).groups('')
+                indent_level = len(indent) // indent_token_length + level_offset
+                node_text = content.strip()
+                if indent_level >= 1 and node_text != "" and (
+                        bullet_tokens is None or bullet == bullet_tokens[min(indent_level, len(bullet_tokens)) - 1]):
+                    yield indent_level, node_text
+                    continue
+
+            # Lines with only whitespace are blank lines and are ignored.
+            if line.strip() != "":
+                indent_level, node_text = self.decode_line(line)
+                if indent_level is not None:
+                    yield indent_level, node_text
 
     def decode_initial_token(self, text_string):
         """
@@ -150,39 +255,137 @@ class TextOutlineDecodeSpecifier:
         return f"{self.indent_token}-{self.bullet_token}"
 
 
+class TextFileLines:
+    """
+    Iterable of the lines of a text file, which reads the file a line at a time each time it is iterated through
+    rather than holding all the lines in memory.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def __iter__(self):
+        with open(self.file_path, "r") as fh:
+            yield from fh
+
+    def size(self):
+        return os.path.getsize(self.file_path)
+
+    def line_aligned_chunks(self, chunk_size=default_chunk_size):
+        """
+        Splits the file into chunks of about the supplied size, each of which ends at the end of a line.
+
+        :param chunk_size: Size in bytes.
+        :return: List of (start, end) byte positions of each chunk.
+        """
+        chunks = []
+        with open(self.file_path, "rb") as fh:
+            file_size = os.fstat(fh.fileno()).st_size
+            start = 0
+            while start < file_size:
+                fh.seek(start + chunk_size)
+                fh.readline()
+                end = min(fh.tell(), file_size)
+                chunks.append((start, end))
+                start = end
+        return chunks
+
+
 class PreprocessorTextIndent(PreprocessorGeneric):
+    def __init__(self, outline, config_object, max_workers=None, parallel_threshold=default_parallel_threshold):
+        """
+        :param outline: Iterable of the lines of the text outline (TextFileLines for a file).
+        :param config_object: TextOutlineDecodeSpecifier for the lines.
+        :param max_workers: Maximum number of worker processes used to decode a large file (default is the number of
+                            CPUs).  If 1, files are always decoded serially.
+        :param parallel_threshold: Size in bytes from which a file is decoded in parallel.
+        """
+        super().__init__(outline, config_object)
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+
     @classmethod
-    def from_textfile(cls, file_path, config_object):
-        with open(file_path, "r") as fh:
-            lines = [line for line in fh.readlines()]
-        return cls(lines, config_object)
+    def from_textfile(cls, file_path, config_object, **kwargs):
+        """
+        Creates a preprocessor for an indented text file.  The file isn't read until the outline is pre-processed, and
+        is then read a line at a time (or a chunk at a time by each worker process if it is large), so files of any
+        size can be processed.
+
+        :param file_path:
+        :param config_object: TextOutlineDecodeSpecifier for the file.
+        :param kwargs: max_workers and parallel_threshold, as for __init__.
+        :return:
+        """
+        return cls(TextFileLines(file_path), config_object, **kwargs)
 
     def pre_process_outline(self):
-        parse_output = self.parse_text()
-        outline = self.create_outline(parse_output)
+        return self.create_outline(self.iter_parsed_lines())
+
+    def pre_process_flat_outline(self):
+        """
+        As pre_process_outline, but creates a FlatOutline directly from the decoded lines, without creating any XML
+        elements.  Worthwhile where the outline is only going to be read, for example to extract data nodes from it
+        (UnleashedOutline accepts a FlatOutline in place of an Outline).
 
-        return outline
+        :return: FlatOutline
+        """
+        return self.create_flat_outline(self.iter_parsed_lines())
 
     def parse_text(self):
         """
         Reads in a text file and parses it into to a hierarchical structure to imitate the structure of an outline.
 
-        :param decode_specifier:
+        :return: List of (indent_level, text) tuples.
+        """
+        return list(self.iter_parsed_lines())
+
+    def iter_parsed_lines(self):
+        """
+        Generator version of parse_text, which decodes each line as it is read and yields (indent_level, text) for
+        each line which holds a node.  Blank lines (including lines with just a bullet) are skipped.
+
+        Files of at least the parallel threshold size are decoded in parallel (see iter_parsed_lines_parallel).
+
         :return:
         """
+        if (isinstance(self.outline, TextFileLines) and self.max_workers != 1 and
+                self.outline.size() >= self.parallel_threshold):
+            return self.iter_parsed_lines_parallel()
+        return self.config_object.decode_lines(self.outline)
 
-        parse_output = []
-        for line_num, raw_line in enumerate(self.outline):
-            # Strip off the newline
-            line = self.strip_newline(raw_line)
+    def iter_parsed_lines_parallel(self, chunk_size=default_chunk_size):
+        """
+        As iter_parsed_lines, but splits the file into chunks aligned to line boundaries and decodes the chunks in
+        worker processes, as decoding each line doesn't depend on any other line.  The decoded chunks are yielded in
+        file order, so the tree is still assembled from a single ordered stream of (indent_level, text) and checks
+        which span lines, such as jumping two generations, apply across the boundaries between chunks as anywhere
+        else.
 
-            # Check whether any non whitespace characters in text.  If not then treat as a blank line and ignore.
-            no_whitespace_line = line.strip()
-            if len(no_whitespace_line) > 0:
-                indent_level, content_line = self.parse_indent(line, self.config_object)
-                parse_output.append((indent_level, content_line))
+        Only a few chunks more than there are workers are in progress at a time, so the decoded lines waiting to be
+        added to the tree are limited however large the file.
 
-        return parse_output
+        :param chunk_size: Approximate size in bytes of each chunk.
+        :return:
+        """
+        chunks = self.outline.line_aligned_chunks(chunk_size)
+        executor = None if len(chunks) <= 1 else create_process_pool(self.max_workers)
+        if executor is None:
+            yield from self.config_object.decode_lines(self.outline)
+            return
+
+        max_in_progress = 2 * (self.max_workers or os.cpu_count() or 1)
+        in_progress = deque()
+        try:
+            for start, end in chunks:
+                in_progress.append(executor.submit(_decode_text_chunk, self.outline.file_path, start, end,
+                                                   self.config_object))
+                if len(in_progress) >= max_in_progress:
+                    yield from in_progress.popleft().result()
+            while len(in_progress) > 0:
+                yield from in_progress.popleft().result()
+        finally:
+            for future in in_progress:
+                future.cancel()
+            executor.shutdown()
 
     def parse_indent(self, line, decode_specifier: TextOutlineDecodeSpecifier):
         """
@@ -208,7 +411,8 @@ class PreprocessorTextIndent(PreprocessorGeneric):
           levels to tabs followed by a character to represent the bullet, such as an 'o', followed by a space.  Sometimes
           there may be a different character for different indent levels which I may need to cater for at some point.
 
-        It then strips out the indent segment and returns the string content and the indent level.
+        It then strips out the indent segment and returns the string content and the indent level.  The line is decoded
+        in a single match by the regex the decode specifier compiles from its tokens (see decode_line).
 
         :param line: Sequence of characters forming a line from the text outline.
         :param decode_specifier: TextOutlineDecodeSpecifier which holds the three elements of the indent so that the line can be parsed and
@@ -217,15 +421,7 @@ class PreprocessorTextIndent(PreprocessorGeneric):
         :return: (indent_level, content)
         """
 
-        initial_string_status, processed_string_01 = decode_specifier.decode_initial_token(line)
-        indent_level, processed_string_02 = decode_specifier.decode_indent_token(processed_string_01)
-        node_text = decode_specifier.decode_bullet_token(processed_string_02, indent_level)
-
-        # If None has been returned, it means we should ignore the line (probably a blank)
-        if node_text is None:
-            return None, None
-        else:
-            return indent_level, node_text
+        return decode_specifier.decode_line(line)
 
     @staticmethod
     def strip_newline(string_from_file):
@@ -245,47 +441,55 @@ class PreprocessorTextIndent(PreprocessorGeneric):
 
     def add_child_nodes(self, node, level, nodes_data, nodes_data_index):
         """
-        Recursive method which constructs a tree of outline elements from the parsed text file records.
-
-        When called the method will iterate through the remaining node records and:
-        - If the next node is a level higher, call recursively
-        - If the next node is at the same level, add to an array of
-
-
-        :param node:
-        :param level:
-        :param nodes_data:
-        :param nodes_data_index:
-        :return:
+        Constructs a tree of outline elements from the parsed text file records, adding it beneath the supplied node.
+
+        Works through the remaining node records, keeping a stack of the most recently added node at each level below
+        the supplied node (so the last entry on the stack is the deepest node which can currently take children):
+        - If the next node is up to one level deeper than the deepest open node, add it as a child of the open node
+          one level above it, discarding any open nodes at its level or deeper.
+        - If the next node is more than one level deeper, the outline has jumped a generation, which is an error.
+        - If the next node is at or above the level of the supplied node, it doesn't belong under the supplied node so
+          stop and return.
+
+        :param node: Element beneath which to add the new nodes.
+        :param level: Level of the supplied node.
+        :param nodes_data: List of (level, text) tuples.
+        :param nodes_data_index: Index of the first record in nodes_data to process.
+        :return: Index of the last record in nodes_data which was added.
         """
-        child_nodes = []
-        end_of_nodes_data = False
-        index = nodes_data_index - 1
-        while not end_of_nodes_data:
-            if index < len(nodes_data) - 1:
-                index += 1
+        open_nodes = [node]  # open_nodes[n] is the most recently added node at level (level + n)
+        for index in range(nodes_data_index, len(nodes_data)):
+            new_level, text = nodes_data[index]
+            relative_level = new_level - level
+            if relative_level < 1:
+                return index - 1
+            elif relative_level > len(open_nodes):
+                raise MalformedOutline(f"Text indented outline jumped two generations at '{text}'")
             else:
-                end_of_nodes_data = True
-            if not end_of_nodes_data:
-                new_node_data = nodes_data[index]
-                new_level, text = new_node_data
                 new_node = self.create_outline_element(text)
-                if new_level == level + 1:
-                    # Child node so add to array of child nodes
-                    child_nodes.append(new_node)
-                elif new_level == level + 2:
-                    # Next level down the tree so call recursively, to add to the last node at this level
-                    # which is the last element in child_nodes.
-                    index = self.add_child_nodes(child_nodes[-1], level + 1, nodes_data, index)
-                elif new_level > level + 2:
-                    raise MalformedOutline(f"Text indented outline jumped two generations at '{text}'")
-                elif new_level <= level:
-                    # We are at a leaf node so can append all children and return to the last recursive call
-                    node.extend(child_nodes)
-                    return index - 1
-        node.extend(child_nodes)
-        return index
+                del open_nodes[relative_level:]
+                open_nodes[-1].append(new_node)
+                open_nodes.append(new_node)
+        return len(nodes_data) - 1
 
+    def attach_nodes(self, node, nodes_data):
+        """
+        Single pass version of add_child_nodes for the whole outline, which attaches each node to the tree beneath the
+        supplied (level 0) node as soon as its record is read.  Only the stack of open nodes (one per level) is held
+        as well as the tree, so nodes_data can be a generator which decodes the lines of a file as they are read.
+
+        :param node: Element beneath which to add the new nodes.
+        :param nodes_data: Iterable of (level, text) tuples.
+        :return:
+        """
+        open_nodes = [node]  # open_nodes[n] is the most recently added node at level n
+        for new_level, text in nodes_data:
+            if new_level > len(open_nodes):
+                raise MalformedOutline(f"Text indented outline jumped two generations at '{text}'")
+            new_node = self.create_outline_element(text)
+            del open_nodes[new_level:]
+            open_nodes[-1].append(new_node)
+            open_nodes.append(new_node)
 
     def create_outline(self, outline_spec):
         """
@@ -293,16 +497,70 @@ class PreprocessorTextIndent(PreprocessorGeneric):
         construct the outline itself.
 
         In an opml file, the outline nodes at the top of the tree hang off the body element.  But in order to simplify
-        the use of recursion to generate the tree, we will initially generate the tree hanging from an outline element,
-        and then once the tree is created, create the well-formed xml tree to correctly drive the Outline object.
+        the generation of the tree, we will initially generate the tree hanging from an outline element, and then once
+        the tree is created, create the well-formed xml tree to correctly drive the Outline object.
 
-        :param outline_spec:
+        :param outline_spec: Iterable of (indent_level, text) tuples, as returned by parse_text or iter_parsed_lines.
         :return:
         """
 
         top_level_node = self.create_outline_element(None)
 
-        self.add_child_nodes(top_level_node, 0, outline_spec, 0)
+        self.attach_nodes(top_level_node, outline_spec)
         outline_child_nodes = [outline_element for outline_element in top_level_node]
 
         return Outline.from_scratch(outline_child_nodes)
+
+    @staticmethod
+    def create_flat_outline(outline_spec):
+        """
+        Builds a FlatOutline from the (indent_level, text) of each node in a single pass, appending each node to the
+        arrays as its line is decoded.  As for attach_nodes, only the index and number of children of the open node
+        at each level are held, and jumping two generations raises MalformedOutline.
+
+        The top node (index 0) stands for the body of the outline, with the level 1 nodes as its children, so the
+        FlatOutline has the same content as FlatOutline.from_outline would give for the result of create_outline.
+
+        :param outline_spec: Iterable of (indent_level, text) tuples, as returned by parse_text or iter_parsed_lines.
+        :return: FlatOutline
+        """
+        parent = array('i', [-1])
+        depth = array('i', [0])
+        child_number = array('i', [0])
+        text = ['']
+
+        open_indexes = [0]  # open_indexes[n] is the index of the most recently added node at level n
+        child_counts = [0]  # child_counts[n] is the number of children so far of the node at open_indexes[n]
+        for new_level, node_text in outline_spec:
+            if new_level > len(open_indexes):
+                raise MalformedOutline(f"Text indented outline jumped two generations at '{node_text}'")
+            del open_indexes[new_level:]
+            del child_counts[new_level:]
+            child_counts[-1] += 1
+
+            parent.append(open_indexes[-1])
+            depth.append(new_level)
+            child_number.append(child_counts[-1])
+            text.append(node_text)
+
+            open_indexes.append(len(text) - 1)
+            child_counts.append(0)
+
+        subtree_size = array('i', [1]) * len(parent)
+        for index in range(len(parent) - 1, 0, -1):
+            subtree_size[parent[index]] += subtree_size[index]
+
+        return FlatOutline(parent, depth, child_number, subtree_size, text, [''] * len(text))
+
+
+def _decode_text_chunk(file_path, start, end, decode_specifier):
+    """
+    Decodes the lines in a chunk of a text file (in a worker process).  The chunk is read as bytes and then decoded
+    in the same way as a text file opened by TextFileLines.
+
+    :return: List of (indent_level, text).
+    """
+    with open(file_path, "rb") as fh:
+        fh.seek(start)
+        chunk = fh.read(end - start)
+    return list(decode_specifier.decode_lines(io.TextIOWrapper(io.BytesIO(chunk))))
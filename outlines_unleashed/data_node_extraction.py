@@ -0,0 +1,345 @@
+"""
+Extraction of data nodes in parallel using a pool of worker processes.
+
+The data nodes of an outline are independent of each other, so each can be extracted in a separate process.  Rather
+than sending the whole outline to each worker, only the sub-tree of the data node is sent, serialised as XML (the
+same form as it takes in the OPML file) or, for a FlatOutline, as the arrays of a FlatOutline holding just the
+sub-tree, along with the tag delimiters of the data node and the specifier to use.  The
+worker rebuilds the sub-tree, extracts it and returns the DataNodeTable.
+
+Results are collected in the order the data nodes appear in the outline, so the output doesn't depend on the order
+in which the workers finish.  If a pool can't be used (one worker requested, only one data node to extract, or the
+platform can't start worker processes) the data nodes are extracted in this process instead, giving the same
+result.
+
+A single large data node can also be split between workers (extract_partitioned_data_node_table).  The root of the
+data node is matched in this process, and each worker matches a run of consecutive first level sub-trees, starting
+from the fields whose criteria matched the root (see DataNodeMatchingPlan.match_subtree).  The matches from each
+sub-tree are concatenated in tree order and the records assembled in this process, so the result is exactly the same
+as extracting the data node in one go, however the sub-trees are split up.
+
+Extraction doesn't change the outline or the specifier (tag delimiter overrides are applied through separate
+UnleashedOutlineNode views of the nodes), so several extractions can also share one outline in a pool of threads
+(extract_with_thread_pool).  This avoids serialising the data nodes, and runs in parallel on a free-threaded build of
+Python; with the GIL it allows extractions to run alongside other work, for example in a service.
+
+Where the outline is held in a FlatOutline snapshot file, extract_snapshot_data_node_tables has each worker
+memory-map the snapshot rather than being sent its data node, so the workers share one copy of the outline.
+"""
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from xml.etree import ElementTree
+
+from outline.flat_outline import FlatOutline, FlatOutlineNode
+from outline.node_ancestry_item import NodeAncestryItem
+from outline.outline_node import OutlineNode
+from outline.outline_utilities import create_process_pool
+from outlines_unleashed.unleashed_outline_exceptions import InvalidDataNodeSpecifierVersion
+from outlines_unleashed.unleashed_outline_exceptions import DuplicateDataNodeName
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+
+
+def extract_data_node_tables(data_nodes, specifiers, max_workers=None):
+    """
+    Extracts each of the supplied data nodes using the specifier for its name.
+
+    :param data_nodes: Sequence of (data node name, UnleashedOutlineNode) in document order.
+    :param specifiers: Dict of DataNodeSpecifiers keyed by data node name.  Data nodes with no specifier are skipped.
+                       A name with a specifier must only appear once (otherwise DuplicateDataNodeName is raised).
+    :param max_workers: Maximum number of worker processes (default is the number of CPUs).  If 1, the extraction is
+                        done in this process.
+    :return: Dict of DataNodeTables keyed by data node name, in document order.
+    """
+    jobs = _data_node_jobs(data_nodes, specifiers)
+
+    if max_workers == 1 or len(jobs) <= 1:
+        return _extract_serial(jobs)
+
+    executor = create_process_pool(max_workers)
+    if executor is None:
+        return _extract_serial(jobs)
+
+    with executor:
+        futures = [
+            executor.submit(_extract_serialised_data_node, *_serialise_job(data_node, specifier))
+            for data_node_name, data_node, specifier in jobs
+        ]
+        return {data_node_name: future.result() for (data_node_name, _, _), future in zip(jobs, futures)}
+
+
+def extract_snapshot_data_node_tables(snapshot_path, specifiers, max_workers=None, tag_regex_text=None,
+                                      tag_regex_note=None):
+    """
+    Extracts the data nodes of an outline held in a FlatOutline snapshot file (see flat_outline_snapshot), as
+    extract_data_node_tables does.  Rather than sending each data node to a worker, each worker memory-maps the
+    snapshot and is just sent the position of the data node within it, so all the workers share one copy of the
+    outline through the page cache.
+
+    :param snapshot_path: Path of snapshot file.
+    :param specifiers: As for extract_data_node_tables.
+    :param max_workers: As for extract_data_node_tables.
+    :param tag_regex_text: Default tag delimiters for the text of the nodes (before any override by a specifier).
+    :param tag_regex_note: Default tag delimiters for the note of the nodes.
+    :return: Dict of DataNodeTables keyed by data node name, in document order.
+    """
+    # Imported here as unleashed_outline uses this module.
+    from outlines_unleashed.unleashed_outline import data_node_regex
+
+    # This process maps the snapshot just for the duration of the extraction, rather than keeping it open in the
+    # cache used by the workers.
+    flat_outline = FlatOutline.from_snapshot(snapshot_path)
+    try:
+        notes = flat_outline.note
+        data_nodes = []
+        for index in range(len(flat_outline)):
+            match = data_node_regex.search(notes[index])
+            if match is not None:
+                data_nodes.append((match.group(1), index))
+
+        jobs = [
+            (data_node_name, (index, tag_regex_text, tag_regex_note, specifier))
+            for data_node_name, index, specifier in _data_node_jobs(data_nodes, specifiers)
+        ]
+
+        executor = None
+        if max_workers != 1 and len(jobs) > 1:
+            executor = create_process_pool(max_workers)
+        if executor is None:
+            return {
+                data_node_name: _extract_flat_outline_data_node(flat_outline, *job_args)
+                for data_node_name, job_args in jobs
+            }
+
+        with executor:
+            futures = [executor.submit(_extract_snapshot_data_node, snapshot_path, *job_args) for _, job_args in jobs]
+            return {data_node_name: future.result() for (data_node_name, _), future in zip(jobs, futures)}
+    finally:
+        flat_outline.close()
+
+
+def extract_partitioned_data_node_table(specifier, data_node, max_workers=None, partitions_per_worker=4):
+    """
+    Extracts a single data node as specifier.extract_data_node_table does, but with the first level sub-trees of
+    the data node split between a pool of worker processes.
+
+    :param specifier: DataNodeSpecifier to extract with.
+    :param data_node: UnleashedOutlineNode at the root of the data node.
+    :param max_workers: Maximum number of worker processes (default is the number of CPUs).  If 1, the extraction is
+                        done in this process.
+    :param partitions_per_worker: Number of runs of sub-trees to split the data node into for each worker, so that
+                                  the work is still spread evenly when the sub-trees are of different sizes.
+    :return: DataNodeTable.
+    """
+    version = specifier.dns_structure['header']['descriptor_version_number']
+    if version != '0.1':
+        raise InvalidDataNodeSpecifierVersion(f'Version of [{version}] not valid for Data Node Specifier.')
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    root_node = specifier._override_tag_regex(data_node)
+    matching_plan = specifier.compile()
+
+    survivors, root_matches = matching_plan.match_node(NodeAncestryItem(None, root_node), 0, matching_plan.fields)
+    sub_trees = list(enumerate(root_node.outline_node, 1))
+    if max_workers == 1 or len(survivors) == 0 or len(sub_trees) <= 1:
+        return specifier.extract_data_node_table(data_node)
+
+    executor = create_process_pool(max_workers)
+    if executor is None:
+        return specifier.extract_data_node_table(data_node)
+
+    # Candidates are sent to the workers as positions within the fields of the plan, which each worker re-builds.
+    survivor_ids = {id(compiled_field) for compiled_field in survivors}
+    candidate_positions = [
+        position for position, compiled_field in enumerate(matching_plan.fields) if id(compiled_field) in survivor_ids
+    ]
+
+    partition_count = min(len(sub_trees), max_workers * partitions_per_worker)
+    partition_size, remainder = divmod(len(sub_trees), partition_count)
+    jobs = []
+    start = 0
+    for partition in range(partition_count):
+        end = start + partition_size + (1 if partition < remainder else 0)
+        serialised_sub_trees = [
+            (child_number, _serialise_sub_tree(child)) for child_number, child in sub_trees[start:end]
+        ]
+        jobs.append((serialised_sub_trees, root_node.tag_regex_text, root_node.tag_regex_note, specifier,
+                     candidate_positions))
+        start = end
+
+    with executor:
+        partition_matches = list(executor.map(_match_serialised_sub_trees, *zip(*jobs)))
+
+    rows = matching_plan.assemble_rows(chain(root_matches, *partition_matches))
+    return specifier.create_data_node_table(rows)
+
+
+def extract_with_thread_pool(jobs, max_workers=None):
+    """
+    Extracts each of the supplied (data node, specifier) pairs in a pool of threads.  The data nodes may be from
+    the same outline and the same specifier may be used for several jobs.
+
+    :param jobs: Iterable of (UnleashedOutlineNode, DataNodeSpecifier).
+    :param max_workers: Maximum number of threads (default as for ThreadPoolExecutor).
+    :return: List of DataNodeTables, one for each job in the same order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(specifier.extract_data_node_table, data_node) for data_node, specifier in jobs]
+        return [future.result() for future in futures]
+
+
+def _data_node_jobs(data_nodes, specifiers):
+    """
+    List of (data node name, data node, specifier) for each data node which has a specifier.
+    """
+    jobs = []
+    names = set()
+    for data_node_name, data_node in data_nodes:
+        if data_node_name in specifiers:
+            if data_node_name in names:
+                raise DuplicateDataNodeName(f'Data node name [{data_node_name}] appears more than once in outline')
+            names.add(data_node_name)
+            jobs.append((data_node_name, data_node, specifiers[data_node_name]))
+    return jobs
+
+
+def _extract_serial(jobs):
+    return {
+        data_node_name: specifier.extract_data_node_table(data_node)
+        for data_node_name, data_node, specifier in jobs
+    }
+
+
+def _serialise_job(data_node, specifier):
+    """
+    Arguments for _extract_serialised_data_node for the supplied data node.
+    """
+    return _serialise_sub_tree(data_node.outline_node), data_node.tag_regex_text, data_node.tag_regex_note, specifier
+
+
+def _serialise_sub_tree(outline_node):
+    """
+    Serialised form of the sub-tree headed by an OutlineNode (XML) or a FlatOutlineNode (the arrays of a FlatOutline
+    holding just the sub-tree), which can be sent to a worker process and rebuilt by _rebuild_sub_tree.
+    """
+    if isinstance(outline_node, FlatOutlineNode):
+        sub_tree = outline_node.flat_outline.subtree(outline_node.index)
+        return (sub_tree.parent, sub_tree.depth, sub_tree.child_number, sub_tree.subtree_size, sub_tree.text,
+                sub_tree.note)
+    return ElementTree.tostring(outline_node._node)
+
+
+def _rebuild_sub_tree(serialised_sub_tree):
+    if isinstance(serialised_sub_tree, bytes):
+        return OutlineNode(ElementTree.fromstring(serialised_sub_tree))
+    return FlatOutline(*serialised_sub_tree).top_outline_node
+
+
+def _extract_serialised_data_node(serialised_data_node, tag_regex_text, tag_regex_note, specifier):
+    """
+    Run in the worker process.  Rebuilds the data node from its serialised form and extracts it.
+    """
+    outline_node = _rebuild_sub_tree(serialised_data_node)
+    data_node = UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=tag_regex_text,
+                                                      tag_regex_note=tag_regex_note)
+    return specifier.extract_data_node_table(data_node)
+
+
+def _match_serialised_sub_trees(serialised_sub_trees, tag_regex_text, tag_regex_note, specifier, candidate_positions):
+    """
+    Run in the worker process.  Rebuilds each first level sub-tree of a data node from its serialised form and
+    matches it, returning the list of (field_name, field_value) matches for all the sub-trees in order.
+    """
+    matching_plan = specifier.compile()
+    candidates = [matching_plan.fields[position] for position in candidate_positions]
+
+    matches = []
+    for child_number, serialised_sub_tree in serialised_sub_trees:
+        outline_node = _rebuild_sub_tree(serialised_sub_tree)
+        sub_tree_node = UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=tag_regex_text,
+                                                              tag_regex_note=tag_regex_note)
+        matches.extend(matching_plan.match_subtree(sub_tree_node, child_number=child_number, depth=1,
+                                                   candidates=candidates))
+    return matches
+
+
+# Maximum number of snapshots each worker process keeps mapped.  The least recently used is dropped when another is
+# opened.
+open_snapshot_cache_size = 8
+
+# Snapshots opened by this process, keyed by path, size and modification time, so that each worker maps a snapshot
+# once however many data nodes it extracts from it.  Least recently used first.
+_open_snapshots = OrderedDict()
+_open_snapshots_lock = threading.Lock()
+
+
+class _OpenSnapshot:
+    """
+    A snapshot held in _open_snapshots, with the number of extractions using it, so that it is only closed once it is
+    neither in the cache nor in use.
+    """
+    __slots__ = ('flat_outline', 'users', 'cached')
+
+    def __init__(self, flat_outline):
+        self.flat_outline = flat_outline
+        self.users = 0
+        self.cached = True
+
+    def drop(self):
+        self.cached = False
+        if self.users == 0:
+            self.flat_outline.close()
+
+
+@contextmanager
+def _open_snapshot(snapshot_path):
+    """
+    Gives the FlatOutline for a snapshot from the snapshots opened by this process, opening it if it isn't already
+    open.  A snapshot dropped from the cache (least recently used, or replaced by a newer file at the same path)
+    while in use is closed when the last extraction using it has finished.
+    """
+    stat = os.stat(snapshot_path)
+    path = os.path.realpath(snapshot_path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _open_snapshots_lock:
+        open_snapshot = _open_snapshots.get(key)
+        if open_snapshot is not None:
+            _open_snapshots.move_to_end(key)
+        else:
+            # A snapshot previously opened from the same path has since been replaced, so won't be used again.
+            for stale_key in [open_key for open_key in _open_snapshots if open_key[0] == path]:
+                _open_snapshots.pop(stale_key).drop()
+
+            open_snapshot = _OpenSnapshot(FlatOutline.from_snapshot(snapshot_path))
+            _open_snapshots[key] = open_snapshot
+            while len(_open_snapshots) > open_snapshot_cache_size:
+                _, evicted_snapshot = _open_snapshots.popitem(last=False)
+                evicted_snapshot.drop()
+        open_snapshot.users += 1
+
+    try:
+        yield open_snapshot.flat_outline
+    finally:
+        with _open_snapshots_lock:
+            open_snapshot.users -= 1
+            if open_snapshot.users == 0 and not open_snapshot.cached:
+                open_snapshot.flat_outline.close()
+
+
+def _extract_snapshot_data_node(snapshot_path, index, tag_regex_text, tag_regex_note, specifier):
+    """
+    Run in the worker process.  Extracts the data node at the supplied position in the snapshot.
+    """
+    with _open_snapshot(snapshot_path) as flat_outline:
+        return _extract_flat_outline_data_node(flat_outline, index, tag_regex_text, tag_regex_note, specifier)
+
+
+def _extract_flat_outline_data_node(flat_outline, index, tag_regex_text, tag_regex_note, specifier):
+    data_node = UnleashedOutlineNode.for_outline_node(flat_outline.node(index), tag_regex_text=tag_regex_text,
+                                                      tag_regex_note=tag_regex_note)
+    return specifier.extract_data_node_table(data_node)
@@ -0,0 +1,363 @@
+"""
+Compiled form of the field descriptors of a DataNodeSpecifier, used to match the nodes of a data node against the
+fields defined in the specifier.
+
+Matching directly from the descriptor tests every node against every field, and tests every generation of the
+ancestry of the node against the criteria for that generation even once one has failed.  A field can only match nodes
+at the depth given by the number of its criteria, so the plan groups the fields by that depth and a node is only
+tested against the fields for its own depth.  Criteria which don't test anything (all values None) are dropped, and
+testing a field stops at the first generation which doesn't match.
+
+Within each depth the fields are held in descriptor order, so the matches for a node are generated in the same order
+as matching against the full descriptor.
+
+When extracting a data node, match_subtree goes further and evaluates the criteria incrementally as it walks down
+the tree.  Each node carries forward the fields whose criteria have matched every generation so far (the candidates),
+so the criteria for a generation are evaluated once per node at that generation rather than once for every node
+below it.  Criteria which are identical for several fields are only evaluated once per node.  A node whose candidates
+are all satisfied at or above its depth has no descendants which could match, so its sub-tree isn't visited at all;
+this also stops the traversal going deeper than the deepest criteria in the specifier.
+
+The plan also holds the layout of the records assembled from the matches: the order of the fields (primary key
+fields then other fields, each in descriptor order), the position of each field and the row of default values, so
+that assembling a record doesn't need to go back to the descriptor.  Records are assembled as tuples in that order;
+row_as_dict gives the equivalent dict.
+
+The plan is built by DataNodeSpecifier.compile() and isn't changed once built.
+"""
+from collections import namedtuple
+
+from outline.node_ancestry_item import NodeAncestryItem
+
+# Name of the property of an UnleashedOutlineNode which holds the value for each field_value_specifier.
+field_value_properties = {
+    'text_value': 'text',
+    'text_tag': 'text_tag',
+    'note_value': 'note',
+    'note_tag': 'note_tag',
+}
+
+CompiledField = namedtuple('CompiledField', [
+    'field_name',             # Name of field in descriptor.
+    'field_value_specifier',  # Where in the node the value lives (text_value, text_tag, note_value, note_tag).
+    'value_property',         # Property of the node holding the value (None if field_value_specifier not recognised).
+    'generation_criteria',    # Tuple of (generation, criteria) pairs for the criteria which test anything.
+    'depth',                  # Depth of the nodes the field matches.
+    'criteria_keys',          # Key of the criteria for each generation (None if the criteria don't test anything).
+])
+
+
+class DataNodeMatchingPlan:
+    def __init__(self, fields, fields_by_depth, criteria_by_key, record_field_names, default_row, primary_key_count):
+        """
+        Usually created using from_descriptor.
+
+        :param fields: Tuple of all the CompiledFields, in descriptor order.
+        :param fields_by_depth: Tuple indexed by depth of tuples of CompiledFields which match nodes at that depth.
+        :param criteria_by_key: Dict of NodeAncestryMatchingCriteria keyed by criteria key (one for each distinct
+                                set of criteria in the descriptor).
+        :param record_field_names: Tuple of the names of the fields of a record, primary key fields first.
+        :param default_row: Tuple of the default value for each field of a record, in the same order.
+        :param primary_key_count: Number of primary key fields (at the start of record_field_names).
+        """
+        self.fields = fields
+        self._fields_by_depth = fields_by_depth
+        self._criteria_by_key = criteria_by_key
+
+        self.record_field_names = record_field_names
+        self.field_positions = {field_name: position for position, field_name in enumerate(record_field_names)}
+        self.default_row = default_row
+        self.primary_key_count = primary_key_count
+
+    @classmethod
+    def from_descriptor(cls, descriptor):
+        """
+        Builds the plan from the descriptor section of a data node specifier structure.
+
+        :param descriptor: Dict of field specifications keyed by field name.
+        :return:
+        """
+        fields = []
+        fields_by_depth = []
+        criteria_by_key = {}
+        primary_key_fields = []
+        non_primary_key_fields = []
+        for field_name, field_specification in descriptor.items():
+            if field_specification['primary_key'] == 'yes':
+                primary_key_fields.append(field_name)
+            elif field_specification['primary_key'] == 'no':
+                non_primary_key_fields.append(field_name)
+
+        for field_name, field_specification in descriptor.items():
+            criteria = field_specification['ancestry_matching_criteria']
+            depth = len(criteria) - 1
+            if depth < 0:
+                # No criteria, so can't match any node.
+                continue
+
+            generation_criteria = tuple(
+                (generation, gen_criteria) for generation, gen_criteria in enumerate(criteria)
+                if not _is_wildcard(gen_criteria)
+            )
+            # Test the deepest generation first, as that is the one which is most likely to fail.
+            generation_criteria = tuple(reversed(generation_criteria))
+
+            criteria_keys = []
+            for gen_criteria in criteria:
+                key = _criteria_key(gen_criteria)
+                if key is not None:
+                    criteria_by_key.setdefault(key, gen_criteria)
+                criteria_keys.append(key)
+
+            field_value_specifier = field_specification['field_value_specifier']
+            compiled_field = CompiledField(
+                field_name=field_name,
+                field_value_specifier=field_value_specifier,
+                value_property=field_value_properties.get(field_value_specifier),
+                generation_criteria=generation_criteria,
+                depth=depth,
+                criteria_keys=tuple(criteria_keys),
+            )
+
+            fields.append(compiled_field)
+            while len(fields_by_depth) <= depth:
+                fields_by_depth.append([])
+            fields_by_depth[depth].append(compiled_field)
+
+        record_field_names = tuple(primary_key_fields + non_primary_key_fields)
+        default_row = tuple(descriptor[field_name].get('default_value') for field_name in record_field_names)
+
+        return cls(
+            tuple(fields),
+            tuple(tuple(depth_fields) for depth_fields in fields_by_depth),
+            criteria_by_key,
+            record_field_names,
+            default_row,
+            len(primary_key_fields),
+        )
+
+    @property
+    def max_depth(self):
+        """
+        Depth of the deepest node which any field can match.
+        """
+        return len(self._fields_by_depth) - 1
+
+    def fields_for_depth(self, depth):
+        """
+        The fields which could match a node at the supplied depth, in descriptor order.
+
+        :param depth:
+        :return:
+        """
+        if depth < len(self._fields_by_depth):
+            return self._fields_by_depth[depth]
+        else:
+            return ()
+
+    def match_field_node(self, node_ancestry_record):
+        """
+        Generates (field_name, field_value) for each field which the node (with the supplied ancestry) matches, in
+        descriptor order.
+
+        :param node_ancestry_record: UnleashedNodeAncestryRecord for the node.
+        :return:
+        """
+        fields = self.fields_for_depth(node_ancestry_record.depth)
+        if len(fields) == 0:
+            return
+
+        # Resolve the node for each generation once, so that all the fields are tested against the same node objects
+        # (and each node's text and note are only parsed once) rather than each criterion looking the node up again.
+        ancestry = [NodeAncestryItem(item.child_number, item.node) for item in node_ancestry_record]
+        for compiled_field in fields:
+            if matches_field(ancestry, compiled_field):
+                yield compiled_field.field_name, extract_field_value(ancestry[-1].node, compiled_field)
+
+    def match_subtree(self, unleashed_node, child_number=None, depth=0, candidates=None):
+        """
+        Generates (field_name, field_value) for each field matched by the nodes of the sub-tree headed by
+        unleashed_node, in document order (and descriptor order within a node).  This is the same sequence as
+        calling match_field_node for every node of the sub-tree, but only the branches which could still match a
+        field are visited.
+
+        By default unleashed_node is treated as the root of the data node.  The other parameters allow a sub-tree
+        further down a data node to be matched on its own, given the position of its root and the candidates which
+        matched the generations above it.
+
+        :param unleashed_node: UnleashedOutlineNode at the root of the sub-tree.
+        :param child_number: Child number of unleashed_node within its parent (None for the root of the data node).
+        :param depth: Depth of unleashed_node within the data node.
+        :param candidates: Fields whose criteria matched all the generations above unleashed_node (in descriptor
+                           order).  If not supplied, all fields.
+        :return:
+        """
+        if candidates is None:
+            candidates = self.fields
+
+        survivors, matches = self.match_node(NodeAncestryItem(child_number, unleashed_node), depth, candidates)
+        yield from matches
+        if len(survivors) == 0:
+            return
+
+        # Each entry on the stack is the (partly consumed) children of a node, along with the candidates which
+        # matched that node, and the depth of the children.
+        stack = [(unleashed_node.iter_children(), survivors, depth + 1)]
+        while len(stack) > 0:
+            children, parent_survivors, child_depth = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+
+            child_number, child_node = child
+            survivors, matches = self.match_node(NodeAncestryItem(child_number, child_node), child_depth,
+                                                 parent_survivors)
+            yield from matches
+            if len(survivors) > 0:
+                stack.append((child_node.iter_children(), survivors, child_depth + 1))
+
+    def match_node(self, node_ancestry_item, depth, candidates, results=None):
+        """
+        Tests a single node against the criteria for its own generation of each candidate field.
+
+        :param node_ancestry_item: NodeAncestryItem (holding an UnleashedOutlineNode) for the node.
+        :param depth: Depth of the node within the data node.
+        :param candidates: Fields whose criteria matched all the generations above the node.
+        :param results: Dict of the result of each set of criteria already evaluated for this node, keyed by
+                        criteria key.  Can be shared between plans matching the same node (with the same tag
+                        delimiters) so that criteria common to several specifiers are only evaluated once.  Results
+                        evaluated here are added to it.
+        :return: Tuple of the candidates deeper than this node which also match it (to pass to its children) and a
+                 list of (field_name, field_value) for the fields matched by the node itself.
+        """
+        survivors = []
+        matches = []
+        if results is None:
+            results = {}
+        for compiled_field in candidates:
+            if compiled_field.depth < depth:
+                continue
+
+            key = compiled_field.criteria_keys[depth]
+            if key is not None:
+                result = results.get(key)
+                if result is None:
+                    result = self._criteria_by_key[key].matches_criteria(node_ancestry_item)
+                    results[key] = result
+                if not result:
+                    continue
+
+            if compiled_field.depth == depth:
+                matches.append((compiled_field.field_name, extract_field_value(node_ancestry_item.node,
+                                                                               compiled_field)))
+            else:
+                survivors.append(compiled_field)
+
+        return survivors, matches
+
+    def assemble_rows(self, matches):
+        """
+        Assembles records from a sequence of (field_name, field_value) matches (in the order produced by
+        match_subtree), yielding each record as a tuple (in the order of record_field_names) as soon as it is
+        complete.
+
+        A record is complete when a value is found for a primary key field which already has one.  The new value
+        then starts the next record, which keeps the values of the primary key fields before it, but not those after
+        it or any of the other fields.  When a record is complete, any fields without a value are given their default
+        value, and these defaults are also carried forward into the next record in the same way.  A second value for
+        a field which isn't part of the primary key is ignored.
+
+        A record is always yielded at the end, so there is at least one record even if there are no matches.
+
+        :param matches: Iterable of (field_name, field_value).
+        :return:
+        """
+        field_positions = self.field_positions
+        primary_key_count = self.primary_key_count
+        default_row = self.default_row
+        field_count = len(default_row)
+
+        row = [None] * field_count
+        for field_name, field_value in matches:
+            position = field_positions[field_name]
+            if row[position] is None:
+                row[position] = field_value
+            elif position < primary_key_count:
+                yield _complete_row(row, default_row)
+
+                # Start the next record from this key field, clearing the key fields after it and all other fields.
+                row[position] = field_value
+                for later_position in range(position + 1, field_count):
+                    row[later_position] = None
+
+        yield _complete_row(row, default_row)
+
+    def row_as_dict(self, row):
+        """
+        The record for a row as a dict keyed by field name (in the same order as the row).
+
+        :param row:
+        :return:
+        """
+        return dict(zip(self.record_field_names, row))
+
+
+def _complete_row(row, default_row):
+    """
+    Fills in the default for any field in the (working) row which doesn't have a value, and returns the completed
+    row as a tuple.
+    """
+    for position, field_value in enumerate(row):
+        if field_value is None:
+            row[position] = default_row[position]
+    return tuple(row)
+
+
+def matches_field(ancestry, compiled_field):
+    """
+    Checks whether the ancestry of a node matches the criteria for a field, stopping at the first generation which
+    doesn't match.  The depth of the node must already be known to match the field.
+
+    :param ancestry: List of NodeAncestryItems (holding UnleashedOutlineNodes) from the root of the data node down to
+                     the node.
+    :param compiled_field:
+    :return:
+    """
+    for generation, gen_criteria in compiled_field.generation_criteria:
+        if not gen_criteria.matches_criteria(ancestry[generation]):
+            return False
+    return True
+
+
+def extract_field_value(field_node, compiled_field):
+    """
+    Equivalent of DataNodeSpecifier.extract_field for a compiled field.
+
+    :param field_node:
+    :param compiled_field:
+    :return:
+    """
+    if compiled_field.value_property is None:
+        raise ValueError(f"Unrecognised field specifier {compiled_field.field_value_specifier}")
+    return getattr(field_node, compiled_field.value_property)
+
+
+def _criteria_key(gen_criteria):
+    """
+    Key which is the same for criteria which test the same values, or None for criteria which don't test anything.
+    """
+    key = (
+        gen_criteria.child_number,
+        gen_criteria.text,
+        gen_criteria.note,
+        gen_criteria.text_tag,
+        gen_criteria.note_tag,
+    )
+    if key == (None, None, None, None, None):
+        return None
+    return key
+
+
+def _is_wildcard(gen_criteria):
+    return _criteria_key(gen_criteria) is None
@@ -0,0 +1,91 @@
+"""
+Extraction of the data nodes of an OPML document as the document arrives, using OpmlPushParser.
+
+Each top level outline element is searched for data nodes as soon as it is complete, and any it holds are extracted
+straight away with the specifier for their name, so the tables for the first data nodes are available while the rest
+of the document is still arriving, and the document is never held in full.
+"""
+from outline.opml_push_parser import OpmlPushParser, default_read_size
+from outlines_unleashed.unleashed_outline import data_node_regex
+from outlines_unleashed.unleashed_outline_exceptions import DuplicateDataNodeName
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+
+
+class DataNodePushExtractor:
+    def __init__(self, specifiers, tag_regex_text=None, tag_regex_note=None, full_validate=False):
+        """
+        :param specifiers: Dict of DataNodeSpecifiers keyed by data node name.  Data nodes with no specifier are
+                           skipped.  A name with a specifier must only appear once in the document (otherwise
+                           DuplicateDataNodeName is raised).
+        :param tag_regex_text: Default tag delimiters for the text of the nodes (before any override by a specifier).
+        :param tag_regex_note: Default tag delimiters for the note of the nodes.
+        :param full_validate: As for OpmlPushParser.
+        """
+        self.specifiers = specifiers
+        self.tag_regex_text = tag_regex_text
+        self.tag_regex_note = tag_regex_note
+        self.opml_parser = OpmlPushParser(full_validate=full_validate)
+        self._extracted_names = set()
+
+    def feed(self, data):
+        """
+        Parses the next piece of the document, and extracts the data nodes in any top level sub-trees it completes.
+
+        :param data: bytes (or str) continuing from the previous call.
+        :return: List of (data node name, DataNodeTable) in document order.
+        """
+        return self._extract_subtrees(self.opml_parser.feed(data))
+
+    def close(self):
+        """
+        Indicates the end of the document, and extracts any remaining data nodes.
+
+        :return: List of (data node name, DataNodeTable) in document order.
+        """
+        return self._extract_subtrees(self.opml_parser.close())
+
+    def _extract_subtrees(self, subtrees):
+        tables = []
+        for _, outline_node in subtrees:
+            top_level_node = UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=self.tag_regex_text,
+                                                                   tag_regex_note=self.tag_regex_note)
+            for ancestry_record in top_level_node.iter_unleashed_nodes():
+                data_node = ancestry_record.node()
+                match = data_node_regex.search(data_node.note)
+                if match is None or match.group(1) not in self.specifiers:
+                    continue
+
+                data_node_name = match.group(1)
+                if data_node_name in self._extracted_names:
+                    raise DuplicateDataNodeName(f'Data node name [{data_node_name}] appears more than once in outline')
+                self._extracted_names.add(data_node_name)
+                tables.append((data_node_name, self.specifiers[data_node_name].extract_data_node_table(data_node)))
+        return tables
+
+
+async def aiter_data_node_tables(stream_reader, specifiers, tag_regex_text=None, tag_regex_note=None,
+                                 full_validate=False, read_size=default_read_size):
+    """
+    Asynchronous generator of (data node name, DataNodeTable) for the data nodes of an OPML document read from an
+    asyncio.StreamReader, as soon as the top level sub-tree holding each one is complete.  As for
+    aiter_opml_subtrees, data is only read from the stream as the tables are consumed.
+
+    :param stream_reader: asyncio.StreamReader.
+    :param specifiers: As for DataNodePushExtractor.
+    :param tag_regex_text: As for DataNodePushExtractor.
+    :param tag_regex_note: As for DataNodePushExtractor.
+    :param full_validate: As for DataNodePushExtractor.
+    :param read_size: Maximum number of bytes to read from the stream at a time.
+    :return:
+    """
+    extractor = DataNodePushExtractor(specifiers, tag_regex_text=tag_regex_text, tag_regex_note=tag_regex_note,
+                                      full_validate=full_validate)
+    while True:
+        data = await stream_reader.read(read_size)
+        if len(data) == 0:
+            break
+        for table in extractor.feed(data):
+            yield table
+
+    for table in extractor.close():
+        yield table
@@ -1,6 +1,8 @@
-import copy
 import json
 from typing import Optional
+from outlines_unleashed.data_node_extraction import extract_partitioned_data_node_table
+from outlines_unleashed.data_node_matching_plan import DataNodeMatchingPlan
+from outlines_unleashed.data_node_table import DataNodeTable
 from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
 from outlines_unleashed.unleashed_outline_exceptions import InvalidDataNodeSpecifierVersion, InvalidDataNodeSpecifier
 
@@ -36,6 +38,9 @@ class DataNodeSpecifier:
         self.dns_structure = dns_structure
         self.validate_data_node_specifier()
 
+        # Matching plan, built by compile() the first time it is needed.
+        self._matching_plan = None
+
     def validate_data_node_specifier(self):
         """
         If a data structure is passed in from the user for the DNS then it needs to be checked.  If it is passed in
@@ -51,12 +56,8 @@ class DataNodeSpecifier:
         if 'descriptor' not in self.dns_structure:
             raise InvalidDataNodeSpecifier(f'[descriptor] record not present in Data Node Specifier')
 
-        header = self.dns_structure['header']
-        if 'tag_delimiters' not in header:
-            header['tag_delimiters'] = {
-                'note_delimiters': [None, None],
-                'text_delimiters': [None, None]
-            }
+        # Tag delimiters are optional in the header.  They aren't added here if missing (see tag_delimiters), so
+        # that the structure passed in isn't changed and can be shared.
 
     @classmethod
     def from_json_file(cls, json_path):
@@ -137,6 +138,37 @@ class DataNodeSpecifier:
 
         return cls(specifier)
 
+    @property
+    def tag_delimiters(self):
+        """
+        The tag delimiters from the header of the specifier, or delimiters of [None, None] (no override) for text and
+        note if the header doesn't include them.
+
+        :return:
+        """
+        header = self.dns_structure['header']
+        if 'tag_delimiters' in header:
+            return header['tag_delimiters']
+        return {
+            'note_delimiters': [None, None],
+            'text_delimiters': [None, None]
+        }
+
+    def compile(self, rebuild=False):
+        """
+        Gets the matching plan for this specifier, which groups the field descriptors by the depth of node they
+        can match so that each node of a data node is only tested against the fields for its own depth.
+
+        The plan is built the first time it is needed and then kept, so it reflects the descriptor at that time.  If
+        the descriptor is changed afterwards, call with rebuild=True to build the plan again.
+
+        :param rebuild: If True, the plan is re-built from the descriptor rather than re-using the existing plan.
+        :return: DataNodeMatchingPlan
+        """
+        if self._matching_plan is None or rebuild:
+            self._matching_plan = DataNodeMatchingPlan.from_descriptor(self.dns_structure['descriptor'])
+        return self._matching_plan
+
     def to_json_str(self):
         pass
 
@@ -208,34 +240,106 @@ class DataNodeSpecifier:
         passed in and then forwards the descriptor to the appropriate version specific extract
         method.
 
+        :param data_node:
+        :return:
+        """
+        return list(self.iter_records(data_node, **kwargs))
+
+    def iter_records(self, data_node, **kwargs):
+        """
+        Generator version of extract_data_node_dispatch, which yields each record of the data node as soon as it is
+        complete (that is when the next primary key value is found), so that records can be processed while the
+        data node is still being extracted, without holding the whole table in memory.
+
+        Each record is a new dict, so can be kept by the caller.
+
         :param data_node:
         :return:
         """
         version = self.dns_structure['header']['descriptor_version_number']
 
         if version == '0.1':
-            return self._extract_data_node_v0_1(data_node, **kwargs)
+            return self._iter_records_v0_1(data_node, **kwargs)
         else:
             raise InvalidDataNodeSpecifierVersion(f'Version of [{version}] not valid for Data Node Specifier.')
 
-    @staticmethod
-    def _initialise_data_node_record(field_list):
-        return {key: None for key in field_list}
+    def extract_data_node_table(self, data_node, **kwargs):
+        """
+        As extract_data_node_dispatch, but returns the records as a (columnar) DataNodeTable rather than a list of
+        dicts.  The rows of the table behave as the record dicts, with the fields in the same order.
 
-    def _cleanup_extracted_record(self, data_node_record):
+        :param data_node:
+        :return:
+        """
+        return self.create_data_node_table(self.iter_rows(data_node, **kwargs))
+
+    def extract_partitioned_data_node_table(self, data_node, max_workers=None):
         """
-        The record is passed in after all fields that are in the data node have been extracted.  This method
-        then checks for fields which weren't populated and gives them the default value for the field, taken
-        from the data node specifier.
+        As extract_data_node_table, but with the first level sub-trees of the data node matched in parallel in a
+        pool of worker processes.  Gives exactly the same table.  Worthwhile for a single very large data node.
+
+        See data_node_extraction.extract_partitioned_data_node_table for details.
 
-        :param data_node_record:
+        :param data_node:
+        :param max_workers: Number of worker processes (default is the number of CPUs).  If 1 the extraction is done
+                            in this process.
+        :return:
+        """
+        return extract_partitioned_data_node_table(self, data_node, max_workers=max_workers)
+
+    def create_data_node_table(self, rows):
+        """
+        Creates a DataNodeTable with the fields (and field types) of this specifier from rows as generated by
+        iter_rows.
+
+        :param rows:
         :return:
         """
-        for field in data_node_record:
-            if data_node_record[field] is None:
-                data_node_record[field] = self.extract_field_default_value(field)
+        field_names = self.compile().record_field_names
+        descriptor = self.dns_structure['descriptor']
+        field_types = [descriptor[field_name].get('type') for field_name in field_names]
+
+        return DataNodeTable.from_rows(field_names, rows, field_types=field_types)
+
+    def iter_rows(self, data_node, **kwargs):
+        """
+        As iter_records, but yields each record as a tuple of values, in the order of the fields given by
+        compile().record_field_names (primary key fields first, then the other fields, each in descriptor order).
+        This avoids creating a dict for each record; compile().row_as_dict converts a row to the record dict.
+
+        :param data_node:
+        :return:
+        """
+        version = self.dns_structure['header']['descriptor_version_number']
+
+        if version == '0.1':
+            return self._iter_rows_v0_1(data_node, **kwargs)
+        else:
+            raise InvalidDataNodeSpecifierVersion(f'Version of [{version}] not valid for Data Node Specifier.')
 
     def _extract_data_node_v0_1(self, data_node, override_data_node_tag_delim=False):
+        """
+        List of all the records extracted by _iter_records_v0_1.
+
+        :param data_node:
+        :param override_data_node_tag_delim:
+        :return:
+        """
+        return list(self._iter_records_v0_1(data_node, override_data_node_tag_delim=override_data_node_tag_delim))
+
+    def _iter_records_v0_1(self, data_node, override_data_node_tag_delim=False):
+        """
+        The records from _iter_rows_v0_1 as dicts.
+
+        :param data_node:
+        :param override_data_node_tag_delim:
+        :return:
+        """
+        matching_plan = self.compile()
+        for row in self._iter_rows_v0_1(data_node, override_data_node_tag_delim=override_data_node_tag_delim):
+            yield matching_plan.row_as_dict(row)
+
+    def _iter_rows_v0_1(self, data_node, override_data_node_tag_delim=False):
         """
         Parse the sub_tree with self as a root and extract all the nodes which match the criteria defined
         in the data_node_specifier.
@@ -252,9 +356,11 @@ class DataNodeSpecifier:
         the logic depends upon this.
 
         The records are created with fields (and types) according to the field definitions within the
-        data_node_specifier, and then added to a list in the order in wihch they appear in the tree.
+        data_node_specifier, and then yielded in the order in which they appear in the tree.  The matches are
+        consumed as the tree is traversed, so only the record currently being assembled is held.
 
-        This is what is then returned to the caller.
+        Records are assembled by the compiled plan (see DataNodeMatchingPlan.assemble_rows) as tuples with the fields
+        in the order given by the plan's record_field_names (primary key fields first).
 
         :param data_node: UnleashedOutlineNode object from UnleashedOutline
         :param override_data_node_tag_delim: If not set, then take tag delimiters from the node (if present). If set
@@ -264,71 +370,14 @@ class DataNodeSpecifier:
         """
         if override_data_node_tag_delim:
             # We are overriding the tag delimiters from the data node with those from the DNS.
-            delimiters = self.dns_structure['header']['tag_delimiters']
-
-            data_node.tag_regex_text = tuple(delimiters['text_delimiters'])
-            data_node.tag_regex_note = tuple(delimiters['note_delimiters'])
-
-        match_list = self.match_data_node(data_node)
-        data_node_table = []
-        primary_key_field_list = self.extract_field_names(primary_key_only=True)
-        non_primary_key_field_list = self.extract_field_names(primary_key_only=False)
-
-        # Initialise record for first row
-        data_node_record = self._initialise_data_node_record(primary_key_field_list+non_primary_key_field_list)
-
-        for match in match_list:
-            field_name, field_value = match
-            if data_node_record[field_name] is None:
-                data_node_record[field_name] = field_value
-            else:
-                # We have already populated this field, so either it's a new primary key value (end of record)
-                # or an error.
-                if field_name in primary_key_field_list:
-                    # A primary key field is about to be overwritten.
-                    # There are a few cases to process here:
-                    # - Current record must be complete now so can be written (all cases I think)
-                    # - If this is not the last primary key field of the set then we have effectively
-                    #   moved to a new branch and so we need to blank out any key fields in the data record
-                    #   we are constructing as well as all non-key fields
-                    # - Any fields which aren't populated will trigger a warning and an appropriate
-                    #   default value assigned.
-
-                    self._cleanup_extracted_record(data_node_record)
-
-                    # Append copy of record to output table so don't keep updating same pointer.
-                    data_node_table.append(copy.deepcopy(data_node_record))
-
-                    # Now update new primary key field as part of next record.
-                    data_node_record[field_name] = field_value
-
-                    # If this field isn't the last key field in the primary key, then blank out deeper
-                    # elements within the current data node record as it doesn't apply to the new branch.
-                    key_index = [index for index, value in enumerate(primary_key_field_list) if value == field_name]
-
-                    assert (len(key_index) == 1)
-                    if key_index[0] < len(primary_key_field_list) - 1:
-                        # Key field which isn't last one has changed so need to blank out deeper key
-                        # values in the data node record as they should be re-filled from next branch
-                        # of node tree.
-
-                        for index in range(key_index[0] + 1, len(primary_key_field_list)):
-                            data_node_record[primary_key_field_list[index]] = None
-
-                    # Initialise record for next row.  Key fields should be maintained apart from the one which has
-                    # changed. So just initialise non key fields and then update current key field.
-                    for field_name in non_primary_key_field_list:
-                        data_node_record[field_name] = None
-                else:
-                    # New value for non-primary key field.  That's an error (but only a warning to be issued)
-                    # ToDo: Add logging to allow warnings to be issued which don't stop programme.
-                    pass
+            delimiters = self.tag_delimiters
 
-        # All data fields have been processed, so just clean up the final record and add to the list.
-        self._cleanup_extracted_record(data_node_record)
-        data_node_table.append(copy.copy(data_node_record))
+            # The node may be shared with other users of the outline, so take a copy with the overridden delimiters
+            # rather than changing it.
+            data_node = data_node.clone_unleashed_node(text_tag_regex=tuple(delimiters['text_delimiters']),
+                                                       note_tag_regex=tuple(delimiters['note_delimiters']))
 
-        return data_node_table
+        return self.compile().assemble_rows(self.iter_matches(data_node))
 
     @staticmethod
     def _key_field_check(primary_key_filter, primary_key_flag):
@@ -356,17 +405,26 @@ class DataNodeSpecifier:
         field_specifications provided identify all nodes within the data_node sub-tree structure which match
         the supplied criteria, and extract the information required to fully define each extracted field
 
+        The sub-tree is walked using the compiled plan (see compile), which only visits the branches of the sub-tree
+        which could still match one of the fields.
+
         :param unleashed_node:
         :return: Information required to create a field object for each matched field and construct records
                  from the fields.
         """
+        return list(self.iter_matches(unleashed_node))
+
+    def iter_matches(self, unleashed_node):
+        """
+        Generator version of match_data_node, which yields each (field_name, field_value) as it is found.
+
+        :param unleashed_node:
+        :return:
+        """
         override_node = self._override_tag_regex(unleashed_node)
-        match_list = []
-        for data_node_list_entry in override_node.iter_unleashed_nodes():
-            for matched_field_data in self.match_field_node(data_node_list_entry):
-                match_list.append(matched_field_data)
+        matching_plan = self.compile()
 
-        return match_list
+        return matching_plan.match_subtree(override_node)
 
     def match_field_node(self, field_node_list_entry):
         """
@@ -379,6 +437,9 @@ class DataNodeSpecifier:
         This function is built as a generator to continue to return values until there are no more
         matches to look for.
 
+        Tests the node against every field in the descriptor.  match_data_node uses the compiled plan (see compile)
+        instead, which only tests the fields for the depth of the node.
+
         :param field_node_list_entry:
         :return:
         """
@@ -412,7 +473,6 @@ class DataNodeSpecifier:
             # So we walk down the ancestry from root to current generation and check for a match.  As soon as
             # we fail to get a match, we know the node doesn't match.  If we don't fail at all generations then
             # we have a match.
-            match = True
 
             # Create list of pairs from depth 1 to depth of node we are testing against.  Note that
             # a node list entry has ancestry starting at zero to represent the root of the outline, and
@@ -421,9 +481,9 @@ class DataNodeSpecifier:
             for pair in paired_gen_and_criteria:
                 generation, gen_criteria = pair
                 if not gen_criteria.matches_criteria(generation):
-                    match = False
+                    return False
 
-        return match
+            return True
 
     def _override_tag_regex(self, unleashed_node):
         """
@@ -433,8 +493,9 @@ class DataNodeSpecifier:
         :param unleashed_node:
         :return:
         """
-        text_regex_override = self.dns_structure['header']['tag_delimiters']['text_delimiters']
-        note_regex_override = self.dns_structure['header']['tag_delimiters']['note_delimiters']
+        tag_delimiters = self.tag_delimiters
+        text_regex_override = tag_delimiters['text_delimiters']
+        note_regex_override = tag_delimiters['note_delimiters']
 
         clone = False
         if text_regex_override is not None and text_regex_override != [None, None]:
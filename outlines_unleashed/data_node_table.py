@@ -1,4 +1,22 @@
-class DataNodeTable:
+"""
+Columnar table of the records extracted from a data node.
+
+Records extracted from a data node are usually highly repetitive: the primary key fields near the root of the data
+node (section, slide etc) have the same value for every record beneath them.  Rather than holding a dict per record
+(which repeats every key string and every repeated value reference in every row) the table holds one column per field.
+String columns are dictionary-encoded: each distinct value is held once and the column holds an array of integer
+codes into the list of distinct values.  Numeric columns hold their values in a typed array.
+
+Rows are accessed as DataNodeRow views onto the table, which behave as read-only dicts (Mappings) keyed by field name,
+so code written for a list of record dicts (such as the output generators) can use a DataNodeTable unchanged.  Slicing
+and filtering a table give a new table which shares the columns of the original and just holds the positions of the
+rows it includes, so neither copies any values.
+"""
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+class DataNodeTable(Sequence):
     """
     Generic representation of fields extracted from an outline into a set of data records with fields as
     defined within the Data Node Descriptor.
@@ -13,4 +31,317 @@ class DataNodeTable:
     multiple use cases to define PPT slide decks in different ways but all go through a common intermediate
     format to allow driving of the PPT output.  So it may be that all use cases will employ the DNT as
     the extraction format.
-    """
\ No newline at end of file
+    """
+    __hash__ = None
+
+    def __init__(self, field_names, columns, row_indexes=None):
+        """
+        Usually created using one of the factory methods (or DataNodeSpecifier.extract_data_node_table) rather than
+        directly.
+
+        :param field_names: Sequence of field names, in record order.
+        :param columns: Sequence of columns (DictionaryEncodedColumn or ValueColumn), one per field.
+        :param row_indexes: Positions within the columns of the rows included in this table (range or array).  If
+                            not supplied, all the rows of the columns.
+        """
+        self.field_names = tuple(field_names)
+        self._columns = tuple(columns)
+        self._column_by_name = dict(zip(self.field_names, self._columns))
+
+        if row_indexes is None:
+            row_indexes = range(len(self._columns[0]) if len(self._columns) > 0 else 0)
+        self._row_indexes = row_indexes
+
+    @classmethod
+    def from_rows(cls, field_names, rows, field_types=None):
+        """
+        Creates a table from an iterable of row tuples (for example from DataNodeSpecifier.iter_rows), with values
+        in the same order as field_names.
+
+        :param field_names: Sequence of field names.
+        :param rows: Iterable of tuples.
+        :param field_types: Optional sequence of the type of each field, as in the data node specifier ('string'
+                            etc).  String fields (and fields with no type) are dictionary-encoded.  Integer, float
+                            and boolean fields are held in typed arrays (see ValueColumn).
+        :return:
+        """
+        if field_types is None:
+            field_types = ['string'] * len(field_names)
+        columns = [_create_column(field_type) for field_type in field_types]
+        appenders = [column.append for column in columns]
+
+        for row in rows:
+            for append, value in zip(appenders, row):
+                append(value)
+
+        return cls(field_names, columns)
+
+    @classmethod
+    def from_records(cls, records, field_names=None, field_types=None):
+        """
+        Creates a table from a list of record dicts (as returned by DataNodeSpecifier.extract_data_node_dispatch).
+
+        :param records: Sequence of dicts.
+        :param field_names: Field names, in order.  If not supplied, the keys of the first record.
+        :param field_types: As for from_rows.
+        :return:
+        """
+        if field_names is None:
+            field_names = list(records[0]) if len(records) > 0 else []
+        rows = (tuple(record[field_name] for field_name in field_names) for record in records)
+        return cls.from_rows(field_names, rows, field_types=field_types)
+
+    def __len__(self):
+        return len(self._row_indexes)
+
+    def __getitem__(self, item):
+        """
+        An int gives a DataNodeRow view of that row.  A slice gives a DataNodeTable of the selected rows, sharing
+        the columns of this table.
+
+        :param item:
+        :return:
+        """
+        if isinstance(item, slice):
+            return DataNodeTable(self.field_names, self._columns, row_indexes=self._row_indexes[item])
+        return DataNodeRow(self, self._row_indexes[item])
+
+    def __eq__(self, other):
+        if isinstance(other, (DataNodeTable, list, tuple)):
+            return len(self) == len(other) and all(row == other_row for row, other_row in zip(self, other))
+        return NotImplemented
+
+    def column(self, field_name):
+        """
+        List of the values of a field for each row of the table.
+
+        :param field_name:
+        :return:
+        """
+        column = self._column_by_name[field_name]
+        return [column[index] for index in self._row_indexes]
+
+    def filter(self, field_name, condition):
+        """
+        Table of the rows for which the value of field_name meets the condition, sharing the columns of this table.
+
+        :param field_name:
+        :param condition: Either a value, to select rows where the field is equal to it, or a function taking the
+                          value and returning True for rows to select.  For dictionary-encoded columns the
+                          condition is only evaluated once for each distinct value.
+        :return:
+        """
+        column = self._column_by_name[field_name]
+        if callable(condition):
+            test = condition
+        else:
+            def test(value):
+                return value == condition
+
+        selected = array('L', column.select(self._row_indexes, test))
+        return DataNodeTable(self.field_names, self._columns, row_indexes=selected)
+
+    def iter_rows(self):
+        """
+        Generates a tuple of values for each row, in the order of field_names.
+        """
+        columns = self._columns
+        for index in self._row_indexes:
+            yield tuple(column[index] for column in columns)
+
+    def to_records(self):
+        """
+        List of record dicts, as returned by DataNodeSpecifier.extract_data_node_dispatch.
+        """
+        return [dict(zip(self.field_names, row)) for row in self.iter_rows()]
+
+    def to_numpy(self):
+        """
+        Dict of NumPy arrays keyed by field name.  NumPy is only needed if this method is used.
+
+        String columns are object arrays (so None values are preserved); for dictionary-encoded columns the array is
+        built from the distinct values and the codes, rather than value by value.  Integer, float and boolean columns
+        give arrays of the matching dtype, unless they have missing values (None), in which case they are object
+        arrays too.
+
+        :return:
+        """
+        try:
+            import numpy
+        except ImportError as err:
+            raise ImportError("NumPy is required for DataNodeTable.to_numpy()") from err
+
+        row_indexes = numpy.fromiter(self._row_indexes, dtype=numpy.int64, count=len(self._row_indexes))
+        return {
+            field_name: column.to_numpy(numpy)[row_indexes]
+            for field_name, column in zip(self.field_names, self._columns)
+        }
+
+    def __str__(self):
+        return f"DataNodeTable - fields: {len(self.field_names)}, rows: {len(self)}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class DataNodeRow(Mapping):
+    """
+    Read-only view of one row of a DataNodeTable, which behaves as the record dict keyed by field name.
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table: DataNodeTable, index: int):
+        """
+        :param table:
+        :param index: Position of the row within the columns of the table.
+        """
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, field_name):
+        return self.table._column_by_name[field_name][self.index]
+
+    def __iter__(self):
+        return iter(self.table.field_names)
+
+    def __len__(self):
+        return len(self.table.field_names)
+
+    def __contains__(self, field_name):
+        return field_name in self.table._column_by_name
+
+    def as_tuple(self):
+        return tuple(column[self.index] for column in self.table._columns)
+
+    def __str__(self):
+        return f"DataNodeRow: {dict(self)}"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class DictionaryEncodedColumn:
+    """
+    Column which holds each distinct value once, and an array of codes (positions in the list of distinct values)
+    with one entry per row.
+
+    Values which aren't strings are looked up by type as well as value, so that values which compare equal but are
+    of different types (1, 1.0 and True) are each held as they were supplied.
+    """
+    __slots__ = ('values', 'codes', '_code_by_value')
+
+    def __init__(self):
+        self.values = []
+        self.codes = array('L')
+        self._code_by_value = {}
+
+    def append(self, value):
+        key = value if type(value) is str else (type(value), value)
+        code = self._code_by_value.get(key)
+        if code is None:
+            code = len(self.values)
+            self._code_by_value[key] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def select(self, row_indexes, test):
+        """
+        Generates the row indexes for which test(value) is True, evaluating test once per distinct value.
+        """
+        selected_codes = {code for code, value in enumerate(self.values) if test(value)}
+        codes = self.codes
+        return (index for index in row_indexes if codes[index] in selected_codes)
+
+    def to_numpy(self, numpy):
+        values = numpy.empty(len(self.values), dtype=object)
+        values[:] = self.values
+        return values[numpy.frombuffer(self.codes, dtype=numpy.uint64 if self.codes.itemsize == 8 else numpy.uint32)]
+
+
+class ValueColumn:
+    """
+    Column which holds the value for each row directly.  Used for fields which aren't strings.
+
+    For integer, float and boolean fields the values are held in a typed array, with a flag for each row which has
+    no value (None), so that to_numpy gives an array of the matching dtype.  If a value of any other type is
+    appended, the column falls back to holding its values in a list.
+    """
+    __slots__ = ('values', 'value_type', 'missing')
+
+    def __init__(self, field_type=None):
+        """
+        :param field_type: Type of the field, as in the data node specifier.
+        """
+        typed_array_type = _typed_array_types.get(field_type)
+        if typed_array_type is None:
+            self.value_type = None
+            self.values = []
+        else:
+            self.value_type, typecode = typed_array_type
+            self.values = array(typecode)
+        self.missing = bytearray()
+
+    def append(self, value):
+        if self.value_type is not None:
+            if value is None:
+                self.values.append(0)
+                self.missing.append(1)
+                return
+            if type(value) is self.value_type:
+                try:
+                    self.values.append(value)
+                    self.missing.append(0)
+                    return
+                except OverflowError:
+                    pass
+            self._hold_as_list()
+        self.values.append(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        if self.value_type is None:
+            return self.values[index]
+        if self.missing[index]:
+            return None
+        return self.value_type(self.values[index])
+
+    def select(self, row_indexes, test):
+        return (index for index in row_indexes if test(self[index]))
+
+    def to_numpy(self, numpy):
+        if self.value_type is not None and 1 not in self.missing:
+            typecode = self.values.typecode
+            return numpy.frombuffer(self.values, dtype=typecode).astype(_numpy_dtypes[typecode])
+
+        values = numpy.empty(len(self.values), dtype=object)
+        values[:] = [self[index] for index in range(len(self.values))]
+        return values
+
+    def _hold_as_list(self):
+        self.values = [self[index] for index in range(len(self.values))]
+        self.value_type = None
+        self.missing = bytearray()
+
+
+# Python type and array typecode for the field types which are held in typed arrays, and the NumPy dtype for each
+# typecode.
+_typed_array_types = {
+    'integer': (int, 'q'),
+    'float': (float, 'd'),
+    'boolean': (bool, 'B'),
+}
+_numpy_dtypes = {'q': 'int64', 'd': 'float64', 'B': 'bool'}
+
+
+def _create_column(field_type):
+    if field_type is None or field_type == 'string':
+        return DictionaryEncodedColumn()
+    return ValueColumn(field_type)
@@ -0,0 +1,128 @@
+"""
+Extraction of the records for several data node specifiers from the same outline (or data node) in a single pass.
+
+Extracting with each specifier in turn walks the tree once per specifier, and parses tags and evaluates criteria for
+each node once per specifier.  extract_many walks the tree once, carrying forward the candidate fields of every
+specifier together (see DataNodeMatchingPlan.match_subtree for how the candidates are used), so each node is visited
+once however many specifiers there are, and a sub-tree is only skipped when none of the specifiers could match
+anything in it.
+
+Specifiers may use different tag delimiters (from their headers), so each node is viewed through one
+UnleashedOutlineNode per distinct delimiter configuration, and its tags are parsed once per configuration.  Specifiers
+with the same delimiters share the results of evaluating identical criteria for a node.
+"""
+from outline.node_ancestry_item import NodeAncestryItem
+from outline.outline import Outline
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_exceptions import InvalidDataNodeSpecifierVersion
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+
+
+def extract_many(outline_or_node, specifiers):
+    """
+    Extracts the records for each of the supplied specifiers, treating the supplied node (or the top node of the
+    supplied outline) as the root of the data node for all of them.
+
+    :param outline_or_node: UnleashedOutlineNode, UnleashedOutline or Outline.
+    :param specifiers: Sequence of DataNodeSpecifiers.
+    :return: List of DataNodeTables, one for each specifier in the same order, each holding the same records as
+             specifier.extract_data_node_table would for the same node.
+    """
+    root_node = _root_unleashed_node(outline_or_node)
+
+    plans = []
+    view_indexes = []
+    delimiter_views = []  # Distinct (text delimiters, note delimiters) pairs used by the specifiers.
+    for specifier in specifiers:
+        version = specifier.dns_structure['header']['descriptor_version_number']
+        if version != '0.1':
+            raise InvalidDataNodeSpecifierVersion(f'Version of [{version}] not valid for Data Node Specifier.')
+        plans.append(specifier.compile())
+
+        specifier_root = specifier._override_tag_regex(root_node)
+        delimiters = specifier_root.delimiter_key
+        if delimiters not in delimiter_views:
+            delimiter_views.append(delimiters)
+        view_indexes.append(delimiter_views.index(delimiters))
+
+    match_lists = [[] for _ in plans]
+    _match_all(root_node.outline_node, plans, view_indexes, delimiter_views, match_lists)
+
+    return [
+        specifier.create_data_node_table(plan.assemble_rows(matches))
+        for specifier, plan, matches in zip(specifiers, plans, match_lists)
+    ]
+
+
+def _root_unleashed_node(outline_or_node):
+    if isinstance(outline_or_node, UnleashedOutline):
+        return UnleashedOutlineNode.for_outline_node(outline_or_node.outline.top_outline_node,
+                                                     tag_regex_text=outline_or_node.default_text_tag_delimiter,
+                                                     tag_regex_note=outline_or_node.default_note_tag_delimiter)
+    elif isinstance(outline_or_node, Outline):
+        return UnleashedOutlineNode.for_outline_node(outline_or_node.top_outline_node)
+    else:
+        return outline_or_node
+
+
+def _match_all(root_outline_node, plans, view_indexes, delimiter_views, match_lists):
+    """
+    Walks the tree from root_outline_node, adding the matches for each plan to the corresponding list of matches.
+    """
+    candidates_list = [plan.fields for plan in plans]
+    survivors_list = _match_node(root_outline_node, None, 0, candidates_list, plans, view_indexes, delimiter_views,
+                                 match_lists)
+    if survivors_list is None:
+        return
+
+    # Each entry on the stack is the (partly consumed) children of a node, along with the survivors for each plan
+    # from that node, and the depth of the children.
+    stack = [(enumerate(root_outline_node, 1), survivors_list, 1)]
+    while len(stack) > 0:
+        children, parent_survivors_list, child_depth = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+
+        child_number, child_node = child
+        survivors_list = _match_node(child_node, child_number, child_depth, parent_survivors_list, plans, view_indexes,
+                                     delimiter_views, match_lists)
+        if survivors_list is not None:
+            stack.append((enumerate(child_node, 1), survivors_list, child_depth + 1))
+
+
+def _match_node(outline_node, child_number, depth, candidates_list, plans, view_indexes, delimiter_views,
+                match_lists):
+    """
+    Matches one node for every plan which still has candidates.
+
+    :return: List of the survivors for each plan, or None if no plan has any survivors (so the children of the node
+             needn't be visited).
+    """
+    items = [None] * len(delimiter_views)
+    results = [None] * len(delimiter_views)
+
+    survivors_list = []
+    any_survivors = False
+    for plan, view_index, candidates, matches in zip(plans, view_indexes, candidates_list, match_lists):
+        if len(candidates) == 0:
+            survivors_list.append(candidates)
+            continue
+
+        item = items[view_index]
+        if item is None:
+            text_delimiters, note_delimiters = delimiter_views[view_index]
+            unleashed_node = UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=text_delimiters,
+                                                                   tag_regex_note=note_delimiters)
+            item = NodeAncestryItem(child_number, unleashed_node)
+            items[view_index] = item
+            results[view_index] = {}
+
+        survivors, node_matches = plan.match_node(item, depth, candidates, results[view_index])
+        matches.extend(node_matches)
+        survivors_list.append(survivors)
+        if len(survivors) > 0:
+            any_survivors = True
+
+    return survivors_list if any_survivors else None
@@ -1,11 +1,14 @@
 import re
-from functools import reduce
+from functools import lru_cache, reduce
 from typing import Tuple
 
 whitespace_characters_regex = r'\s*'
 tag_characters_regex = '[a-zA-Z-_]+'
 text_characters_regex = '.+'
 
+# Number of distinct delimiter pairs to keep compiled descriptors for.  In practice an outline uses one or two pairs.
+tag_field_descriptor_cache_size = 32
+
 
 def escape_regex_match(pattern):
     """
@@ -46,3 +49,44 @@ class TagFieldDescriptor:
             tag = groups[0].strip()
             text = groups[1].strip()
             return text, tag
+
+
+def get_tag_field_descriptor(regex_delimiter: Tuple[str, str]) -> TagFieldDescriptor:
+    """
+    Gets the TagFieldDescriptor for the supplied delimiters.  Descriptors are compiled once per (left, right)
+    delimiter pair and shared, so that parsing the tags of many nodes doesn't re-compile the regex each time.
+
+    Args:
+        regex_delimiter: (left, right) delimiter pair, as a tuple or list.
+    """
+    left_delim, right_delim = regex_delimiter
+    return _compiled_tag_field_descriptor(left_delim, right_delim)
+
+
+@lru_cache(maxsize=tag_field_descriptor_cache_size)
+def _compiled_tag_field_descriptor(left_delim, right_delim):
+    return TagFieldDescriptor((left_delim, right_delim))
+
+
+def add_tag_parse_cache(flat_outline, field_name, regex_delimiter: Tuple[str, str]):
+    """
+    Parses the text or note of every node of a FlatOutline with the supplied delimiters, and adds the results to the
+    tag-parse cache of the FlatOutline (so they are saved with it by FlatOutline.write_snapshot).
+    UnleashedOutlineNodes using the same delimiters then take the parsed values from the cache.
+
+    Args:
+        flat_outline: FlatOutline.
+        field_name: 'text' or 'note'.
+        regex_delimiter: (left, right) delimiter pair.
+    """
+    tag_field_descriptor = get_tag_field_descriptor(regex_delimiter)
+    field_values = getattr(flat_outline, field_name)
+
+    texts = []
+    tags = []
+    for index in range(len(flat_outline)):
+        text, tag = tag_field_descriptor.parse_tag(field_values[index])
+        texts.append(text)
+        tags.append(tag)
+
+    flat_outline.tag_parse_cache[(field_name, tuple(regex_delimiter))] = (texts, tags)
@@ -20,7 +20,11 @@ class UnleashedNodeAncestryItem:
 
     @property
     def node(self):
-        from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
-        return UnleashedOutlineNode(self.node_ancestry_item.node,
-                                    tag_regex_text=self.text_tag_regex,
-                                    tag_regex_note = self.note_tag_regex)
+        return unleashed_outline_node.UnleashedOutlineNode.for_outline_node(self.node_ancestry_item.node,
+                                                                            tag_regex_text=self.text_tag_regex,
+                                                                            tag_regex_note=self.note_tag_regex)
+
+
+# Imported at the end of the module as unleashed_outline_node imports this module (through
+# unleashed_node_ancestry_record), and the class is only needed once both modules have loaded.
+from outlines_unleashed import unleashed_outline_node  # noqa: E402
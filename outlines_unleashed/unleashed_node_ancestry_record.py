@@ -19,6 +19,12 @@ class UnleashedNodeAncestryRecord:
     def __len__(self):
         return len(self.node_ancestry_record)
 
+    def __iter__(self):
+        for node_ancestry_item in self.node_ancestry_record:
+            yield UnleashedNodeAncestryItem(node_ancestry_item,
+                                            text_tag_regex=self.text_tag_regex,
+                                            note_tag_regex=self.note_tag_regex)
+
     def __getitem__(self, item):
         return UnleashedNodeAncestryItem(self.node_ancestry_record[item],
                                          text_tag_regex=self.text_tag_regex,
@@ -48,13 +54,15 @@ class UnleashedNodeAncestryRecord:
         ElementTree.Element objects as these determine when two nodes are
         identical. So deepcopy won't work.
 
-        This will create a new NodeAncestry object with a new list of
-        NodeAncestryItems which are references to the same NodeAncestryItems
-        from the source object.
+        This will create a new UnleashedNodeAncestryRecord wrapping a copy of
+        the underlying NodeAncestryRecord, which shares the records for the
+        ancestors of the node with the source object.
         """
 
         copied_node_ancestry_record = copy(self.node_ancestry_record)
-        return UnleashedNodeAncestryRecord(copied_node_ancestry_record)
+        return UnleashedNodeAncestryRecord(copied_node_ancestry_record,
+                                           text_tag_regex=self.text_tag_regex,
+                                           note_tag_regex=self.note_tag_regex)
 
     def append_node_to_ancestry(self, node_ancestry_item):
         """
@@ -73,7 +81,4 @@ class UnleashedNodeAncestryRecord:
             return self[-1].node
 
     def child_ancestry(self):
-        child_ancestry = [item.child_number for item in self.node_ancestry_record]
-
-        # Don't include the root node in the child_ancestry
-        return tuple(child_ancestry[1:])
+        return self.node_ancestry_record.child_ancestry()
@@ -8,18 +8,31 @@ list_all_nodes method.
 """
 import re
 
+from typing import Union
+
+from outline.flat_outline import FlatOutline
+from outline.opml_exceptions import DuplicateSubtreeName
 from outline.outline import Outline
+from outline.subtree_index import load_subtree
+from outlines_unleashed.data_node_extraction import extract_data_node_tables
+from outlines_unleashed.unleashed_outline_exceptions import DuplicateDataNodeName
 from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
 
+# Data nodes are identified by a note containing '{data_node: <name>}'.
+# For now, just look for curly braces beginning and end.  Later use more sophisticated JSON decoding.
+data_node_regex = re.compile(r"\{data_node: (\w+)\}")
+
 
 class UnleashedOutline:
-    def __init__(self, outline: Outline, default_text_tag_delimiter=None, default_note_tag_delimiter=None):
+    def __init__(self, outline: Union[Outline, FlatOutline], default_text_tag_delimiter=None,
+                 default_note_tag_delimiter=None):
         """
         Note.  While we are wrapping the Outline object we aren't trying to hide it.  Access to standard methods
         of the Outline object which aren't changed by the wrapper class are accessed by simply accessing the inner
         Outline object and calling the method.
 
-        :param outline:
+        :param outline: Outline, or a FlatOutline (for example as created directly from an indented text file by
+                        PreprocessorTextIndent.pre_process_flat_outline), which avoids creating any XML elements.
         :param default_text_tag_delimiter: text tag delimiter to use when extracting data nodes, unless overridden.
         :param default_note_tag_delimiter: note tag delimiter to use when extracting data nodes, unless overridden.
         """
@@ -27,19 +40,43 @@ class UnleashedOutline:
         self.default_note_tag_delimiter = default_note_tag_delimiter
         self.outline = outline
 
+    @staticmethod
+    def load_data_node(opml_path, data_node_name, tag_regex_text=None, tag_regex_note=None):
+        """
+        Reads and parses just the sub-tree of the named data node from an OPML file, rather than the whole file.
+
+        The position of each data node in the file is found from an index held in a sidecar file next to the OPML
+        file (see Outline.load_subtree), which also records the name of each data node.
+
+        :param opml_path: Path of OPML file.
+        :param data_node_name: Name of data node (as given in its note).
+        :param tag_regex_text: Tag delimiters for the text of the nodes.
+        :param tag_regex_note: Tag delimiters for the note of the nodes.
+        :return: UnleashedOutlineNode at the root of the data node.  Raises DuplicateDataNodeName if more than one
+                 data node has the name.
+        """
+        try:
+            outline_node = load_subtree(opml_path, name=data_node_name, name_regex=data_node_regex)
+        except DuplicateSubtreeName as err:
+            raise DuplicateDataNodeName(f'Data node name [{data_node_name}] appears more than once in outline') from err
+        return UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=tag_regex_text,
+                                                     tag_regex_note=tag_regex_note)
+
     def iter_unleashed_nodes(self):
-        return UnleashedOutlineNode(self.outline.top_outline_node,
-                                    tag_regex_text=self.default_text_tag_delimiter,
-                                    tag_regex_note=self.default_note_tag_delimiter).iter_unleashed_nodes()
+        return UnleashedOutlineNode.for_outline_node(
+            self.outline.top_outline_node,
+            tag_regex_text=self.default_text_tag_delimiter,
+            tag_regex_note=self.default_note_tag_delimiter).iter_unleashed_nodes()
 
     def list_unleashed_nodes(self):
         return list(self.iter_unleashed_nodes())
 
     def get_node(self, node_number):
         top_level_outline_node = self.outline.top_outline_node
-        unleashed_top_level_node = UnleashedOutlineNode(top_level_outline_node,
-                                                        tag_regex_text=self.default_text_tag_delimiter,
-                                                        tag_regex_note=self.default_note_tag_delimiter)
+        unleashed_top_level_node = UnleashedOutlineNode.for_outline_node(
+            top_level_outline_node,
+            tag_regex_text=self.default_text_tag_delimiter,
+            tag_regex_note=self.default_note_tag_delimiter)
         return unleashed_top_level_node.get_node(node_number)
 
     def extract_data_nodes(self):
@@ -54,19 +91,52 @@ class UnleashedOutline:
         :return:
         """
         data_nodes = []
-        for node_sequence_number, node in \
-                enumerate([ancestry_record.node() for ancestry_record in self.list_unleashed_nodes()]):
-            note_text = node.note
+        for data_node_name, node_sequence_number, node in self.iter_data_nodes():
+            data_nodes.append({
+                'data_node_name': data_node_name,
+                'data_node_list_index': node_sequence_number
+            })
+
+        return data_nodes
+
+    def iter_data_nodes(self):
+        """
+        Generates (data node name, list index, UnleashedOutlineNode) for each data node in the outline, in document
+        order, where list index is the position of the node in list_unleashed_nodes().
 
-            # For now, just look for curly braces beginning and end.  Later use more sophisticated JSON decoding.
-            data_node_regex = r"\{data_node: (\w+)\}"
-            match = re.search(data_node_regex, note_text)
+        :return:
+        """
+        for node_sequence_number, ancestry_record in enumerate(self.iter_unleashed_nodes()):
+            node = ancestry_record.node()
+            match = data_node_regex.search(node.note)
 
             if match is not None:
-                data_node_name = match.group(1)
-                data_nodes.append({
-                    'data_node_name': data_node_name,
-                    'data_node_list_index': node_sequence_number
-                })
+                yield match.group(1), node_sequence_number, node
 
-        return data_nodes
+    def extract_data_node_table(self, specifier, node_number=0):
+        """
+        Extracts the sub-tree headed by the supplied node using the specifier, without it needing to be marked as a
+        data node.  By default the whole outline is extracted, for example for an outline pre-processed from an
+        indented text file, which has no notes to mark data nodes.
+
+        :param specifier: DataNodeSpecifier to extract with.
+        :param node_number: Position of the node at the root of the data node in list_unleashed_nodes().
+        :return: DataNodeTable
+        """
+        return specifier.extract_data_node_table(self.get_node(node_number).node())
+
+    def extract_data_node_tables(self, specifiers, max_workers=None):
+        """
+        Finds the data nodes in the outline and extracts each one using the specifier for its name, running the
+        extractions in parallel in a pool of worker processes.
+
+        See data_node_extraction.extract_data_node_tables for details.
+
+        :param specifiers: Dict of DataNodeSpecifiers keyed by data node name.  Data nodes with no specifier are
+                           skipped.
+        :param max_workers: Number of worker processes (default is the number of CPUs).  If 1 (or there is only
+                            one data node to extract) the extraction is done in this process.
+        :return: Dict of DataNodeTables keyed by data node name, in the order the data nodes appear in the outline.
+        """
+        data_nodes = [(data_node_name, node) for data_node_name, _, node in self.iter_data_nodes()]
+        return extract_data_node_tables(data_nodes, specifiers, max_workers=max_workers)
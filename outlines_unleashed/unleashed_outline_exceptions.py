@@ -7,4 +7,8 @@ class InvalidDataNodeSpecifierVersion(Exception):
 
 
 class InvalidDataNodeSpecifier(Exception):
-    pass
\ No newline at end of file
+    pass
+
+
+class DuplicateDataNodeName(Exception):
+    pass
@@ -1,10 +1,21 @@
 """
 Wrapper class for an OutlineNode which adds in the additional functionality such as extract of tag, text from
 the text field of a node.
+
+UnleashedOutlineNodes are obtained through UnleashedOutlineNode.for_outline_node, which keeps one wrapper per
+outline node and tag delimiter configuration in the wrapper cache of the underlying outline, so that repeated access
+to a node (for example while matching each generation of the ancestry of every node in a data node) doesn't create a
+new wrapper each time.  As a wrapper may be shared, its tag delimiters can't be changed once it has been created;
+use clone_unleashed_node to get a wrapper with different delimiters.
+
+The (text, tag) pair parsed from each of the text and note fields is kept on the wrapper the first time it is needed,
+so each field of a node is parsed at most once for a given set of delimiters, however many of text, text_tag, note
+and note_tag are accessed.  Where the underlying node already holds the parsed field (a FlatOutline with a tag-parse
+cache for the same delimiters, see add_tag_parse_cache), it isn't parsed at all.
 """
 from typing import Tuple
 
-from outlines_unleashed.tag_field_descriptor import TagFieldDescriptor
+from outlines_unleashed.tag_field_descriptor import get_tag_field_descriptor
 from outlines_unleashed.unleashed_node_ancestry_record import UnleashedNodeAncestryRecord
 
 
@@ -15,8 +26,57 @@ class UnleashedOutlineNode:
         tag_regex_note: Tuple[str, str] = None
     ):
         self.outline_node = outline_node
-        self.tag_regex_text = tag_regex_text
-        self.tag_regex_note = tag_regex_note
+        self._tag_regex_text = tag_regex_text
+        self._tag_regex_note = tag_regex_note
+
+        # Parsed (text, tag) pairs for the text and note fields, filled in when first needed.
+        self._parsed_text = None
+        self._parsed_note = None
+
+    @classmethod
+    def for_outline_node(
+        cls, outline_node,
+        tag_regex_text: Tuple[str, str] = None,
+        tag_regex_note: Tuple[str, str] = None
+    ):
+        """
+        Gets the UnleashedOutlineNode for the supplied outline node and tag delimiters, re-using the existing wrapper
+        if there is one still in use.  Nodes which don't support a wrapper cache just get a new wrapper.
+
+        :param outline_node: OutlineNode (or FlatOutlineNode) to wrap.
+        :param tag_regex_text:
+        :param tag_regex_note:
+        :return:
+        """
+        get_wrapper = getattr(outline_node, 'get_wrapper', None)
+        if get_wrapper is None:
+            return cls(outline_node, tag_regex_text=tag_regex_text, tag_regex_note=tag_regex_note)
+
+        variant = (cls, _delimiter_key(tag_regex_text), _delimiter_key(tag_regex_note))
+        return get_wrapper(variant, cls, outline_node, tag_regex_text, tag_regex_note)
+
+    @property
+    def tag_regex_text(self):
+        """
+        Tag delimiters for the text field.  Read-only, as the wrapper may be shared; use clone_unleashed_node to get
+        a wrapper with different delimiters.
+        """
+        return self._tag_regex_text
+
+    @property
+    def tag_regex_note(self):
+        """
+        Tag delimiters for the note field.  Read-only, as for tag_regex_text.
+        """
+        return self._tag_regex_note
+
+    @property
+    def delimiter_key(self):
+        """
+        The text and note tag delimiters of this wrapper as a hashable tuple, so that wrappers with the same
+        delimiters (whether supplied as lists or tuples) have equal keys.
+        """
+        return _delimiter_key(self._tag_regex_text), _delimiter_key(self._tag_regex_note)
 
     @property
     def text(self):
@@ -26,8 +86,7 @@ class UnleashedOutlineNode:
 
         :return: The text attribute of self.node
         """
-        field_text = self.outline_node.text
-        text, tag = self._extract_tag_and_text(field_text, self.tag_regex_text)
+        text, tag = self._parse_text()
         return text
 
     @property
@@ -37,31 +96,64 @@ class UnleashedOutlineNode:
 
         :return: The _note attribute of self.node
         """
-        field_text = self.outline_node.note
-        text, tag = self._extract_tag_and_text(field_text, self.tag_regex_note)
+        text, tag = self._parse_note()
         return text
 
     @property
     def text_tag(self):
-        field_text = self.outline_node.text
-        text, tag = self._extract_tag_and_text(field_text, self.tag_regex_text)
+        text, tag = self._parse_text()
         return tag
 
     @property
     def note_tag(self):
-        field_text = self.outline_node.note
-        text, tag = self._extract_tag_and_text(field_text, self.tag_regex_note)
+        text, tag = self._parse_note()
         return tag
 
+    def _parse_text(self):
+        if self._parsed_text is None:
+            self._parsed_text = self._get_parsed_field('text', self._tag_regex_text)
+        return self._parsed_text
+
+    def _parse_note(self):
+        if self._parsed_note is None:
+            self._parsed_note = self._get_parsed_field('note', self._tag_regex_note)
+        return self._parsed_note
+
+    def _get_parsed_field(self, field_name, regex_delim):
+        """
+        Nodes which hold their own tag-parse cache (FlatOutlineNodes read from a snapshot) are asked for the parsed
+        field first, and the field is only parsed here if they don't have it.
+        """
+        if regex_delim is not None:
+            get_parsed_field = getattr(self.outline_node, 'get_parsed_field', None)
+            if get_parsed_field is not None:
+                parsed_field = get_parsed_field(field_name, regex_delim)
+                if parsed_field is not None:
+                    return parsed_field
+
+        return self._extract_tag_and_text(getattr(self.outline_node, field_name), regex_delim)
+
     @staticmethod
     def _extract_tag_and_text(text: str, regex_delim: Tuple[str, str]):
         if regex_delim is None:
             return text, None
         else:
-            tag_field_descriptor = TagFieldDescriptor(regex_delim)
+            tag_field_descriptor = get_tag_field_descriptor(regex_delim)
 
             return tag_field_descriptor.parse_tag(text)
 
+    def iter_children(self):
+        """
+        Generates (child_number, UnleashedOutlineNode) for each child of this node, using the same tag delimiters as
+        this node.
+
+        :return:
+        """
+        for child_number, child in enumerate(self.outline_node, 1):
+            yield child_number, UnleashedOutlineNode.for_outline_node(child,
+                                                                      tag_regex_text=self._tag_regex_text,
+                                                                      tag_regex_note=self._tag_regex_note)
+
     def iter_unleashed_nodes(self):
         for outline_node_ancestry_record in self.outline_node.iter_nodes():
             yield UnleashedNodeAncestryRecord(outline_node_ancestry_record,
@@ -87,4 +179,15 @@ class UnleashedOutlineNode:
         else:
             note_regex = note_tag_regex
 
-        return UnleashedOutlineNode(self.outline_node, tag_regex_text=text_regex, tag_regex_note=note_regex)
+        return UnleashedOutlineNode.for_outline_node(self.outline_node,
+                                                     tag_regex_text=text_regex, tag_regex_note=note_regex)
+
+
+def _delimiter_key(regex_delim):
+    """
+    Delimiters may be supplied as a list (from a JSON specifier) or a tuple, so normalise to a tuple for use as
+    part of a cache key.
+    """
+    if regex_delim is None:
+        return None
+    return tuple(regex_delim)
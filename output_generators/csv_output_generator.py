@@ -1,15 +1,242 @@
 import csv
+import gzip
+import time
+from collections.abc import Mapping
+from operator import itemgetter
+
+from outlines_unleashed.data_node_table import DataNodeTable
+
+# Number of rows passed to the csv writer at a time by CsvStreamWriter.
+default_batch_size = 10000
+
+# Size of the buffer for the output file of CsvStreamWriter.
+default_buffer_size = 1024 * 1024
+
+# Returned by next() when there are no more rows, distinct from any row (including None).
+_end_of_input = object()
 
 
 class CsvOutputGenerator:
     @staticmethod
-    def create_csv_file(data_table, output_path):
-        # Use first record to extract field names.
-        # ToDo: Find cleaner way of passing field names.  Shouldn't need to derive from a data record.
-        field_names = [key for key in data_table[0]]
-
-        with open(output_path, 'w', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=field_names)
-            writer.writeheader()
-            for row in data_table:
-                writer.writerow(row)
+    def create_csv_file(data_table, output_path, field_names=None):
+        """
+        :param data_table: List of record dicts, or a DataNodeTable.
+        :param output_path:
+        :param field_names: Field names for the header (and the order of the columns).  Defaults to the field names
+                            of the table, or the keys of the first record.  If there are no records and no field
+                            names, an empty file is written.
+        :return:
+        """
+        if isinstance(data_table, DataNodeTable):
+            # The table knows its fields and can supply each row as a tuple in the same order.
+            if field_names is None:
+                field_names = data_table.field_names
+            with CsvStreamWriter(output_path, field_names) as writer:
+                writer.write_table(data_table)
+            return
+
+        if field_names is None:
+            # Use first record to extract field names.
+            field_names = [key for key in data_table[0]] if len(data_table) > 0 else []
+
+        with CsvStreamWriter(output_path, field_names) as writer:
+            writer.write_records(data_table)
+
+    @staticmethod
+    def stream_csv_file(specifier, data_node, output_path, compress=None, batch_size=default_batch_size):
+        """
+        Extracts a data node straight to a CSV file, writing each record as it is extracted, so the records are never
+        all held in memory, however many there are.  The columns are in the same order as for create_csv_file with
+        the records or table extracted by the specifier (primary key fields first).
+
+        :param specifier: DataNodeSpecifier to extract the data node with.
+        :param data_node: UnleashedOutlineNode at the root of the data node.
+        :param output_path:
+        :param compress: As for CsvStreamWriter.
+        :param batch_size: As for CsvStreamWriter.
+        :return: CsvWriteStats.
+        """
+        with CsvStreamWriter.for_specifier(specifier, output_path, compress=compress,
+                                           batch_size=batch_size) as writer:
+            writer.write_rows(specifier.iter_rows(data_node))
+        return writer.stats
+
+
+class CsvWriteStats:
+    """
+    Number of rows written by a CsvStreamWriter and how long it took.
+    """
+    def __init__(self):
+        self.rows = 0
+        self.start_time = time.perf_counter()
+        self.end_time = None
+
+    @property
+    def elapsed(self):
+        end_time = time.perf_counter() if self.end_time is None else self.end_time
+        return end_time - self.start_time
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return f"{self.rows} rows in {self.elapsed:.3f}s ({self.rows_per_second:.0f} rows/s)"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class CsvStreamWriter:
+    def __init__(self, output_path, field_names, compress=None, batch_size=default_batch_size,
+                 buffer_size=default_buffer_size):
+        """
+        Writes rows to a CSV file as they are supplied, in batches, so that any number of rows can be written in
+        constant memory.  The header is written when the file is opened, so a file with no rows still has a header.
+
+        Use as a context manager, or call close when finished.
+
+        :param output_path:
+        :param field_names: Names of the columns, in order.
+        :param compress: If True the file is written gzip compressed.  If None, the file is compressed if the path
+                         ends with .gz.
+        :param batch_size: Number of rows to collect before passing them to the csv writer.
+        :param buffer_size: Size of the buffer for the output file.
+        """
+        self.output_path = output_path
+        self.field_names = tuple(field_names)
+        self._field_name_set = frozenset(self.field_names)
+        self.compress = str(output_path).endswith('.gz') if compress is None else compress
+        self.batch_size = batch_size
+        self.stats = CsvWriteStats()
+
+        if self.compress:
+            self._file = gzip.open(output_path, 'wt', newline='')
+        else:
+            self._file = open(output_path, 'w', newline='', buffering=buffer_size)
+        self._writer = csv.writer(self._file)
+        self._batch = []
+        if len(self.field_names) > 0:
+            self._writer.writerow(self.field_names)
+
+    @classmethod
+    def for_specifier(cls, specifier, output_path, **kwargs):
+        """
+        Creates a writer whose columns are the fields of the supplied DataNodeSpecifier, in the order of the rows
+        from DataNodeSpecifier.iter_rows (the record_field_names of its matching plan: primary key fields first,
+        then the other fields).
+
+        :param specifier: DataNodeSpecifier.
+        :param output_path:
+        :param kwargs: As for __init__.
+        :return:
+        """
+        return cls(output_path, specifier.compile().record_field_names, **kwargs)
+
+    def write_rows(self, rows, field_names=None):
+        """
+        Writes rows supplied as sequences of values.
+
+        :param rows: Iterable of rows (tuples, lists etc).
+        :param field_names: Names of the values of each row, if they are not the columns of the file in the same
+                            order (e.g. the record_field_names of a DataNodeMatchingPlan, for rows from
+                            DataNodeSpecifier.iter_rows).
+        :return:
+        """
+        if field_names is not None and tuple(field_names) != self.field_names:
+            rows = map(self._row_reorderer(field_names), rows)
+
+        batch = self._batch
+        batch_size = self.batch_size
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self._flush_batch()
+
+    def write_records(self, records, extrasaction='raise'):
+        """
+        Writes rows supplied as dicts keyed by field name.  Fields not in the record are written as empty values.
+
+        :param records: Iterable of dicts (or other mappings, e.g. the rows of a DataNodeTable).
+        :param extrasaction: What to do with a record which has keys that aren't columns of the file, as for
+                             csv.DictWriter: 'raise' (ValueError) or 'ignore'.
+        :return:
+        """
+        if extrasaction not in ('raise', 'ignore'):
+            raise ValueError(f"extrasaction ({extrasaction}) must be 'raise' or 'ignore'")
+
+        if extrasaction == 'raise':
+            records = map(self._check_record_keys, records)
+        field_names = self.field_names
+        self.write_rows(tuple(record.get(field_name) for field_name in field_names) for record in records)
+
+    def write_table(self, data_table: DataNodeTable):
+        """
+        Writes all the rows of a DataNodeTable.
+
+        :param data_table:
+        :return:
+        """
+        self.write_rows(data_table.iter_rows(), field_names=data_table.field_names)
+
+    def write(self, source):
+        """
+        Writes rows from a DataNodeTable, or an iterable of record dicts or of rows (in column order).
+
+        :param source:
+        :return:
+        """
+        if isinstance(source, DataNodeTable):
+            self.write_table(source)
+            return
+
+        iterator = iter(source)
+        first = next(iterator, _end_of_input)
+        if first is _end_of_input:
+            return
+        rows = _prepend(first, iterator)
+        if isinstance(first, Mapping):
+            self.write_records(rows)
+        else:
+            self.write_rows(rows)
+
+    def close(self):
+        if self._file is None:
+            return
+        try:
+            self._flush_batch()
+        finally:
+            self._file.close()
+            self._file = None
+            self.stats.end_time = time.perf_counter()
+
+    def _flush_batch(self):
+        if len(self._batch) > 0:
+            self._writer.writerows(self._batch)
+            self.stats.rows += len(self._batch)
+            self._batch.clear()
+
+    def _check_record_keys(self, record):
+        if not self._field_name_set.issuperset(record):
+            extra_keys = [field_name for field_name in record if field_name not in self._field_name_set]
+            raise ValueError(f"Record has fields which aren't columns of the CSV file: {extra_keys}")
+        return record
+
+    def _row_reorderer(self, field_names):
+        positions = {field_name: position for position, field_name in enumerate(field_names)}
+        getter = itemgetter(*(positions[field_name] for field_name in self.field_names))
+        if len(self.field_names) == 1:
+            return lambda row: (getter(row),)
+        return getter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _prepend(first, iterator):
+    yield first
+    yield from iterator
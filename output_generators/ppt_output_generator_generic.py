@@ -11,7 +11,8 @@ class PptOutputGeneratorGeneric:
         file format (or more likely both).
 
         :param driver_table: Table (typically from an outline data node) which represents the structure of the
-                             required slide deck
+                             required slide deck.  Either a list of record dicts or a DataNodeTable (whose rows
+                             can be used in the same way).
         :param output_path: Path of .pptx file to create.
         :param template_ppt: Template file to use.  Must conform to standard .pptx structure for slide types
                              and placeholders, or elements will be incorrectly placed.
@@ -0,0 +1,102 @@
+"""
+Tests that extraction doesn't change the outline or the specifier, so that many specifiers can be run concurrently
+in threads against one shared UnleashedOutline and give the same tables as extracting one at a time.
+"""
+import os
+import random
+import threading
+from unittest import TestCase
+
+import tests.test_utilities.test_config as tcfg
+from outline.outline import Outline
+from outlines_unleashed.data_node_extraction import extract_with_thread_pool
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_03x, test_data_node_specifier_05x, \
+    test_data_node_specifier_06x, test_data_node_specifier_07, test_data_node_specifier_freeform_notes
+
+specifier_structures = [
+    test_data_node_specifier_ppt_01,
+    test_data_node_specifier_03x,
+    test_data_node_specifier_05x,
+    test_data_node_specifier_06x,
+    test_data_node_specifier_07,
+    test_data_node_specifier_freeform_notes,
+]
+
+
+class TestConcurrentExtraction(TestCase):
+    def setUp(self) -> None:
+        self.unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(tcfg.input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml')))
+        self.data_nodes = [node for _, _, node in self.unleashed_outline.iter_data_nodes()]
+        self.specifiers = [DataNodeSpecifier(structure) for structure in specifier_structures]
+
+    def test_specifier_header_not_changed(self):
+        self.assertNotIn('tag_delimiters', test_data_node_specifier_ppt_01['header'])
+
+        specifier = self.specifiers[0]
+        specifier.extract_data_node_table(self.data_nodes[0])
+        self.assertNotIn('tag_delimiters', specifier.dns_structure['header'])
+        self.assertEqual([None, None], specifier.tag_delimiters['text_delimiters'])
+
+    def test_data_node_not_changed(self):
+        specifier = self.specifiers[1]  # Has tag delimiters in header.
+        data_node = self.data_nodes[0]
+        tag_regex = (data_node.tag_regex_text, data_node.tag_regex_note)
+
+        specifier.extract_data_node_table(data_node, override_data_node_tag_delim=True)
+        self.assertEqual(tag_regex, (data_node.tag_regex_text, data_node.tag_regex_note))
+
+    def test_thread_pool_stress(self):
+        jobs = [(data_node, specifier) for data_node in self.data_nodes for specifier in self.specifiers] * 10
+        random.Random(1).shuffle(jobs)
+
+        expected_tables = [specifier.extract_data_node_table(data_node) for data_node, specifier in jobs]
+        tables = extract_with_thread_pool(jobs, max_workers=8)
+
+        self.assertEqual(len(expected_tables), len(tables))
+        for expected_table, table in zip(expected_tables, tables):
+            self.assertEqual(expected_table.field_names, table.field_names)
+            self.assertEqual(list(expected_table.iter_rows()), list(table.iter_rows()))
+
+    def test_threads_with_delimiter_override(self):
+        """
+        Threads started together, each overriding the delimiters of the same shared data nodes with those of a
+        different specifier.
+        """
+        specifiers = [
+            specifier for specifier in self.specifiers if 'tag_delimiters' in specifier.dns_structure['header']
+        ]
+        expected = [
+            [specifier.extract_data_node_dispatch(data_node, override_data_node_tag_delim=True)
+             for data_node in self.data_nodes]
+            for specifier in specifiers
+        ]
+
+        thread_count = len(specifiers) * 3
+        barrier = threading.Barrier(thread_count)
+        results = [None] * thread_count
+        errors = []
+
+        def extract(thread_index):
+            try:
+                specifier = specifiers[thread_index % len(specifiers)]
+                barrier.wait()
+                results[thread_index] = [
+                    specifier.extract_data_node_dispatch(data_node, override_data_node_tag_delim=True)
+                    for _ in range(5) for data_node in self.data_nodes
+                ]
+            except Exception as err:  # Reported in the main thread.
+                errors.append(err)
+
+        threads = [threading.Thread(target=extract, args=(thread_index,)) for thread_index in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        for thread_index, result in enumerate(results):
+            self.assertEqual(expected[thread_index % len(specifiers)] * 5, result)
@@ -0,0 +1,61 @@
+"""
+Tests that extracting all the data nodes of an outline (in parallel or serially) gives the same tables as extracting
+each data node separately, keyed by data node name in document order.
+"""
+import os
+from unittest import TestCase
+from ddt import ddt, data
+
+import tests.test_utilities.test_config as tcfg
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+from outlines_unleashed.data_node_extraction import extract_data_node_tables
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_exceptions import DuplicateDataNodeName
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_freeform_notes
+
+expected_data_node_names = ['data_node_01', 'data_node_02', 'data_node_03', 'data_node_04', 'data_node_05']
+
+
+@ddt
+class TestExtractDataNodeTables(TestCase):
+    def setUp(self) -> None:
+        self.unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(tcfg.input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml')))
+
+        self.specifiers = {
+            data_node_name: DataNodeSpecifier(
+                test_data_node_specifier_ppt_01 if index % 2 == 0 else test_data_node_specifier_freeform_notes
+            )
+            for index, data_node_name in enumerate(expected_data_node_names)
+        }
+
+    @data(None, 1, 2)
+    def test_extract_data_node_tables(self, max_workers):
+        tables = self.unleashed_outline.extract_data_node_tables(self.specifiers, max_workers=max_workers)
+
+        self.assertEqual(expected_data_node_names, list(tables))
+        for data_node_name, _, data_node in self.unleashed_outline.iter_data_nodes():
+            self.assertEqual(self.specifiers[data_node_name].extract_data_node_dispatch(data_node),
+                             tables[data_node_name])
+
+    @data(1, 2)
+    def test_extract_flat_outline(self, max_workers):
+        flat_unleashed_outline = UnleashedOutline(FlatOutline.from_outline(self.unleashed_outline.outline))
+
+        self.assertEqual(self.unleashed_outline.extract_data_node_tables(self.specifiers, max_workers=1),
+                         flat_unleashed_outline.extract_data_node_tables(self.specifiers, max_workers=max_workers))
+
+    def test_data_nodes_without_specifier_skipped(self):
+        specifiers = {name: self.specifiers[name] for name in ('data_node_04', 'data_node_02')}
+        tables = self.unleashed_outline.extract_data_node_tables(specifiers, max_workers=2)
+
+        self.assertEqual(['data_node_02', 'data_node_04'], list(tables))
+
+    def test_duplicate_data_node_name(self):
+        data_nodes = [(name, node) for name, _, node in self.unleashed_outline.iter_data_nodes()]
+        data_nodes.append(data_nodes[0])
+
+        self.assertRaises(DuplicateDataNodeName, extract_data_node_tables, data_nodes, self.specifiers)
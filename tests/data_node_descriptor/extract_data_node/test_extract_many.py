@@ -0,0 +1,74 @@
+"""
+Tests that extracting with several specifiers in a single pass (extract_many) gives the same tables as extracting
+with each specifier separately.
+"""
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+import tests.test_utilities.test_config as tcfg
+from outline.outline import Outline
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.multi_specifier_extraction import extract_many
+from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_exceptions import InvalidDataNodeSpecifierVersion
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_03x, test_data_node_specifier_05x, \
+    test_data_node_specifier_06x, test_data_node_specifier_07, test_data_node_specifier_freeform_notes
+
+specifier_structures = (
+    test_data_node_specifier_ppt_01,
+    test_data_node_specifier_03x,
+    test_data_node_specifier_05x,
+    test_data_node_specifier_06x,
+    test_data_node_specifier_07,
+    test_data_node_specifier_freeform_notes,
+)
+
+
+class TestExtractMany(TestCase):
+    test_root = os.path.join(tcfg.input_files_root, 'data_node_descriptor')
+
+    def setUp(self) -> None:
+        self.unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(self.test_root, 'opml_data_extraction_test_02.opml')))
+        self.specifiers = [DataNodeSpecifier(structure) for structure in specifier_structures]
+
+    def test_extract_many_matches_separate_extraction(self):
+        # Include every node as the root of the data node, so that each specifier is tested against the node(s)
+        # it was written for.
+        for record in self.unleashed_outline.list_unleashed_nodes():
+            data_node = record.node()
+            tables = extract_many(data_node, self.specifiers)
+
+            self.assertEqual(len(self.specifiers), len(tables))
+            for specifier, table in zip(self.specifiers, tables):
+                self.assertEqual(specifier.extract_data_node_dispatch(data_node), table)
+
+    def test_extract_many_from_outline(self):
+        top_node = self.unleashed_outline.list_unleashed_nodes()[0].node()
+        tables = extract_many(self.unleashed_outline, self.specifiers)
+
+        for specifier, table in zip(self.specifiers, tables):
+            self.assertEqual(specifier.extract_data_node_dispatch(top_node), table)
+
+    def test_identical_criteria_evaluated_once(self):
+        data_node = self.unleashed_outline.list_unleashed_nodes()[1].node()
+        specifier = self.specifiers[0]
+
+        matches_criteria = NodeAncestryMatchingCriteria.matches_criteria
+        with patch.object(NodeAncestryMatchingCriteria, 'matches_criteria', autospec=True,
+                          side_effect=matches_criteria) as mock_matches_criteria:
+            extract_many(data_node, [specifier])
+            single_count = mock_matches_criteria.call_count
+
+            mock_matches_criteria.reset_mock()
+            extract_many(data_node, [specifier, DataNodeSpecifier(specifier_structures[0])])
+            self.assertEqual(single_count, mock_matches_criteria.call_count)
+
+    def test_extract_many_invalid_version(self):
+        specifier = DataNodeSpecifier({'header': {'descriptor_version_number': '9.9'}, 'descriptor': {}})
+
+        self.assertRaises(InvalidDataNodeSpecifierVersion, extract_many, self.unleashed_outline,
+                          [self.specifiers[0], specifier])
@@ -0,0 +1,114 @@
+"""
+Tests that DataNodeSpecifier.iter_records yields the same records as extract_data_node_dispatch, and yields each
+record as soon as it is complete rather than after the whole data node has been matched.  Also tests iter_rows and the
+assembly of rows from matches by the compiled plan.
+"""
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+import tests.test_utilities.test_config as tcfg
+from outline.outline import Outline
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_exceptions import InvalidDataNodeSpecifierVersion
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01
+
+
+class TestIterRecords(TestCase):
+    test_root = os.path.join(tcfg.input_files_root, 'data_node_descriptor')
+
+    def setUp(self) -> None:
+        unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(self.test_root, 'opml_data_extraction_test_02.opml')))
+
+        self.data_node = unleashed_outline.list_unleashed_nodes()[1].node()
+        self.data_node_specifier = DataNodeSpecifier(test_data_node_specifier_ppt_01)
+
+    def test_iter_records_matches_extract(self):
+        records = list(self.data_node_specifier.iter_records(self.data_node))
+
+        self.assertEqual(self.data_node_specifier.extract_data_node_dispatch(self.data_node), records)
+        self.assertEqual(21, len(records))
+
+        # Each record should be a separate object.
+        self.assertEqual(len(records), len(set(id(record) for record in records)))
+
+    def test_records_yielded_incrementally(self):
+        matches_consumed = []
+
+        def tracked_matches(data_node):
+            for match in DataNodeSpecifier.iter_matches(self.data_node_specifier, data_node):
+                matches_consumed.append(match)
+                yield match
+
+        total_matches = len(self.data_node_specifier.match_data_node(self.data_node))
+        with patch.object(self.data_node_specifier, 'iter_matches', side_effect=tracked_matches):
+            records = self.data_node_specifier.iter_records(self.data_node)
+            next(records)
+            self.assertLess(len(matches_consumed), total_matches)
+
+            list(records)
+            self.assertEqual(total_matches, len(matches_consumed))
+
+    def test_iter_records_invalid_version(self):
+        specifier = {'header': {'descriptor_version_number': '9.9'}, 'descriptor': {}}
+
+        self.assertRaises(InvalidDataNodeSpecifierVersion, DataNodeSpecifier(specifier).iter_records, self.data_node)
+
+    def test_iter_rows_matches_records(self):
+        matching_plan = self.data_node_specifier.compile()
+        rows = list(self.data_node_specifier.iter_rows(self.data_node))
+
+        for row in rows:
+            self.assertIsInstance(row, tuple)
+        self.assertEqual(
+            self.data_node_specifier.extract_field_names(primary_key_only=True) +
+            self.data_node_specifier.extract_field_names(primary_key_only=False),
+            list(matching_plan.record_field_names)
+        )
+        self.assertEqual(list(self.data_node_specifier.iter_records(self.data_node)),
+                         [matching_plan.row_as_dict(row) for row in rows])
+
+    def test_assemble_rows(self):
+        specifier = {
+            'header': {'descriptor_version_number': '0.1'},
+            'descriptor': {
+                'value': {
+                    'primary_key': 'no',
+                    'field_value_specifier': 'text_value',
+                    'default_value': '(no-value)',
+                    'ancestry_matching_criteria': [NodeAncestryMatchingCriteria()] * 3,
+                },
+                'section': {
+                    'primary_key': 'yes',
+                    'field_value_specifier': 'text_value',
+                    'ancestry_matching_criteria': [NodeAncestryMatchingCriteria()] * 2,
+                },
+                'item': {
+                    'primary_key': 'yes',
+                    'field_value_specifier': 'text_value',
+                    'default_value': '(no-item)',
+                    'ancestry_matching_criteria': [NodeAncestryMatchingCriteria()] * 3,
+                },
+            },
+        }
+        matching_plan = DataNodeSpecifier(specifier).compile()
+        matches = [
+            ('section', 'S1'), ('item', 'I1'), ('value', 'V1'), ('value', 'ignored'),
+            ('item', 'I2'),
+            ('section', 'S2'), ('value', 'V3'),
+            ('item', 'I4'),
+        ]
+
+        # A new section clears the item, so I4 completes the record started by S2.
+        expected_rows = [
+            ('S1', 'I1', 'V1'),
+            ('S1', 'I2', '(no-value)'),
+            ('S2', 'I4', 'V3'),
+        ]
+        self.assertEqual(('section', 'item', 'value'), matching_plan.record_field_names)
+        self.assertEqual(expected_rows, list(matching_plan.assemble_rows(matches)))
+        self.assertEqual([(None, '(no-item)', '(no-value)')], list(matching_plan.assemble_rows([])))
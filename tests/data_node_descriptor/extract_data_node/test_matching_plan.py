@@ -0,0 +1,130 @@
+"""
+Tests that matching nodes using the compiled plan from DataNodeSpecifier.compile() gives the same matches, in the same
+order, as testing each node against every field in the descriptor.
+"""
+import os
+from unittest import TestCase
+from unittest.mock import patch
+from ddt import ddt, data
+
+import tests.test_utilities.test_config as tcfg
+from outline.outline import Outline
+from outlines_unleashed.data_node_matching_plan import DataNodeMatchingPlan
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_03x, test_data_node_specifier_05x, \
+    test_data_node_specifier_06x, test_data_node_specifier_07, test_data_node_specifier_freeform_notes
+
+specifiers = (
+    test_data_node_specifier_ppt_01,
+    test_data_node_specifier_03x,
+    test_data_node_specifier_05x,
+    test_data_node_specifier_06x,
+    test_data_node_specifier_07,
+    test_data_node_specifier_freeform_notes,
+)
+
+
+@ddt
+class TestMatchingPlan(TestCase):
+    test_root = os.path.join(tcfg.input_files_root, 'data_node_descriptor')
+
+    def setUp(self) -> None:
+        self.unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(self.test_root, 'opml_data_extraction_test_02.opml')))
+
+    @data(*specifiers)
+    def test_plan_matches_descriptor(self, specifier):
+        data_node_specifier = DataNodeSpecifier(specifier)
+        matching_plan = data_node_specifier.compile()
+
+        # Treat every node of the outline as the root of a data node, so that each specifier is tested against the
+        # data node(s) it was written for as well as against nodes it shouldn't match.
+        match_count = 0
+        for root_record in self.unleashed_outline.list_unleashed_nodes():
+            override_node = data_node_specifier._override_tag_regex(root_record.node())
+            for record in override_node.iter_unleashed_nodes():
+                expected_matches = list(data_node_specifier.match_field_node(record))
+                plan_matches = list(matching_plan.match_field_node(record))
+                self.assertEqual(expected_matches, plan_matches)
+                match_count += len(plan_matches)
+
+        self.assertGreater(match_count, 0)
+
+    @data(*specifiers)
+    def test_fields_grouped_by_depth(self, specifier):
+        data_node_specifier = DataNodeSpecifier(specifier)
+        matching_plan = data_node_specifier.compile()
+        descriptor = specifier['descriptor']
+
+        plan_field_names = []
+        for depth in range(matching_plan.max_depth + 1):
+            for compiled_field in matching_plan.fields_for_depth(depth):
+                self.assertEqual(depth, len(descriptor[compiled_field.field_name]['ancestry_matching_criteria']) - 1)
+                plan_field_names.append(compiled_field.field_name)
+
+        self.assertCountEqual(list(descriptor), plan_field_names)
+        self.assertEqual((), matching_plan.fields_for_depth(matching_plan.max_depth + 1))
+
+    @data(*specifiers)
+    def test_subtree_matches_descriptor(self, specifier):
+        data_node_specifier = DataNodeSpecifier(specifier)
+        matching_plan = data_node_specifier.compile()
+
+        for root_record in self.unleashed_outline.list_unleashed_nodes():
+            override_node = data_node_specifier._override_tag_regex(root_record.node())
+
+            expected_matches = []
+            for record in override_node.iter_unleashed_nodes():
+                expected_matches.extend(data_node_specifier.match_field_node(record))
+
+            self.assertEqual(expected_matches, list(matching_plan.match_subtree(override_node)))
+
+    def test_subtree_pruned(self):
+        """
+        Only the branch under the first child of the data node can match, and nothing below depth 2, so only the
+        data node itself and its first child should have their children visited.
+        """
+        specifier = {
+            'header': {'descriptor_version_number': '0.1'},
+            'descriptor': {
+                'field': {
+                    'primary_key': 'yes',
+                    'field_value_specifier': 'text_value',
+                    'ancestry_matching_criteria': [
+                        NodeAncestryMatchingCriteria(),
+                        NodeAncestryMatchingCriteria(child_number=1),
+                        NodeAncestryMatchingCriteria(),
+                    ],
+                },
+            },
+        }
+        data_node = self.unleashed_outline.list_unleashed_nodes()[1].node()
+        matching_plan = DataNodeSpecifier(specifier).compile()
+
+        iter_children = UnleashedOutlineNode.iter_children
+        with patch.object(UnleashedOutlineNode, 'iter_children', autospec=True,
+                          side_effect=iter_children) as mock_iter_children:
+            matches = list(matching_plan.match_subtree(data_node))
+
+        self.assertEqual(len(data_node.outline_node[0]), len(matches))
+        self.assertEqual(2, mock_iter_children.call_count)
+
+    def test_plan_built_once(self):
+        data_node_specifier = DataNodeSpecifier(test_data_node_specifier_ppt_01)
+        data_node = self.unleashed_outline.list_unleashed_nodes()[1].node()
+
+        with patch.object(DataNodeMatchingPlan, 'from_descriptor',
+                          wraps=DataNodeMatchingPlan.from_descriptor) as from_descriptor:
+            matching_plan = data_node_specifier.compile()
+            data_node_specifier.extract_data_node_table(data_node)
+            data_node_specifier.extract_data_node_dispatch(data_node)
+
+            self.assertIs(matching_plan, data_node_specifier.compile())
+            self.assertEqual(1, from_descriptor.call_count)
+
+            self.assertIsNot(matching_plan, data_node_specifier.compile(rebuild=True))
+            self.assertEqual(2, from_descriptor.call_count)
@@ -0,0 +1,59 @@
+"""
+Tests that extracting a data node with its first level sub-trees split between worker processes gives exactly the
+same table as extracting it in one go.
+"""
+import os
+from unittest import TestCase
+from ddt import ddt, data, unpack
+
+import tests.test_utilities.test_config as tcfg
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+from outlines_unleashed.data_node_extraction import extract_partitioned_data_node_table
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_freeform_notes
+
+
+@ddt
+class TestPartitionedExtraction(TestCase):
+    def setUp(self) -> None:
+        unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(tcfg.input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml')))
+        self.data_nodes = [node for _, _, node in unleashed_outline.iter_data_nodes()]
+
+    @data(
+        (test_data_node_specifier_ppt_01, 2, 1),
+        (test_data_node_specifier_ppt_01, 2, 4),
+        (test_data_node_specifier_ppt_01, 3, 2),
+        (test_data_node_specifier_freeform_notes, 2, 4),
+    )
+    @unpack
+    def test_partitioned_extraction(self, specifier_structure, max_workers, partitions_per_worker):
+        specifier = DataNodeSpecifier(specifier_structure)
+
+        for data_node in self.data_nodes:
+            with self.subTest(data_node=data_node.text):
+                expected_table = specifier.extract_data_node_table(data_node)
+                table = extract_partitioned_data_node_table(specifier, data_node, max_workers=max_workers,
+                                                            partitions_per_worker=partitions_per_worker)
+
+                self.assertEqual(expected_table.field_names, table.field_names)
+                self.assertEqual(list(expected_table.iter_rows()), list(table.iter_rows()))
+
+    def test_flat_outline(self):
+        unleashed_outline = UnleashedOutline(FlatOutline.from_outline(Outline.from_opml(
+            os.path.join(tcfg.input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml'))))
+        specifier = DataNodeSpecifier(test_data_node_specifier_ppt_01)
+
+        for (_, _, flat_data_node), data_node in zip(unleashed_outline.iter_data_nodes(), self.data_nodes):
+            self.assertEqual(specifier.extract_data_node_table(data_node),
+                             extract_partitioned_data_node_table(specifier, flat_data_node, max_workers=2))
+
+    def test_serial_fallback(self):
+        specifier = DataNodeSpecifier(test_data_node_specifier_ppt_01)
+
+        for data_node in self.data_nodes:
+            self.assertEqual(specifier.extract_data_node_table(data_node),
+                             specifier.extract_partitioned_data_node_table(data_node, max_workers=1))
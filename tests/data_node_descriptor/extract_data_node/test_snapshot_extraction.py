@@ -0,0 +1,153 @@
+"""
+Tests that extracting the data nodes of an outline from a FlatOutline snapshot gives the same tables as extracting
+them from the Outline.
+"""
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+from xml.etree import ElementTree
+from ddt import ddt, data
+
+import tests.test_utilities.test_config as tcfg
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+import outlines_unleashed.data_node_extraction as data_node_extraction
+from outlines_unleashed.data_node_extraction import extract_snapshot_data_node_tables
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_freeform_notes
+
+data_node_names = ['data_node_01', 'data_node_02', 'data_node_03', 'data_node_04', 'data_node_05']
+
+
+@ddt
+class TestSnapshotExtraction(TestCase):
+    def setUp(self) -> None:
+        outline = Outline.from_opml(
+            os.path.join(tcfg.input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml'))
+        self.unleashed_outline = UnleashedOutline(outline)
+
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+        self.flat_outline = FlatOutline.from_outline(outline)
+        self.snapshot_path = os.path.join(temporary_directory.name, 'outline.snapshot')
+        self.flat_outline.write_snapshot(self.snapshot_path)
+
+        open_snapshots = patch.object(data_node_extraction, '_open_snapshots', OrderedDict())
+        open_snapshots.start()
+        self.addCleanup(open_snapshots.stop)
+
+        self.specifiers = {
+            data_node_name: DataNodeSpecifier(
+                test_data_node_specifier_ppt_01 if index % 2 == 0 else test_data_node_specifier_freeform_notes
+            )
+            for index, data_node_name in enumerate(data_node_names)
+        }
+
+    @data(1, 2)
+    def test_snapshot_extraction(self, max_workers):
+        expected_tables = self.unleashed_outline.extract_data_node_tables(self.specifiers, max_workers=1)
+        tables = extract_snapshot_data_node_tables(self.snapshot_path, self.specifiers, max_workers=max_workers)
+
+        self.assertEqual(list(expected_tables), list(tables))
+        for data_node_name in expected_tables:
+            self.assertEqual(list(expected_tables[data_node_name].iter_rows()),
+                             list(tables[data_node_name].iter_rows()))
+
+    def open_snapshot(self, snapshot_path):
+        """
+        Opens a snapshot through the cache, without keeping it in use.
+        """
+        with data_node_extraction._open_snapshot(snapshot_path) as flat_outline:
+            return flat_outline
+
+    def write_snapshots(self, count):
+        snapshot_paths = []
+        for number in range(count):
+            snapshot_path = os.path.join(self.directory, f'outline_{number}.snapshot')
+            self.flat_outline.write_snapshot(snapshot_path)
+            snapshot_paths.append(snapshot_path)
+        return snapshot_paths
+
+    def test_parent_snapshot_closed(self):
+        """
+        The snapshot mapped by the calling process is closed once the extraction has finished, and isn't kept in the
+        cache.
+        """
+        opened = []
+        from_snapshot = FlatOutline.from_snapshot
+
+        def record_from_snapshot(path):
+            opened.append(from_snapshot(path))
+            return opened[-1]
+
+        with patch.object(FlatOutline, 'from_snapshot', side_effect=record_from_snapshot):
+            extract_snapshot_data_node_tables(self.snapshot_path, self.specifiers, max_workers=1)
+
+        self.assertEqual(1, len(opened))
+        self.assertIsNone(opened[0].snapshot_buffer)
+        self.assertEqual(0, len(data_node_extraction._open_snapshots))
+
+    def test_open_snapshots_bounded(self):
+        snapshot_paths = self.write_snapshots(data_node_extraction.open_snapshot_cache_size + 2)
+
+        snapshots = [self.open_snapshot(snapshot_path) for snapshot_path in snapshot_paths]
+
+        self.assertEqual(data_node_extraction.open_snapshot_cache_size, len(data_node_extraction._open_snapshots))
+        self.assertIsNone(snapshots[0].snapshot_buffer)
+        self.assertIsNone(snapshots[1].snapshot_buffer)
+        self.assertIsNotNone(snapshots[-1].snapshot_buffer)
+
+    def test_recently_used_snapshot_kept(self):
+        first_snapshot = self.open_snapshot(self.snapshot_path)
+        for snapshot_path in self.write_snapshots(data_node_extraction.open_snapshot_cache_size):
+            self.assertIs(first_snapshot, self.open_snapshot(self.snapshot_path))
+            self.open_snapshot(snapshot_path)
+
+        self.assertIsNotNone(first_snapshot.snapshot_buffer)
+
+    def test_replaced_snapshot_reopened(self):
+        snapshot = self.open_snapshot(self.snapshot_path)
+        self.assertIs(snapshot, self.open_snapshot(self.snapshot_path))
+
+        new_outline = Outline.from_scratch([ElementTree.Element('outline', {'text': 'New'})])
+        FlatOutline.from_outline(new_outline).write_snapshot(self.snapshot_path)
+        new_snapshot = self.open_snapshot(self.snapshot_path)
+
+        self.assertEqual(2, len(new_snapshot))
+        self.assertIsNone(snapshot.snapshot_buffer)
+        self.assertEqual(1, len(data_node_extraction._open_snapshots))
+
+    def test_snapshot_in_use_not_closed(self):
+        with data_node_extraction._open_snapshot(self.snapshot_path) as snapshot:
+            for snapshot_path in self.write_snapshots(data_node_extraction.open_snapshot_cache_size):
+                self.open_snapshot(snapshot_path)
+
+            self.assertNotIn(snapshot, [open_snapshot.flat_outline
+                                        for open_snapshot in data_node_extraction._open_snapshots.values()])
+            self.assertEqual(list(self.flat_outline.text), list(snapshot.text))
+
+        self.assertIsNone(snapshot.snapshot_buffer)
+
+    def test_snapshots_shared_between_threads(self):
+        snapshot_paths = self.write_snapshots(3)
+        specifier = self.specifiers['data_node_01']
+        data_node_index = next(index for index in range(len(self.flat_outline))
+                               if 'data_node_01' in self.flat_outline.note[index])
+        expected_rows = list(data_node_extraction._extract_flat_outline_data_node(
+            self.flat_outline, data_node_index, None, None, specifier).iter_rows())
+
+        def extract(snapshot_path):
+            return list(data_node_extraction._extract_snapshot_data_node(
+                snapshot_path, data_node_index, None, None, specifier).iter_rows())
+
+        with patch.object(data_node_extraction, 'open_snapshot_cache_size', 1):
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = list(executor.map(extract, snapshot_paths * 10))
+
+        self.assertEqual([expected_rows] * len(results), results)
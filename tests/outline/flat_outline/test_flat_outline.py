@@ -0,0 +1,92 @@
+import os
+from unittest import TestCase
+from ddt import ddt, data
+
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+from tests.test_utilities.test_config import input_files_root
+
+input_file = os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml')
+
+
+@ddt
+class TestFlatOutline(TestCase):
+    def setUp(self) -> None:
+        self.outline = Outline.from_opml(input_file)
+        self.flat_outline = FlatOutline.from_outline(self.outline)
+
+    def test_total_sub_nodes(self):
+        self.assertEqual(self.outline.total_sub_nodes(), self.flat_outline.total_sub_nodes())
+        self.assertEqual(self.outline.total_sub_nodes(), len(self.flat_outline))
+
+    def test_iter_nodes(self):
+        expected_records = self.outline.list_nodes()
+        flat_records = self.flat_outline.list_nodes()
+
+        self.assertEqual(len(expected_records), len(flat_records))
+        for expected, flat in zip(expected_records, flat_records):
+            self.assertEqual(expected.depth, flat.depth)
+            self.assertEqual(expected.child_ancestry(), flat.child_ancestry())
+            self.assertEqual(expected.node().text, flat.node().text)
+            self.assertEqual(expected.node().note, flat.node().note)
+            self.assertEqual(expected.node().total_sub_nodes(), flat.node().total_sub_nodes())
+            self.assertEqual(len(expected.node()), len(flat.node()))
+
+    @data(0, 1, 17, 23, 44, 47)
+    def test_get_node(self, node_number):
+        expected = self.outline.get_node(node_number)
+        flat = self.flat_outline.get_node(node_number)
+
+        self.assertEqual(expected.depth, flat.depth)
+        self.assertEqual(expected.child_ancestry(), flat.child_ancestry())
+        self.assertEqual(expected.node().text, flat.node().text)
+        self.assertEqual(expected.node().note, flat.node().note)
+
+    def test_get_node_out_of_range(self):
+        self.assertIsNone(self.flat_outline.get_node(len(self.flat_outline)))
+
+    def test_get_node_within_sub_tree(self):
+        sub_tree_root = self.flat_outline.get_node(17).node()
+        expected = self.outline.get_node(17).node().get_node(3)
+        flat = sub_tree_root.get_node(3)
+
+        self.assertEqual(expected.child_ancestry(), flat.child_ancestry())
+        self.assertEqual(expected.node().text, flat.node().text)
+
+    def test_children(self):
+        expected_children = [child.text for child in self.outline.top_outline_node]
+        flat_children = [child.text for child in self.flat_outline.top_outline_node]
+
+        self.assertEqual(expected_children, flat_children)
+        self.assertEqual(expected_children[-1], self.flat_outline.top_outline_node[-1].text)
+
+    def test_to_outline(self):
+        round_trip_outline = self.flat_outline.to_outline()
+
+        expected_records = self.outline.list_nodes()
+        round_trip_records = round_trip_outline.list_nodes()
+
+        self.assertEqual(len(expected_records), len(round_trip_records))
+        for expected, round_trip in zip(expected_records, round_trip_records):
+            self.assertEqual(expected.child_ancestry(), round_trip.child_ancestry())
+            self.assertEqual(expected.node().text, round_trip.node().text)
+            self.assertEqual(expected.node().note, round_trip.node().note)
+
+        self.assertEqual(self.outline.title, round_trip_outline.title)
+        self.assertEqual(self.outline.expansionState, round_trip_outline.expansionState)
+        self.assertEqual(self.outline.windowTop, round_trip_outline.windowTop)
+
+    @data(0, 1, 17, 23)
+    def test_subtree(self, node_number):
+        flat_node = self.flat_outline.get_node(node_number).node()
+        sub_tree = self.flat_outline.subtree(flat_node.index)
+
+        expected_records = flat_node.list_nodes()
+        sub_tree_records = sub_tree.list_nodes()
+        self.assertEqual(flat_node.total_sub_nodes(), len(sub_tree))
+        self.assertEqual(len(expected_records), len(sub_tree_records))
+        for expected, sub_tree_record in zip(expected_records, sub_tree_records):
+            self.assertEqual(expected.depth, sub_tree_record.depth)
+            self.assertEqual(expected.child_ancestry(), sub_tree_record.child_ancestry())
+            self.assertEqual(expected.node().text, sub_tree_record.node().text)
+            self.assertEqual(expected.node().note, sub_tree_record.node().note)
@@ -0,0 +1,131 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from xml.etree import ElementTree
+
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+from outlines_unleashed.tag_field_descriptor import add_tag_parse_cache, TagFieldDescriptor
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+from tests.test_utilities.test_config import input_files_root
+
+input_file = os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml')
+
+
+class TestFlatOutlineSnapshot(TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.snapshot_path = os.path.join(temporary_directory.name, 'outline.snapshot')
+
+        self.flat_outline = FlatOutline.from_outline(Outline.from_opml(input_file))
+
+    def test_snapshot_matches_flat_outline(self):
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+
+        self.assertEqual(len(self.flat_outline), len(snapshot))
+        self.assertEqual(self.flat_outline.version, snapshot.version)
+        self.assertEqual(self.flat_outline.title, snapshot.title)
+        self.assertEqual(self.flat_outline.dateModified, snapshot.dateModified)
+        for array_name in ('parent', 'depth', 'child_number', 'subtree_size', 'text', 'note'):
+            self.assertEqual(list(getattr(self.flat_outline, array_name)), list(getattr(snapshot, array_name)))
+
+        expected_records = self.flat_outline.list_nodes()
+        records = snapshot.list_nodes()
+        self.assertEqual(len(expected_records), len(records))
+        for expected, record in zip(expected_records, records):
+            self.assertEqual(expected.child_ancestry(), record.child_ancestry())
+            self.assertEqual(expected.node().text, record.node().text)
+            self.assertEqual(len(expected.node()), len(record.node()))
+
+    def test_big_endian_host(self):
+        """
+        On a big-endian host the integers are byte-swapped when written and read, so a round trip gives the same
+        values (and the swapped file holds different bytes).
+        """
+        little_endian_path = self.snapshot_path + '.little'
+        self.flat_outline.write_snapshot(little_endian_path)
+        with patch('outline.flat_outline_snapshot._byteswap_needed', True):
+            self.flat_outline.write_snapshot(self.snapshot_path)
+            snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+
+            for array_name in ('parent', 'depth', 'child_number', 'subtree_size', 'text', 'note'):
+                self.assertEqual(list(getattr(self.flat_outline, array_name)), list(getattr(snapshot, array_name)))
+
+        with open(little_endian_path, 'rb') as little_endian_file, open(self.snapshot_path, 'rb') as swapped_file:
+            self.assertNotEqual(little_endian_file.read(), swapped_file.read())
+
+    def test_interrupted_write(self):
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        with open(self.snapshot_path, 'rb') as snapshot_file:
+            original_content = snapshot_file.read()
+
+        with patch('outline.flat_outline_snapshot._pad', side_effect=OSError('disk full')):
+            self.assertRaises(OSError, self.flat_outline.write_snapshot, self.snapshot_path)
+
+        with open(self.snapshot_path, 'rb') as snapshot_file:
+            self.assertEqual(original_content, snapshot_file.read())
+        self.assertEqual([os.path.basename(self.snapshot_path)], os.listdir(os.path.dirname(self.snapshot_path)))
+
+    def test_replaced_while_mapped(self):
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+
+        new_outline = Outline.from_scratch([ElementTree.Element('outline', {'text': 'New'})])
+        FlatOutline.from_outline(new_outline).write_snapshot(self.snapshot_path)
+
+        self.assertEqual(list(self.flat_outline.text), list(snapshot.text))
+        self.assertEqual(2, len(FlatOutline.from_snapshot(self.snapshot_path)))
+
+    def test_close(self):
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+        mapped_file = snapshot.snapshot_buffer
+        self.assertEqual(self.flat_outline.text[3], snapshot.text[3])
+
+        snapshot.close()
+
+        self.assertTrue(mapped_file.closed)
+        self.assertIsNone(snapshot.snapshot_buffer)
+        self.assertRaises(ValueError, lambda: snapshot.parent[0])
+        snapshot.close()
+
+    def test_close_with_raw_string_held(self):
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+        raw_text = snapshot.text.raw(3)
+
+        snapshot.close()
+
+        self.assertEqual(self.flat_outline.text[3], str(raw_text, 'utf-8'))
+
+    def test_arrays_read_in_place(self):
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+
+        self.assertIsInstance(snapshot.parent, memoryview)
+        self.assertIsInstance(snapshot.text.raw(3), memoryview)
+        self.assertEqual(self.flat_outline.text[3], str(snapshot.text.raw(3), 'utf-8'))
+
+    def test_tag_parse_cache(self):
+        delimiters = ('[', ']')
+        add_tag_parse_cache(self.flat_outline, 'text', delimiters)
+        self.flat_outline.write_snapshot(self.snapshot_path)
+        snapshot = FlatOutline.from_snapshot(self.snapshot_path)
+
+        expected = [
+            (node.text, node.text_tag) for node in
+            (UnleashedOutlineNode(self.flat_outline.node(index), tag_regex_text=delimiters)
+             for index in range(len(self.flat_outline)))
+        ]
+        with patch.object(TagFieldDescriptor, 'parse_tag') as parse_tag:
+            parsed = [
+                (node.text, node.text_tag) for node in
+                (UnleashedOutlineNode.for_outline_node(snapshot.node(index), tag_regex_text=list(delimiters))
+                 for index in range(len(snapshot)))
+            ]
+
+        parse_tag.assert_not_called()
+        self.assertEqual(expected, parsed)
@@ -1,3 +1,4 @@
+import copy
 import os
 from unittest import TestCase
 import tests.test_utilities.test_config as tcfg
@@ -31,3 +32,31 @@ class TestNodeAncestryRecord(TestCase):
         )
 
         self.assertEqual(expected_ancestry, node_list[4])
+
+    def test_child_records_share_parent(self):
+        node_list = list(self.outline.iter_nodes())
+        parent_record = node_list[3]
+        child_records = [record for record in node_list if record.depth == parent_record.depth + 1 and
+                         record.child_ancestry()[:-1] == parent_record.child_ancestry()]
+
+        self.assertTrue(len(child_records) > 0)
+        for child_record in child_records:
+            self.assertIs(parent_record, child_record.parent_record)
+
+    def test_append_does_not_affect_copy(self):
+        record = list(self.outline.iter_nodes())[2]
+        copied_record = copy.copy(record)
+        record.append_node_to_ancestry(NodeAncestryItem(1, record.node()))
+
+        self.assertEqual(copied_record.depth + 1, record.depth)
+        self.assertEqual(copied_record.child_ancestry() + (1,), record.child_ancestry())
+        self.assertEqual([item.child_number for item in copied_record], [item.child_number for item in record][:-1])
+
+    def test_indexing(self):
+        record = list(self.outline.iter_nodes())[4]
+        items = list(record)
+
+        self.assertEqual(len(items), len(record))
+        for index in range(-len(record), len(record)):
+            self.assertIs(items[index], record[index])
+        self.assertRaises(IndexError, lambda: record[len(record)])
@@ -0,0 +1,61 @@
+"""
+Tests that streaming through an OPML file with Outline.iter_opml gives the same sequence of nodes as reading the whole
+file and then iterating through it with iter_nodes.
+"""
+import os
+from functools import partial
+from unittest import TestCase
+from ddt import ddt, data, unpack
+
+from outline.opml_exceptions import InvalidOpmlVersion, MissingOpmlAttribute, MalformedOutline, InvalidOpmlAttribute
+from outline.outline import Outline
+from tests.test_utilities.test_config import input_files_root
+
+valid_files = (
+    os.path.join(input_files_root, 'outline', 'outline', 'outline-test-valid-01.opml'),
+    os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml'),
+    os.path.join(input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_02.opml'),
+)
+
+folder_from_resources_root = os.path.join(input_files_root, 'outline', 'outline')
+
+invalid_files = (
+    ('opml-test-invalid-outline-01.opml', InvalidOpmlVersion),
+    ('opml-test-invalid-outline-02.opml', MissingOpmlAttribute),
+    ('opml-test-invalid-outline-04.opml', MalformedOutline),
+    ('opml-test-invalid-outline-05.opml', MalformedOutline),
+    ('opml-test-invalid-outline-06.opml', MissingOpmlAttribute),
+    ('opml-test-invalid-outline-07.opml', InvalidOpmlAttribute),
+)
+
+
+@ddt
+class TestIterOpml(TestCase):
+    @data(*valid_files)
+    def test_iter_opml_matches_iter_nodes(self, file):
+        expected_records = Outline.from_opml(file).list_nodes()
+        streamed_records = list(Outline.iter_opml(file))
+
+        self.assertEqual(len(expected_records), len(streamed_records))
+        for expected, streamed in zip(expected_records, streamed_records):
+            self.assertEqual(expected.depth, streamed.depth)
+            self.assertEqual(expected.child_ancestry(), streamed.child_ancestry())
+            self.assertEqual(expected.node().text, streamed.node().text)
+            self.assertEqual(expected.node().note, streamed.node().note)
+
+    @unpack
+    @data(*invalid_files)
+    def test_iter_opml_invalid(self, file_name, exception):
+        file = os.path.join(folder_from_resources_root, file_name)
+        self.assertRaises(exception, partial(list, Outline.iter_opml(file, full_validate=True)))
+
+    def test_iter_opml_detaches_finished_nodes(self):
+        """
+        Once the stream has moved past a node, the node should no longer hold any children.
+        """
+        previous_records = []
+        for record in Outline.iter_opml(valid_files[0]):
+            previous_records.append(record)
+
+        for record in previous_records[1:]:
+            self.assertEqual(0, len(record.node()))
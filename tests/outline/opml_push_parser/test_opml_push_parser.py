@@ -0,0 +1,189 @@
+"""
+Tests that feeding an OPML document to OpmlPushParser a piece at a time (directly or from an asyncio.StreamReader)
+gives the same top level sub-trees as reading the whole file with Outline.from_opml, and that data nodes extracted
+from the pushed sub-trees match those extracted from the whole outline.
+"""
+import asyncio
+import os
+from unittest import TestCase
+from ddt import ddt, data, unpack
+
+from outline.opml_exceptions import InvalidOpmlVersion, MissingOpmlAttribute, MalformedOutline, InvalidOpmlAttribute
+from outline.opml_push_parser import OpmlPushParser, aiter_opml_subtrees
+from outline.outline import Outline
+from outlines_unleashed.data_node_push_extraction import DataNodePushExtractor, aiter_data_node_tables
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_exceptions import DuplicateDataNodeName
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01, test_data_node_specifier_freeform_notes
+from tests.test_utilities.test_config import input_files_root
+
+valid_files = (
+    os.path.join(input_files_root, 'outline', 'outline', 'outline-test-valid-01.opml'),
+    os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml'),
+    os.path.join(input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_02.opml'),
+)
+
+data_node_file = os.path.join(input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml')
+
+folder_from_resources_root = os.path.join(input_files_root, 'outline', 'outline')
+
+invalid_files = (
+    ('opml-test-invalid-outline-01.opml', InvalidOpmlVersion),
+    ('opml-test-invalid-outline-02.opml', MissingOpmlAttribute),
+    ('opml-test-invalid-outline-04.opml', MalformedOutline),
+    ('opml-test-invalid-outline-05.opml', MalformedOutline),
+    ('opml-test-invalid-outline-06.opml', MissingOpmlAttribute),
+    ('opml-test-invalid-outline-07.opml', InvalidOpmlAttribute),
+)
+
+
+def read_bytes(file):
+    with open(file, 'rb') as opml_file:
+        return opml_file.read()
+
+
+def chunks(content, chunk_size):
+    return [content[start:start + chunk_size] for start in range(0, len(content), chunk_size)]
+
+
+def node_summary(outline_node):
+    return [
+        (record.child_ancestry(), record.node().text, record.node().note) for record in outline_node.iter_nodes()
+    ]
+
+
+def push_all(push_parser, content, chunk_size):
+    results = []
+    for chunk in chunks(content, chunk_size):
+        results.extend(push_parser.feed(chunk))
+    results.extend(push_parser.close())
+    return results
+
+
+def stream_reader_for(content, chunk_size):
+    """
+    Creates a StreamReader (which must be done inside a running event loop) holding the supplied content.
+    """
+    stream_reader = asyncio.StreamReader()
+    for chunk in chunks(content, chunk_size):
+        stream_reader.feed_data(chunk)
+    stream_reader.feed_eof()
+    return stream_reader
+
+
+def data_node_specifiers():
+    data_node_names = ['data_node_01', 'data_node_02', 'data_node_03', 'data_node_04', 'data_node_05']
+    return {
+        data_node_name: DataNodeSpecifier(
+            test_data_node_specifier_ppt_01 if index % 2 == 0 else test_data_node_specifier_freeform_notes
+        )
+        for index, data_node_name in enumerate(data_node_names)
+    }
+
+
+@ddt
+class TestOpmlPushParser(TestCase):
+    @data(*[(file, chunk_size) for file in valid_files for chunk_size in (1, 7, 1024 * 1024)])
+    @unpack
+    def test_subtrees_match_outline(self, file, chunk_size):
+        outline = Outline.from_opml(file)
+        push_parser = OpmlPushParser()
+        subtrees = push_all(push_parser, read_bytes(file), chunk_size)
+
+        self.assertEqual(list(range(1, len(outline.top_outline_node) + 1)),
+                         [child_number for child_number, _ in subtrees])
+        for (_, pushed_node), top_level_node in zip(subtrees, outline.top_outline_node):
+            self.assertEqual(node_summary(top_level_node), node_summary(pushed_node))
+
+        self.assertEqual(outline.version, push_parser.version)
+        for field_name, value in push_parser.head_fields.items():
+            self.assertEqual(getattr(outline, field_name), value)
+
+    def test_subtrees_emitted_as_completed(self):
+        """
+        Each top level sub-tree should be returned by the feed which completes it, not held back until close.
+        """
+        content = read_bytes(valid_files[1])
+        push_parser = OpmlPushParser()
+
+        emitted_at = []
+        for chunk_number, chunk in enumerate(chunks(content, 16)):
+            emitted_at.extend(chunk_number for _ in push_parser.feed(chunk))
+        self.assertEqual([], push_parser.close())
+
+        top_level_count = len(Outline.from_opml(valid_files[1]).top_outline_node)
+        self.assertEqual(top_level_count, len(emitted_at))
+        self.assertEqual(sorted(set(emitted_at)), emitted_at)
+
+    def test_subtrees_detached(self):
+        content = read_bytes(valid_files[1])
+        push_parser = OpmlPushParser()
+        push_all(push_parser, content, 64)
+
+        self.assertEqual(0, len(push_parser._body))
+
+    @unpack
+    @data(*invalid_files)
+    def test_invalid(self, file_name, exception):
+        content = read_bytes(os.path.join(folder_from_resources_root, file_name))
+        self.assertRaises(exception, push_all, OpmlPushParser(full_validate=True), content, 50)
+
+    def test_incomplete_document(self):
+        content = read_bytes(valid_files[0])
+        push_parser = OpmlPushParser()
+        push_parser.feed(content[:len(content) // 2])
+
+        self.assertRaises(Exception, push_parser.close)
+
+    @data(1, 100, 1024 * 1024)
+    def test_asyncio_stream_reader(self, read_size):
+        file = valid_files[2]
+        content = read_bytes(file)
+
+        async def read_subtrees():
+            stream_reader = stream_reader_for(content, 100)
+            return [subtree async for subtree in aiter_opml_subtrees(stream_reader, read_size=read_size)]
+
+        subtrees = asyncio.run(read_subtrees())
+        outline = Outline.from_opml(file)
+        self.assertEqual(len(outline.top_outline_node), len(subtrees))
+        for (_, pushed_node), top_level_node in zip(subtrees, outline.top_outline_node):
+            self.assertEqual(node_summary(top_level_node), node_summary(pushed_node))
+
+
+@ddt
+class TestDataNodePushExtractor(TestCase):
+    def setUp(self) -> None:
+        self.content = read_bytes(data_node_file)
+        self.specifiers = data_node_specifiers()
+        self.expected_tables = UnleashedOutline(Outline.from_opml(data_node_file)).extract_data_node_tables(
+            self.specifiers, max_workers=1)
+
+    @data(1, 64, 1024 * 1024)
+    def test_tables_match_outline(self, chunk_size):
+        tables = push_all(DataNodePushExtractor(self.specifiers), self.content, chunk_size)
+
+        self.assertEqual(list(self.expected_tables.items()), tables)
+
+    def test_data_nodes_without_specifier_skipped(self):
+        specifiers = {name: self.specifiers[name] for name in ('data_node_04', 'data_node_02')}
+        tables = push_all(DataNodePushExtractor(specifiers), self.content, 64)
+
+        self.assertEqual(['data_node_02', 'data_node_04'], [name for name, _ in tables])
+
+    def test_duplicate_data_node_name(self):
+        extractor = DataNodePushExtractor(self.specifiers)
+        push_all(extractor, self.content, 1024 * 1024)
+
+        # Feeding the same data nodes to the extractor again repeats their names.
+        extractor.opml_parser = OpmlPushParser()
+        self.assertRaises(DuplicateDataNodeName, push_all, extractor, self.content, 1024 * 1024)
+
+    def test_asyncio_stream_reader(self):
+        async def read_tables():
+            stream_reader = stream_reader_for(self.content, 100)
+            return [table async for table in aiter_data_node_tables(stream_reader, self.specifiers, read_size=50)]
+
+        self.assertEqual(list(self.expected_tables.items()), asyncio.run(read_tables()))
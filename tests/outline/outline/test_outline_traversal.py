@@ -0,0 +1,89 @@
+import os
+from unittest import TestCase
+from xml.etree import ElementTree
+from ddt import ddt, data
+
+from outline.outline import Outline
+from outline.outline_traversal import iter_outline_nodes, PREORDER, POSTORDER, BREADTH_FIRST
+from tests.test_utilities.test_config import input_files_root
+
+input_file = os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml')
+
+
+def recursive_child_ancestries(outline_node, child_ancestry=()):
+    """
+    Reference implementation of a depth first traversal, to check order against.
+    """
+    yield child_ancestry
+    for child_number, child in enumerate(outline_node, 1):
+        yield from recursive_child_ancestries(child, child_ancestry + (child_number,))
+
+
+@ddt
+class TestOutlineTraversal(TestCase):
+    def setUp(self) -> None:
+        self.outline = Outline.from_opml(input_file)
+        self.top_node = self.outline.top_outline_node
+
+    def test_preorder_matches_document_order(self):
+        expected = list(recursive_child_ancestries(self.top_node))
+        actual = [record.child_ancestry() for record in iter_outline_nodes(self.top_node, order=PREORDER)]
+
+        self.assertEqual(expected, actual)
+        self.assertEqual(expected, [record.child_ancestry() for record in self.outline.iter_nodes()])
+
+    def test_postorder(self):
+        records = list(iter_outline_nodes(self.top_node, order=POSTORDER))
+        child_ancestries = [record.child_ancestry() for record in records]
+
+        self.assertEqual(sorted(child_ancestries), sorted(recursive_child_ancestries(self.top_node)))
+        self.assertEqual((), child_ancestries[-1])
+        for position, child_ancestry in enumerate(child_ancestries):
+            # No descendant of a node should appear after it.
+            for later in child_ancestries[position + 1:]:
+                self.assertFalse(later[:len(child_ancestry)] == child_ancestry and len(later) > len(child_ancestry))
+
+    def test_breadth_first(self):
+        records = list(iter_outline_nodes(self.top_node, order=BREADTH_FIRST))
+        depths = [record.depth for record in records]
+
+        self.assertEqual(sorted(depths), depths)
+        self.assertEqual(self.outline.total_sub_nodes(), len(records))
+
+    @data(PREORDER, POSTORDER, BREADTH_FIRST)
+    def test_max_depth(self, order):
+        records = list(iter_outline_nodes(self.top_node, order=order, max_depth=2))
+        expected = [ancestry for ancestry in recursive_child_ancestries(self.top_node) if len(ancestry) <= 2]
+
+        self.assertEqual(sorted(expected), sorted(record.child_ancestry() for record in records))
+
+    @data(PREORDER, POSTORDER, BREADTH_FIRST)
+    def test_prune(self, order):
+        def prune(record):
+            return record.child_ancestry()[:1] == (1,)
+
+        records = list(iter_outline_nodes(self.top_node, order=order, prune=prune))
+        expected = [ancestry for ancestry in recursive_child_ancestries(self.top_node)
+                    if ancestry[:1] != (1,) or ancestry == (1,)]
+
+        self.assertEqual(sorted(expected), sorted(record.child_ancestry() for record in records))
+
+    def test_invalid_order(self):
+        self.assertRaises(ValueError, iter_outline_nodes, self.top_node, order='sideways')
+
+    def test_very_deep_outline(self):
+        depth = 5000
+        top_element = ElementTree.Element('outline', {'text': 'Level 1'})
+        parent_element = top_element
+        for level in range(2, depth + 1):
+            element = ElementTree.Element('outline', {'text': f'Level {level}'})
+            parent_element.append(element)
+            parent_element = element
+        outline = Outline.from_scratch([top_element])
+
+        records = list(outline.iter_nodes())
+
+        self.assertEqual(depth + 1, len(records))
+        self.assertEqual(depth, records[-1].depth)
+        self.assertEqual(f'Level {depth}', records[-1].node().text)
+        self.assertEqual(depth + 1, outline.total_sub_nodes())
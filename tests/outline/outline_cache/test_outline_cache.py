@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from xml.etree import ElementTree
+from ddt import ddt, data
+
+from outline.outline import Outline
+from outline.outline_cache import OutlineCache, snapshot_suffix, index_suffix
+from tests.test_utilities.test_config import input_files_root
+
+test_files = [
+    os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml'),
+    os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-valid-01.opml'),
+    os.path.join(input_files_root, 'outline', 'opml', 'opml-test-valid-opml-01.opml'),
+    os.path.join(input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml'),
+]
+
+
+@ddt
+class TestOutlineCache(TestCase):
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.cache = OutlineCache(os.path.join(self.temporary_directory.name, 'cache'))
+
+    def copy_test_file(self, test_file):
+        path = os.path.join(self.temporary_directory.name, os.path.basename(test_file))
+        shutil.copyfile(test_file, path)
+        return path
+
+    def snapshot_paths(self):
+        return self.entry_paths(snapshot_suffix)
+
+    def entry_paths(self, suffix):
+        return sorted(
+            os.path.join(self.cache.directory, entry_name)
+            for entry_name in os.listdir(self.cache.directory) if entry_name.endswith(suffix)
+        )
+
+    def assertSameOutline(self, expected, outline):
+        self.assertEqual(expected.version, outline.version)
+        self.assertEqual(expected.title, outline.title)
+        self.assertEqual(expected.dateModified, outline.dateModified)
+        self.assertEqual(expected.expansionState, outline.expansionState)
+
+        expected_records = expected.list_nodes()
+        records = outline.list_nodes()
+        self.assertEqual(len(expected_records), len(records))
+        for expected_record, record in zip(expected_records, records):
+            self.assertEqual(expected_record.child_ancestry(), record.child_ancestry())
+            self.assertEqual(expected_record.node()._node.attrib, record.node()._node.attrib)
+
+    @data(*test_files)
+    def test_cached_outline_matches_parsed(self, test_file):
+        expected = Outline.from_opml(test_file)
+
+        # First read parses the file and adds it to the cache, second is re-built from the snapshot.
+        self.assertSameOutline(expected, Outline.from_opml(test_file, cache=self.cache))
+        self.assertSameOutline(expected, Outline.from_opml(test_file, cache=self.cache))
+
+    def test_unchanged_file_not_parsed(self):
+        test_file = self.copy_test_file(test_files[0])
+        Outline.from_opml(test_file, cache=self.cache)
+
+        with patch.object(ElementTree, 'fromstring') as fromstring, patch.object(ElementTree, 'parse') as parse:
+            outline = Outline.from_opml(test_file, cache=self.cache)
+
+        fromstring.assert_not_called()
+        parse.assert_not_called()
+        self.assertSameOutline(Outline.from_opml(test_file), outline)
+
+    def test_changed_file_reparsed(self):
+        test_file = self.copy_test_file(test_files[1])
+        Outline.from_opml(test_file, cache=self.cache)
+
+        changed_outline = Outline.from_opml(test_files[0])
+        changed_outline.write_opml(test_file)
+        stat = os.stat(test_file)
+        os.utime(test_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+        self.assertSameOutline(changed_outline, Outline.from_opml(test_file, cache=self.cache))
+        self.assertEqual(2, len(self.snapshot_paths()))
+
+    def test_damaged_snapshot_discarded(self):
+        test_file = self.copy_test_file(test_files[0])
+        Outline.from_opml(test_file, cache=self.cache)
+
+        snapshot_path = self.snapshot_paths()[0]
+        with open(snapshot_path, 'r+b') as snapshot_file:
+            snapshot_file.seek(40)
+            snapshot_file.write(b'\xff\xff\xff\xff')
+
+        self.assertSameOutline(Outline.from_opml(test_file), Outline.from_opml(test_file, cache=self.cache))
+
+        # Snapshot re-written from the file, so can be read again.
+        with patch.object(ElementTree, 'fromstring') as fromstring:
+            Outline.from_opml(test_file, cache=self.cache)
+        fromstring.assert_not_called()
+
+    def test_least_recently_used_evicted(self):
+        Outline.from_opml(test_files[3], cache=self.cache)
+        first_snapshot_path = self.snapshot_paths()[0]
+        first_snapshot_size = os.path.getsize(first_snapshot_path)
+        os.utime(first_snapshot_path, ns=(0, 0))
+
+        self.cache.max_size = first_snapshot_size + 1
+        Outline.from_opml(test_files[0], cache=self.cache)
+
+        self.assertNotIn(first_snapshot_path, self.snapshot_paths())
+        self.assertEqual(1, len(self.snapshot_paths()))
+        self.assertEqual(1, len(self.entry_paths(index_suffix)))
+        self.assertLessEqual(self.cache.size(), self.cache.max_size)
+
+        # Evicted file is parsed and added again.
+        self.assertSameOutline(Outline.from_opml(test_files[3]), Outline.from_opml(test_files[3], cache=self.cache))
+
+    def test_orphaned_index_entries_removed(self):
+        Outline.from_opml(test_files[0], cache=self.cache)
+        Outline.from_opml(test_files[3], cache=self.cache)
+        self.assertEqual(2, len(self.entry_paths(index_suffix)))
+
+        # Snapshot removed by another process, leaving its index entry behind.
+        os.remove(self.snapshot_paths()[0])
+        self.cache.max_size = 0
+        Outline.from_opml(test_files[1], cache=self.cache)
+
+        self.assertEqual([], self.snapshot_paths())
+        self.assertEqual([], self.entry_paths(index_suffix))
+
+    def test_clear(self):
+        Outline.from_opml(test_files[0], cache=self.cache)
+        self.cache.clear()
+
+        self.assertEqual([], os.listdir(self.cache.directory))
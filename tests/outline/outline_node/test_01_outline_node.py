@@ -1,6 +1,9 @@
 import os
 from unittest import TestCase
+from unittest.mock import patch
+from outline import outline_utilities as outil
 from outline.outline import Outline
+from outline.opml_exceptions import MissingOpmlAttribute
 from outline.outline_node import OutlineNode
 import tests.test_utilities.test_config as tcfg
 
@@ -46,4 +49,24 @@ class TestOutlineNode(TestCase):
         node_01_01_01a = node_01_01[0]
         node_01_01_01b = top_level_node[0][0][0]
 
-        self.assertEqual(node_01_01_01a, node_01_01_01b)
\ No newline at end of file
+        self.assertEqual(node_01_01_01a, node_01_01_01b)
+
+    def test_field_defaults(self):
+        node = OutlineNode.create_outline_node(outline_text="Text only")
+        self.assertEqual('', node.note)
+
+        node._node.set('_note', None)
+        self.assertEqual('', node.note)
+
+    def test_missing_note_not_validated(self):
+        node = OutlineNode.create_outline_node(outline_text="Text only")
+
+        with patch.object(outil, 'get_valid_attribute') as get_valid_attribute:
+            self.assertEqual('', node.note)
+        get_valid_attribute.assert_not_called()
+
+    def test_field_removed_after_creation(self):
+        node = OutlineNode.create_outline_node(outline_text="Text", outline_note="Note")
+        del node._node.attrib['text']
+
+        self.assertRaises(MissingOpmlAttribute, lambda: node.text)
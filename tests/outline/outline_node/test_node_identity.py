@@ -0,0 +1,91 @@
+"""
+Tests that the same node of an outline is always represented by the same wrapper object while that wrapper is still
+in use.
+"""
+import gc
+import os
+import threading
+import weakref
+from unittest import TestCase
+
+from outline.flat_outline import FlatOutline
+from outline.outline import Outline
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+import tests.test_utilities.test_config as tcfg
+
+
+class TestNodeIdentity(TestCase):
+    local_path = os.path.join('outline', 'outline_node')
+    test_outline = os.path.join(tcfg.input_files_root, local_path, 'outline-test-valid-01.opml')
+
+    def test_child_access_identical(self):
+        outline = Outline.from_opml(self.test_outline)
+        top_level_node = outline.top_outline_node
+
+        self.assertIs(top_level_node[0], top_level_node[0])
+        self.assertIs(top_level_node[1][0], top_level_node[1][0])
+
+    def test_iteration_identical_to_child_access(self):
+        outline = Outline.from_opml(self.test_outline)
+        top_level_node = outline.top_outline_node
+
+        records = outline.list_nodes()
+        self.assertIs(top_level_node, records[0].node())
+        self.assertIs(top_level_node[0], records[1].node())
+
+        for record_1, record_2 in zip(records, outline.list_nodes()):
+            self.assertIs(record_1.node(), record_2.node())
+
+    def test_unused_wrapper_released(self):
+        outline = Outline.from_opml(self.test_outline)
+        child_reference = weakref.ref(outline.top_outline_node[0])
+        gc.collect()
+
+        self.assertIsNone(child_reference())
+
+    def test_flat_outline_node_identical(self):
+        flat_outline = FlatOutline.from_outline(Outline.from_opml(self.test_outline))
+
+        self.assertIs(flat_outline.node(2), flat_outline.node(2))
+        self.assertIs(flat_outline.top_outline_node[0], flat_outline.node(1))
+
+    def test_unleashed_node_identical_for_same_delimiters(self):
+        outline = Outline.from_opml(self.test_outline)
+        child = outline.top_outline_node[0]
+
+        unleashed_1 = UnleashedOutlineNode.for_outline_node(child, tag_regex_text=('[', ']'))
+        unleashed_2 = UnleashedOutlineNode.for_outline_node(child, tag_regex_text=['[', ']'])
+        unleashed_3 = UnleashedOutlineNode.for_outline_node(child, tag_regex_text=('(', ')'))
+
+        self.assertIs(unleashed_1, unleashed_2)
+        self.assertIsNot(unleashed_1, unleashed_3)
+        self.assertEqual(('(', ')'), unleashed_3.tag_regex_text)
+
+    def test_unleashed_ancestry_item_node_identical(self):
+        unleashed_outline = UnleashedOutline(Outline.from_opml(self.test_outline), ('[', ']'), ('[', ']'))
+        record = unleashed_outline.get_node(2)
+
+        self.assertIs(record.node(), record.node())
+        self.assertIs(record[-1].node, unleashed_outline.list_unleashed_nodes()[2].node())
+
+    def test_wrapper_identical_across_threads(self):
+        outline = Outline.from_opml(self.test_outline)
+        top_level_node = outline.top_outline_node
+        thread_count = 8
+        barrier = threading.Barrier(thread_count)
+        wrappers = [None] * thread_count
+
+        def get_wrapper(thread_index):
+            barrier.wait()
+            wrappers[thread_index] = UnleashedOutlineNode.for_outline_node(top_level_node[1][0],
+                                                                           tag_regex_text=('[', ']'))
+
+        threads = [threading.Thread(target=get_wrapper, args=(thread_index,)) for thread_index in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for wrapper in wrappers:
+            self.assertIs(wrappers[0], wrapper)
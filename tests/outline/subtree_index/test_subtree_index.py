@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from xml.etree import ElementTree
+
+from outline import subtree_index
+from outline.opml_exceptions import DuplicateSubtreeName
+from outline.outline import Outline
+from outline.outline_node import OutlineNode
+from outlines_unleashed.unleashed_outline import UnleashedOutline, data_node_regex
+from outlines_unleashed.unleashed_outline_exceptions import DuplicateDataNodeName
+from tests.test_utilities.test_config import input_files_root
+
+test_files = [
+    os.path.join(input_files_root, 'outline', 'outline_node', 'outline-test-get_node-01.opml'),
+    os.path.join(input_files_root, 'data_node_descriptor', 'opml_data_extraction_test_03.opml'),
+]
+
+
+def node_summary(outline_node):
+    return [
+        (record.child_ancestry(), record.node().text, record.node().note) for record in outline_node.iter_nodes()
+    ]
+
+
+class TestSubtreeIndex(TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+
+    def copy_test_file(self, test_file):
+        path = os.path.join(self.directory, os.path.basename(test_file))
+        shutil.copyfile(test_file, path)
+        return path
+
+    def test_every_subtree_matches_outline(self):
+        for test_file in test_files:
+            opml_path = self.copy_test_file(test_file)
+            outline = Outline.from_opml(opml_path)
+
+            records = outline.list_nodes()[1:]
+            self.assertEqual(len(records), len(subtree_index.get_subtree_index(opml_path)))
+            for record in records:
+                with self.subTest(test_file=test_file, node_path=record.child_ancestry()):
+                    subtree_node = Outline.load_subtree(opml_path, record.child_ancestry())
+                    self.assertEqual(node_summary(record.node()), node_summary(subtree_node))
+
+    def test_missing_subtree(self):
+        opml_path = self.copy_test_file(test_files[0])
+        index = subtree_index.get_subtree_index(opml_path)
+        top_level_count = len(Outline.from_opml(opml_path).top_outline_node)
+
+        for node_path in [(), (0,), (top_level_count + 1,), (1, 1, 1, 1, 1, 1, 1, 1)]:
+            with self.subTest(node_path=node_path):
+                self.assertRaises(KeyError, index.byte_range, node_path)
+
+    def test_sidecar_reused(self):
+        opml_path = self.copy_test_file(test_files[0])
+        Outline.load_subtree(opml_path, (1,))
+        self.assertTrue(os.path.exists(opml_path + subtree_index.sidecar_suffix))
+
+        with patch.object(subtree_index, 'build_subtree_index') as build_subtree_index:
+            Outline.load_subtree(opml_path, (2, 1))
+        build_subtree_index.assert_not_called()
+
+    def test_changed_file_reindexed(self):
+        opml_path = self.copy_test_file(test_files[0])
+        Outline.load_subtree(opml_path, (1,))
+
+        changed_outline = Outline.from_opml(test_files[1])
+        changed_outline.write_opml(opml_path)
+        stat = os.stat(opml_path)
+        os.utime(opml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+        self.assertEqual(node_summary(changed_outline.top_outline_node[1]),
+                         node_summary(Outline.load_subtree(opml_path, (2,))))
+
+    def test_byte_range_holds_only_subtree(self):
+        opml_path = self.copy_test_file(test_files[1])
+        start, end = subtree_index.get_subtree_index(opml_path).byte_range((1, 1))
+
+        with open(opml_path, 'rb') as opml_file:
+            opml_file.seek(start)
+            subtree_xml = opml_file.read(end - start)
+
+        self.assertTrue(subtree_xml.startswith(b'<outline'))
+        self.assertLess(len(subtree_xml), os.path.getsize(opml_path) / 10)
+        self.assertEqual(node_summary(Outline.from_opml(opml_path).top_outline_node[0][0]),
+                         node_summary(OutlineNode(ElementTree.fromstring(subtree_xml))))
+
+    def test_load_data_node(self):
+        opml_path = self.copy_test_file(test_files[1])
+        unleashed_outline = UnleashedOutline(Outline.from_opml(opml_path))
+
+        for data_node_name, _, data_node in unleashed_outline.iter_data_nodes():
+            loaded_data_node = UnleashedOutline.load_data_node(opml_path, data_node_name)
+            self.assertEqual(node_summary(data_node.outline_node), node_summary(loaded_data_node.outline_node))
+
+        self.assertEqual([data_node_regex.pattern], list(subtree_index.get_subtree_index(opml_path).names_by_pattern))
+
+    def test_duplicate_name(self):
+        opml_path = os.path.join(self.directory, 'duplicate.opml')
+        with open(opml_path, 'w', encoding='utf-8') as opml_file:
+            opml_file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                            '<opml version="2.0"><head><title>Duplicates</title></head><body>\n'
+                            '<outline text="A" _note="{data_node: duplicate}"/>\n'
+                            '<outline text="B" _note="{data_node: duplicate}"/>\n'
+                            '<outline text="C" _note="{data_node: single}"/>\n'
+                            '</body></opml>\n')
+
+        self.assertEqual('C', UnleashedOutline.load_data_node(opml_path, 'single').text)
+        self.assertRaises(DuplicateDataNodeName, UnleashedOutline.load_data_node, opml_path, 'duplicate')
+
+        index = subtree_index.get_subtree_index(opml_path, name_regex=data_node_regex)
+        self.assertEqual([0, 1], index.names_by_pattern[data_node_regex.pattern]['duplicate'])
+        self.assertRaises(DuplicateSubtreeName, index.byte_range, name='duplicate')
+
+    def test_names_kept_for_each_pattern(self):
+        opml_path = self.copy_test_file(test_files[1])
+        other_pattern = r'\{(\w+):'
+        data_node_index = subtree_index.get_subtree_index(opml_path, name_regex=data_node_regex)
+        other_index = subtree_index.get_subtree_index(opml_path, name_regex=other_pattern)
+
+        self.assertCountEqual([data_node_regex.pattern, other_pattern], other_index.names_by_pattern)
+        self.assertEqual(data_node_index.names_by_pattern[data_node_regex.pattern],
+                         other_index.names_by_pattern[data_node_regex.pattern])
+
+        with patch.object(subtree_index, 'build_subtree_index') as build_subtree_index:
+            subtree_index.get_subtree_index(opml_path, name_regex=data_node_regex)
+            subtree_index.get_subtree_index(opml_path, name_regex=other_pattern)
+        build_subtree_index.assert_not_called()
+
+        # More than one set of names, so the pattern must be given.
+        data_node_name = next(iter(data_node_index.names_by_pattern[data_node_regex.pattern]))
+        self.assertRaises(KeyError, other_index.byte_range, name=data_node_name)
+        self.assertEqual(data_node_index.byte_range(name=data_node_name),
+                         other_index.byte_range(name=data_node_name, name_pattern=data_node_regex.pattern))
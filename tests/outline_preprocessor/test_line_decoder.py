@@ -0,0 +1,111 @@
+"""
+Tests that decoding a line with the compiled regex of a TextOutlineDecodeSpecifier gives the same result (or the same
+error) as decoding it a step at a time with decode_initial_token, decode_indent_token and decode_bullet_token.
+"""
+import os
+from unittest import TestCase
+from ddt import ddt, data, unpack
+
+from outline_preprocessors.preprocessor_text_indent import TextOutlineDecodeSpecifier
+from tests.outline_preprocessor.test_text_outline_preprocessor import generated_test_file_data
+from tests.test_utilities.test_config import input_files_root
+
+specifications = [
+    ("\t", ),
+    ("    ", ),
+    ("\t", ["", "o "]),
+    ("\t", ["o "]),
+    ("\t", ["o ", "+ ", "- "]),
+    ("\t", ["o", "o "]),
+    ("\t", None, 1),
+    ("\t", ["o "], 2),
+    ("\t", None, 0, "[--]    ", True),
+    ("\t", ["", "o "], 0, "    [--]"),
+    ("--", ["* "]),
+]
+
+lines = [
+    "Text",
+    "\tText",
+    "\t\t\tText  ",
+    "o Text",
+    "\to Text",
+    "\t\to Text",
+    "\t+ Text",
+    "\t\t- Text",
+    "\t\t\t\t- Text",
+    "\to ",
+    "\to",
+    "o",
+    "oText",
+    "\tab",
+    "[--]    Text",
+    "[--]    \tText",
+    "    [--]\to Text",
+    "----* Text",
+    "----",
+    "--* ",
+    "  Text with spaces  ",
+]
+
+
+def decode_by_steps(decode_specifier, line):
+    _, remaining_text = decode_specifier.decode_initial_token(line)
+    indent_level, remaining_text = decode_specifier.decode_indent_token(remaining_text)
+    node_text = decode_specifier.decode_bullet_token(remaining_text, indent_level)
+    if node_text is None:
+        return None, None
+    return indent_level, node_text
+
+
+def outcome(decode, decode_specifier, line):
+    try:
+        return decode(decode_specifier, line)
+    except ValueError:
+        return ValueError
+
+
+@ddt
+class TestLineDecoder(TestCase):
+    @data(*[(specification, line) for specification in specifications for line in lines])
+    @unpack
+    def test_decode_line_matches_steps(self, specification, line):
+        decode_specifier = TextOutlineDecodeSpecifier(*specification)
+
+        self.assertEqual(outcome(decode_by_steps, decode_specifier, line),
+                         outcome(TextOutlineDecodeSpecifier.decode_line, decode_specifier, line))
+
+    @data(*[(specification, line) for specification in specifications for line in lines])
+    @unpack
+    def test_decode_lines_matches_decode_line(self, specification, line):
+        decode_specifier = TextOutlineDecodeSpecifier(*specification)
+
+        expected = outcome(TextOutlineDecodeSpecifier.decode_line, decode_specifier, line)
+        if expected is not ValueError:
+            expected = [] if expected[0] is None else [expected]
+        self.assertEqual(expected, outcome(lambda specifier, text: list(specifier.decode_lines([text + "\n"])),
+                                           decode_specifier, line))
+
+    @data(*generated_test_file_data['driver_file_01'].items())
+    @unpack
+    def test_decode_lines_matches_steps(self, encoding_format, specification):
+        file_path = os.path.join(input_files_root, 'outline_preprocessor', 'generated',
+                                 f'driver_file_01-{encoding_format}.txt')
+        decode_specifier = TextOutlineDecodeSpecifier(*specification)
+        with open(file_path) as text_file:
+            file_lines = text_file.readlines()
+
+        expected = []
+        for line in file_lines:
+            line = line.rstrip("\n")
+            if line.strip() != "":
+                indent_level, node_text = decode_by_steps(decode_specifier, line)
+                if indent_level is not None:
+                    expected.append((indent_level, node_text))
+
+        self.assertEqual(expected, list(decode_specifier.decode_lines(file_lines)))
+
+    def test_decode_lines_with_and_without_newlines(self):
+        decode_specifier = TextOutlineDecodeSpecifier("\t", ["o "])
+
+        self.assertEqual([(1, 'A'), (2, 'B')], list(decode_specifier.decode_lines(["o A\n", "\n", "\to B"])))
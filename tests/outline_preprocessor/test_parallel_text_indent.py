@@ -0,0 +1,87 @@
+"""
+Tests that decoding an indented text file in line-aligned chunks in worker processes builds the same outline as
+decoding it serially, and that errors are still detected across the boundaries between chunks.
+"""
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+from ddt import ddt, data
+
+from outline.opml_exceptions import MalformedOutline
+from outline_preprocessors.preprocessor_text_indent import PreprocessorTextIndent, TextOutlineDecodeSpecifier, \
+    TextFileLines
+from tests.test_utilities.test_config import input_files_root
+
+onenote_file = os.path.join(input_files_root, 'outline_preprocessor', 'onenote_bullet_paste_01.txt')
+onenote_specifier = TextOutlineDecodeSpecifier("\t", ["• ", "• ", "○ ", "§ ", "□ ", "® ", "◊ ", "} ", "– ", "w "])
+
+
+def outline_summary(outline):
+    return [(record.depth, record.node().text) for record in outline.list_nodes()]
+
+
+@ddt
+class TestParallelTextIndent(TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+
+    def write_text_file(self, lines):
+        file_path = os.path.join(self.directory, 'outline.txt')
+        with open(file_path, 'w') as text_file:
+            text_file.writelines(lines)
+        return file_path
+
+    @data(1, 10, 100, 1024 * 1024)
+    def test_chunks_aligned_to_lines(self, chunk_size):
+        text_file_lines = TextFileLines(onenote_file)
+        chunks = text_file_lines.line_aligned_chunks(chunk_size)
+
+        with open(onenote_file, 'rb') as text_file:
+            content = text_file.read()
+        self.assertEqual(0, chunks[0][0])
+        self.assertEqual(len(content), chunks[-1][1])
+        for (_, end), (next_start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(b'\n'[0], content[end - 1])
+
+    @data(1, 50, 1024 * 1024)
+    def test_parallel_matches_serial(self, chunk_size):
+        serial_preprocessor = PreprocessorTextIndent.from_textfile(onenote_file, onenote_specifier, max_workers=1)
+        parallel_preprocessor = PreprocessorTextIndent.from_textfile(onenote_file, onenote_specifier, max_workers=2,
+                                                                     parallel_threshold=0)
+
+        self.assertEqual(serial_preprocessor.parse_text(),
+                         list(parallel_preprocessor.iter_parsed_lines_parallel(chunk_size=chunk_size)))
+
+    def test_parallel_used_above_threshold(self):
+        file_path = os.path.join(input_files_root, 'outline_preprocessor', 'outline_indent_test_04.txt')
+        specifier = TextOutlineDecodeSpecifier("    ")
+
+        serial_outline = PreprocessorTextIndent.from_textfile(file_path, specifier).pre_process_outline()
+        preprocessor = PreprocessorTextIndent.from_textfile(file_path, specifier, max_workers=2, parallel_threshold=0)
+
+        with patch.object(preprocessor, 'iter_parsed_lines_parallel',
+                          wraps=preprocessor.iter_parsed_lines_parallel) as iter_parsed_lines_parallel:
+            parallel_outline = preprocessor.pre_process_outline()
+
+        iter_parsed_lines_parallel.assert_called_once()
+        self.assertEqual(outline_summary(serial_outline), outline_summary(parallel_outline))
+
+    def test_jumped_generation_across_chunks(self):
+        file_path = self.write_text_file(["A\n", "    B\n", "            C\n"])
+        preprocessor = PreprocessorTextIndent.from_textfile(file_path, TextOutlineDecodeSpecifier("    "),
+                                                            max_workers=2, parallel_threshold=0)
+        self.assertEqual(3, len(preprocessor.outline.line_aligned_chunks(1)))
+
+        self.assertRaises(MalformedOutline, preprocessor.attach_nodes, preprocessor.create_outline_element(None),
+                          preprocessor.iter_parsed_lines_parallel(chunk_size=1))
+
+    def test_decode_error_in_worker(self):
+        file_path = self.write_text_file(["o A\n", "\to B\n", "\tNo bullet\n"])
+        preprocessor = PreprocessorTextIndent.from_textfile(file_path, TextOutlineDecodeSpecifier("\t", ["o "]),
+                                                            max_workers=2, parallel_threshold=0)
+
+        self.assertRaises(ValueError, list, preprocessor.iter_parsed_lines_parallel(chunk_size=1))
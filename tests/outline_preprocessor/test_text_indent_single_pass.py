@@ -0,0 +1,81 @@
+"""
+Tests that the single pass pre-processing of an indented text file (reading, decoding and attaching a line at a time)
+builds the same outline as building it from the full list of parsed lines, and reads lines only as they are needed.
+"""
+import os
+from unittest import TestCase
+from ddt import ddt, data
+
+from outline.opml_exceptions import MalformedOutline
+from outline.outline import Outline
+from outline_preprocessors.preprocessor_text_indent import PreprocessorTextIndent, TextOutlineDecodeSpecifier, \
+    TextFileLines
+from tests.test_utilities.test_config import input_files_root
+
+preprocessor_files_root = os.path.join(input_files_root, 'outline_preprocessor')
+
+
+def outline_summary(outline):
+    return [(record.depth, record.node().text) for record in outline.list_nodes()]
+
+
+@ddt
+class TestTextIndentSinglePass(TestCase):
+    @data('outline_indent_test_01.txt', 'outline_indent_test_02.txt', 'outline_indent_test_03.txt',
+          'outline_indent_test_04.txt')
+    def test_matches_list_based_build(self, file_name):
+        file_path = os.path.join(preprocessor_files_root, file_name)
+        preprocessor = PreprocessorTextIndent.from_textfile(file_path, TextOutlineDecodeSpecifier("    "))
+
+        top_level_node = preprocessor.create_outline_element(None)
+        preprocessor.add_child_nodes(top_level_node, 0, preprocessor.parse_text(), 0)
+        expected_outline = Outline.from_scratch(list(top_level_node))
+
+        self.assertEqual(outline_summary(expected_outline), outline_summary(preprocessor.pre_process_outline()))
+
+    def test_from_textfile_reads_lazily(self):
+        file_path = os.path.join(preprocessor_files_root, 'outline_indent_test_04.txt')
+        preprocessor = PreprocessorTextIndent.from_textfile(file_path, TextOutlineDecodeSpecifier("    "))
+
+        self.assertIsInstance(preprocessor.outline, TextFileLines)
+        self.assertEqual(preprocessor.parse_text(), preprocessor.parse_text())
+
+    def test_lines_attached_as_read(self):
+        lines_read = []
+
+        def lines():
+            for line_number, line in enumerate(["A\n", "    B\n", "        C\n", "D\n"]):
+                lines_read.append(line_number)
+                yield line
+
+        preprocessor = PreprocessorTextIndent(lines(), TextOutlineDecodeSpecifier("    "))
+        top_level_node = preprocessor.create_outline_element(None)
+
+        nodes_attached = []
+
+        def parsed_lines():
+            for parsed_line in preprocessor.iter_parsed_lines():
+                nodes_attached.append((len(lines_read), sum(1 for _ in top_level_node.iter()) - 1))
+                yield parsed_line
+
+        preprocessor.attach_nodes(top_level_node, parsed_lines())
+
+        # Each line is read just before it is attached, and the previous lines have all been attached.
+        self.assertEqual([(1, 0), (2, 1), (3, 2), (4, 3)], nodes_attached)
+        self.assertEqual(['A', 'B', 'C', 'D'], [element.get('text') for element in top_level_node.iter()][1:])
+
+    def test_bullet_only_line_skipped(self):
+        preprocessor = PreprocessorTextIndent(["o A\n", "\to \n", "\to B\n"], TextOutlineDecodeSpecifier("\t", ["o "]))
+
+        self.assertEqual([(1, 'A'), (2, 'B')], preprocessor.parse_text())
+
+    def test_jumped_generation(self):
+        preprocessor = PreprocessorTextIndent(["A\n", "    B\n", "            C\n"], TextOutlineDecodeSpecifier("    "))
+
+        self.assertRaises(MalformedOutline, preprocessor.pre_process_outline)
+
+    def test_jumped_generation_from_file(self):
+        file_path = os.path.join(preprocessor_files_root, 'outline_indent_test_05.txt')
+        preprocessor = PreprocessorTextIndent.from_textfile(file_path, TextOutlineDecodeSpecifier("    "))
+
+        self.assertRaises(MalformedOutline, preprocessor.pre_process_outline)
@@ -0,0 +1,89 @@
+"""
+Tests that building a FlatOutline directly from an indented text file gives the same outline as building an Outline
+and converting it, and that the FlatOutline can be extracted by UnleashedOutline in the same way.
+"""
+import os
+from unittest import TestCase
+from ddt import ddt, data
+
+from outline.flat_outline import FlatOutline
+from outline.opml_exceptions import MalformedOutline
+from outline_preprocessors.preprocessor_text_indent import PreprocessorTextIndent, TextOutlineDecodeSpecifier
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.node_ancestry_matching_criteria import NodeAncestryMatchingCriteria
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from tests.test_utilities.test_config import input_files_root
+
+preprocessor_files_root = os.path.join(input_files_root, 'outline_preprocessor')
+
+level_specifier = {
+    'header': {
+        'descriptor_version_number': '0.1'
+    },
+    'descriptor': {
+        'Level1': {
+            'primary_key': 'yes',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [
+                NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(),
+            ]
+        },
+        'Level2': {
+            'primary_key': 'yes',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [
+                NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(),
+            ]
+        },
+        'Level3': {
+            'primary_key': 'yes',
+            'field_value_specifier': 'text_value',
+            'ancestry_matching_criteria': [
+                NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(),
+                NodeAncestryMatchingCriteria(),
+            ]
+        },
+    }
+}
+
+
+def flat_outline_content(flat_outline):
+    return (list(flat_outline.parent), list(flat_outline.depth), list(flat_outline.child_number),
+            list(flat_outline.subtree_size), list(flat_outline.text), list(flat_outline.note))
+
+
+@ddt
+class TestTextToFlatOutline(TestCase):
+    @data(('outline_indent_test_01.txt', TextOutlineDecodeSpecifier("    ")),
+          ('outline_indent_test_04.txt', TextOutlineDecodeSpecifier("    ")),
+          ('onenote_bullet_paste_01.txt',
+           TextOutlineDecodeSpecifier("\t", ["• ", "• ", "○ ", "§ ", "□ ", "® ", "◊ ", "} ", "– ", "w "])))
+    def test_matches_converted_outline(self, file_and_specifier):
+        file_name, decode_specifier = file_and_specifier
+        preprocessor = PreprocessorTextIndent.from_textfile(os.path.join(preprocessor_files_root, file_name),
+                                                            decode_specifier)
+
+        expected = FlatOutline.from_outline(preprocessor.pre_process_outline())
+        self.assertEqual(flat_outline_content(expected), flat_outline_content(preprocessor.pre_process_flat_outline()))
+
+    def test_jumped_generation(self):
+        preprocessor = PreprocessorTextIndent.from_textfile(
+            os.path.join(preprocessor_files_root, 'outline_indent_test_05.txt'), TextOutlineDecodeSpecifier("    "))
+
+        self.assertRaises(MalformedOutline, preprocessor.pre_process_flat_outline)
+
+    def test_unleashed_extraction(self):
+        preprocessor = PreprocessorTextIndent.from_textfile(
+            os.path.join(preprocessor_files_root, 'outline_indent_test_04.txt'), TextOutlineDecodeSpecifier("    "))
+        specifier = DataNodeSpecifier(level_specifier)
+
+        expected_table = UnleashedOutline(preprocessor.pre_process_outline()).extract_data_node_table(specifier)
+        flat_table = UnleashedOutline(preprocessor.pre_process_flat_outline()).extract_data_node_table(specifier)
+
+        self.assertLess(0, len(expected_table))
+        self.assertEqual(expected_table, flat_table)
@@ -0,0 +1,133 @@
+"""
+Tests for the columnar DataNodeTable, checking that it holds the same records as extract_data_node_dispatch and that
+slicing, filtering and output work on it.
+"""
+import os
+import tempfile
+from array import array
+import unittest
+from unittest import TestCase
+
+import tests.test_utilities.test_config as tcfg
+from outline.outline import Outline
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.data_node_table import DataNodeTable, DictionaryEncodedColumn, ValueColumn
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from output_generators.csv_output_generator import CsvOutputGenerator
+from tests.python_test_data.data_node_specifier_data.data_node_test_specifiers import \
+    test_data_node_specifier_ppt_01
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestDataNodeTable(TestCase):
+    test_root = os.path.join(tcfg.input_files_root, 'data_node_descriptor')
+
+    def setUp(self) -> None:
+        unleashed_outline = UnleashedOutline(Outline.from_opml(
+            os.path.join(self.test_root, 'opml_data_extraction_test_02.opml')))
+
+        data_node = unleashed_outline.list_unleashed_nodes()[1].node()
+        data_node_specifier = DataNodeSpecifier(test_data_node_specifier_ppt_01)
+
+        self.records = data_node_specifier.extract_data_node_dispatch(data_node)
+        self.table = data_node_specifier.extract_data_node_table(data_node)
+
+    def test_table_matches_records(self):
+        self.assertEqual(len(self.records), len(self.table))
+        self.assertEqual(tuple(self.records[0]), self.table.field_names)
+        self.assertEqual(self.records, self.table)
+        self.assertEqual(self.records, self.table.to_records())
+        self.assertEqual(self.records[-1], dict(self.table[-1]))
+
+    def test_string_columns_encoded(self):
+        column = self.table._column_by_name['section_name']
+
+        self.assertIsInstance(column, DictionaryEncodedColumn)
+        self.assertEqual(len(set(record['section_name'] for record in self.records)), len(column.values))
+
+    def test_slice(self):
+        table_slice = self.table[3:7]
+
+        self.assertIsInstance(table_slice, DataNodeTable)
+        self.assertEqual(self.records[3:7], table_slice)
+        self.assertIs(self.table._columns, table_slice._columns)
+        self.assertEqual(self.records[5], table_slice[2])
+
+    def test_filter(self):
+        section_name = self.records[-1]['section_name']
+        expected = [record for record in self.records if record['section_name'] == section_name]
+
+        self.assertEqual(expected, self.table.filter('section_name', section_name))
+        self.assertEqual(expected, self.table.filter('section_name', lambda value: value == section_name))
+
+        # Filtering a slice only selects from the rows of the slice.
+        expected_in_slice = [record for record in self.records[:10] if record['section_name'] == section_name]
+        self.assertEqual(expected_in_slice, self.table[:10].filter('section_name', section_name))
+
+    def test_column(self):
+        self.assertEqual([record['bullet'] for record in self.records], self.table.column('bullet'))
+
+    def test_from_records(self):
+        self.assertEqual(self.records, DataNodeTable.from_records(self.records))
+        self.assertEqual(0, len(DataNodeTable.from_records([])))
+
+    def test_csv_output_same_as_records(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            records_path = os.path.join(output_dir, 'records.csv')
+            table_path = os.path.join(output_dir, 'table.csv')
+            CsvOutputGenerator.create_csv_file(self.records, records_path)
+            CsvOutputGenerator.create_csv_file(self.table, table_path)
+
+            with open(records_path) as records_file, open(table_path) as table_file:
+                self.assertEqual(records_file.read(), table_file.read())
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_to_numpy(self):
+        arrays = self.table[2:].to_numpy()
+
+        self.assertEqual(list(self.table.field_names), list(arrays))
+        self.assertEqual(self.table[2:].column('slide_name'), list(arrays['slide_name']))
+
+    def test_typed_columns(self):
+        rows = [(1, 1.5, True), (None, None, None), (-2 ** 63, float('inf'), False)]
+        table = DataNodeTable.from_rows(['integer', 'float', 'boolean'], rows,
+                                        field_types=['integer', 'float', 'boolean'])
+
+        for field_name in table.field_names:
+            self.assertIsInstance(table._column_by_name[field_name].values, array)
+        self.assertEqual(rows, list(table.iter_rows()))
+        self.assertEqual([int, float, bool], [type(value) for value in table[0].as_tuple()])
+        self.assertEqual(rows[2:], list(table.filter('boolean', False).iter_rows()))
+
+    def test_typed_column_holds_other_values(self):
+        column = ValueColumn('integer')
+        values = [1, None, True, '2', 2 ** 64]
+        for value in values:
+            column.append(value)
+
+        self.assertEqual(values, [column[index] for index in range(len(column))])
+        self.assertEqual([int, type(None), bool, str, int], [type(column[index]) for index in range(len(column))])
+
+    def test_equal_values_of_different_types_encoded_separately(self):
+        values = [1, True, 1.0, '1', 1, True]
+        table = DataNodeTable.from_rows(['value'], [(value,) for value in values])
+
+        self.assertEqual([type(value) for value in values], [type(value) for value in table.column('value')])
+        self.assertEqual(4, len(table._column_by_name['value'].values))
+
+    @unittest.skipIf(numpy is None, "NumPy not installed")
+    def test_typed_columns_to_numpy(self):
+        table = DataNodeTable.from_rows(['integer', 'float', 'boolean', 'missing'],
+                                        [(1, 1.5, True, None), (2, 2.5, False, 3)],
+                                        field_types=['integer', 'float', 'boolean', 'integer'])
+        arrays = table[1:].to_numpy()
+
+        self.assertEqual(numpy.int64, arrays['integer'].dtype)
+        self.assertEqual(numpy.float64, arrays['float'].dtype)
+        self.assertEqual(numpy.bool_, arrays['boolean'].dtype)
+        self.assertEqual(object, arrays['missing'].dtype)
+        self.assertEqual([2, 2.5, False, 3], [arrays[field_name][0] for field_name in table.field_names])
@@ -0,0 +1,62 @@
+"""
+Tests that tag field descriptors are shared between nodes with the same delimiters, and that each node only parses
+its text and note once.
+"""
+from unittest import TestCase
+from unittest.mock import patch
+
+from outline.outline_node import OutlineNode
+from outlines_unleashed import tag_field_descriptor
+from outlines_unleashed.tag_field_descriptor import get_tag_field_descriptor
+from outlines_unleashed.unleashed_outline_node import UnleashedOutlineNode
+
+
+class TestTagParseCache(TestCase):
+    def test_descriptor_shared_for_same_delimiters(self):
+        descriptor_1 = get_tag_field_descriptor(('[*', '*]'))
+        descriptor_2 = get_tag_field_descriptor(['[*', '*]'])
+        descriptor_3 = get_tag_field_descriptor(('(-', '-)'))
+
+        self.assertIs(descriptor_1, descriptor_2)
+        self.assertIsNot(descriptor_1, descriptor_3)
+
+    def test_text_and_note_parsed_once(self):
+        outline_node = OutlineNode.create_outline_node('[*TEXT-TAG*] Text', '(-NOTE-TAG-) Note')
+        node = UnleashedOutlineNode(outline_node, tag_regex_text=('[*', '*]'), tag_regex_note=('(-', '-)'))
+
+        parse_tag = tag_field_descriptor.TagFieldDescriptor.parse_tag
+        with patch.object(tag_field_descriptor.TagFieldDescriptor, 'parse_tag', autospec=True,
+                          side_effect=parse_tag) as mock_parse_tag:
+            for _ in range(3):
+                self.assertEqual('Text', node.text)
+                self.assertEqual('TEXT-TAG', node.text_tag)
+                self.assertEqual('Note', node.note)
+                self.assertEqual('NOTE-TAG', node.note_tag)
+
+        self.assertEqual(2, mock_parse_tag.call_count)
+
+    def test_clone_with_delimiters_reparses(self):
+        outline_node = OutlineNode.create_outline_node('[*TEXT-TAG*] Text')
+        node = UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=('(-', '-)'))
+
+        self.assertIsNone(node.text_tag)
+        clone = node.clone_unleashed_node(text_tag_regex=('[*', '*]'))
+        self.assertEqual('TEXT-TAG', clone.text_tag)
+        self.assertIsNone(node.text_tag)
+        self.assertIs(node, UnleashedOutlineNode.for_outline_node(outline_node, tag_regex_text=('(-', '-)')))
+
+    def test_delimiters_read_only(self):
+        node = UnleashedOutlineNode.for_outline_node(OutlineNode.create_outline_node('[*TEXT-TAG*] Text'))
+
+        with self.assertRaises(AttributeError):
+            node.tag_regex_text = ('[*', '*]')
+        with self.assertRaises(AttributeError):
+            node.tag_regex_note = ('[*', '*]')
+
+    def test_delimiter_key(self):
+        outline_node = OutlineNode.create_outline_node('[*TEXT-TAG*] Text')
+        list_node = UnleashedOutlineNode(outline_node, tag_regex_text=['[*', '*]'])
+        tuple_node = UnleashedOutlineNode(outline_node, tag_regex_text=('[*', '*]'))
+
+        self.assertEqual((('[*', '*]'), None), list_node.delimiter_key)
+        self.assertEqual(list_node.delimiter_key, tuple_node.delimiter_key)
@@ -0,0 +1,144 @@
+"""
+Tests of streaming CSV output: the header comes from the data node specifier, rows can be supplied as tuples, dicts
+or a DataNodeTable, files can be gzip compressed, and empty tables give a valid file.
+"""
+import csv
+import gzip
+import os
+import tempfile
+from unittest import TestCase
+from ddt import ddt, data
+
+from outline.outline import Outline
+from outlines_unleashed.data_node_specifier import DataNodeSpecifier
+from outlines_unleashed.data_node_table import DataNodeTable
+from outlines_unleashed.unleashed_outline import UnleashedOutline
+from output_generators.csv_output_generator import CsvOutputGenerator, CsvStreamWriter
+from tests.test_resources.input_files.output_generator.test_csv_data import data_node_specifier_csv_test_01
+from tests.test_utilities.test_config import input_files_root
+
+
+def read_csv(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', newline='') as csv_file:
+        return list(csv.reader(csv_file))
+
+
+@ddt
+class TestCsvStreamWriter(TestCase):
+    def setUp(self) -> None:
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.directory = temporary_directory.name
+
+        outline = Outline.from_opml(os.path.join(input_files_root, 'output_generator',
+                                                 'opml_data_csv_output_test_01.opml'))
+        unleashed_outline = UnleashedOutline(outline, default_text_tag_delimiter=['[*', '*]'])
+        self.data_node = next(node for _, _, node in unleashed_outline.iter_data_nodes())
+        self.specifier = DataNodeSpecifier(data_node_specifier_csv_test_01)
+
+    def output_path(self, file_name):
+        return os.path.join(self.directory, file_name)
+
+    @data('records.csv', 'records.csv.gz')
+    def test_stream_csv_file(self, file_name):
+        output_path = self.output_path(file_name)
+        stats = CsvOutputGenerator.stream_csv_file(self.specifier, self.data_node, output_path, batch_size=2)
+
+        records = self.specifier.extract_data_node_dispatch(self.data_node)
+        field_names = list(self.specifier.compile().record_field_names)
+        expected = [field_names] + [
+            ['' if record[field_name] is None else record[field_name] for field_name in field_names]
+            for record in records
+        ]
+        self.assertEqual(expected, read_csv(output_path))
+        self.assertEqual(len(records), stats.rows)
+        self.assertLessEqual(0, stats.rows_per_second)
+
+    @data('records', 'table')
+    def test_stream_matches_create_csv_file(self, source_type):
+        # Primary key field last in the descriptor, so the order of the columns differs from the descriptor.
+        descriptor = data_node_specifier_csv_test_01['descriptor']
+        specifier = DataNodeSpecifier({
+            'header': data_node_specifier_csv_test_01['header'],
+            'descriptor': dict(reversed(list(descriptor.items())))
+        })
+        if source_type == 'records':
+            source = specifier.extract_data_node_dispatch(self.data_node)
+        else:
+            source = specifier.extract_data_node_table(self.data_node)
+        created_path = self.output_path('created.csv')
+        CsvOutputGenerator.create_csv_file(source, created_path)
+
+        streamed_path = self.output_path('streamed.csv')
+        CsvOutputGenerator.stream_csv_file(specifier, self.data_node, streamed_path)
+
+        self.assertNotEqual(specifier.extract_field_names(), read_csv(streamed_path)[0])
+        self.assertEqual(read_csv(created_path), read_csv(streamed_path))
+
+    def test_gzip_compressed(self):
+        output_path = self.output_path('records.csv.gz')
+        CsvOutputGenerator.stream_csv_file(self.specifier, self.data_node, output_path)
+
+        with open(output_path, 'rb') as output_file:
+            self.assertEqual(b'\x1f\x8b', output_file.read(2))
+
+    @data('tuples', 'records', 'table')
+    def test_write_sources(self, source_type):
+        field_names = ['a', 'b']
+        rows = [(str(number), number * 2) for number in range(7)]
+        if source_type == 'tuples':
+            source = rows
+        elif source_type == 'records':
+            source = [dict(zip(field_names, row)) for row in rows]
+        else:
+            source = DataNodeTable.from_rows(field_names, rows)
+
+        output_path = self.output_path('rows.csv')
+        with CsvStreamWriter(output_path, field_names, batch_size=3) as writer:
+            writer.write(source)
+
+        self.assertEqual([field_names] + [[a, str(b)] for a, b in rows], read_csv(output_path))
+        self.assertEqual(len(rows), writer.stats.rows)
+
+    def test_first_row_none(self):
+        """
+        A first row of None is an invalid row, not the end of the input, so isn't silently skipped.
+        """
+        output_path = self.output_path('rows.csv')
+        with self.assertRaises(csv.Error):
+            with CsvStreamWriter(output_path, ['a']) as writer:
+                writer.write([None, ('1',)])
+
+    def test_rows_reordered(self):
+        output_path = self.output_path('rows.csv')
+        with CsvStreamWriter(output_path, ['b', 'a']) as writer:
+            writer.write_rows([(1, 2), (3, 4)], field_names=['a', 'b'])
+
+        self.assertEqual([['b', 'a'], ['2', '1'], ['4', '3']], read_csv(output_path))
+
+    def test_record_with_extra_fields(self):
+        output_path = self.output_path('records.csv')
+        records = [{'a': 1, 'b': 2}, {'a': 3, 'b': 4, 'c': 5}]
+
+        with CsvStreamWriter(output_path, ['a', 'b']) as writer:
+            self.assertRaises(ValueError, writer.write_records, records)
+            self.assertRaises(ValueError, writer.write_records, records, extrasaction='skip')
+
+        with CsvStreamWriter(output_path, ['a', 'b']) as writer:
+            writer.write_records(records, extrasaction='ignore')
+        self.assertEqual([['a', 'b'], ['1', '2'], ['3', '4']], read_csv(output_path))
+
+    def test_empty_record_list(self):
+        output_path = self.output_path('empty.csv')
+        CsvOutputGenerator.create_csv_file([], output_path)
+        self.assertEqual([], read_csv(output_path))
+
+        CsvOutputGenerator.create_csv_file([], output_path, field_names=self.specifier.extract_field_names())
+        self.assertEqual([self.specifier.extract_field_names()], read_csv(output_path))
+
+    def test_empty_table(self):
+        output_path = self.output_path('empty.csv')
+        CsvOutputGenerator.create_csv_file(DataNodeTable.from_rows(['a', 'b'], []), output_path)
+
+        self.assertEqual([['a', 'b']], read_csv(output_path))
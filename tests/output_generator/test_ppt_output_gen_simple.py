@@ -1,5 +1,6 @@
 from unittest import TestCase
 import os
+import tempfile
 
 from ddt import ddt, unpack, data
 
@@ -213,3 +214,27 @@ class TestPptOutputGenSimple(TestCase):
         self.assertEqual(expected_level, test_level, f"Failed on {record_name}")
         self.assertEqual(expected_text, test_text)
 
+    def test_data_node_table_driver(self):
+        """
+        A DataNodeTable can be passed to the generator in place of the list of record dicts, giving the same deck.
+        """
+        test_data_file = os.path.join(input_files_root, test_file_folder_relative, filename)
+        test_ppt_template = os.path.join(input_files_root, test_file_folder_relative, "ppt_template_02.pptx")
+
+        unleashed_outline = UnleashedOutline(Outline.from_opml(test_data_file), default_text_tag_delimiter=['', ':'])
+        data_nodes = unleashed_outline.extract_data_nodes()
+        data_node = unleashed_outline.list_unleashed_nodes()[data_nodes[0]['data_node_list_index']].node()
+        data_node_descriptor = DataNodeSpecifier(dns)
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            records_path = os.path.join(output_dir, "records.pptx")
+            table_path = os.path.join(output_dir, "table.pptx")
+            PptOutputGeneratorSimple.generate_ppt(data_node_descriptor.extract_data_node_dispatch(data_node),
+                                                  records_path, test_ppt_template)
+            PptOutputGeneratorSimple.generate_ppt(data_node_descriptor.extract_data_node_table(data_node),
+                                                  table_path, test_ppt_template)
+
+            expected_slide_data = list(get_slide_data(records_path))
+            self.assertEqual([(level, text) for _, _, _, level, text in test_data],
+                             expected_slide_data[:len(test_data)])
+            self.assertEqual(expected_slide_data, list(get_slide_data(table_path)))